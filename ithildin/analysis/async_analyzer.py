@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Text
+
+from ithildin.analysis.batch import failed_report
+from ithildin.analysis.cancellation import CancellationToken
+from ithildin.analysis.symbolic import LaserWrapper
+from ithildin.contract.async_rpc import AsyncJsonRpc, DEFAULT_MAX_CONNECTIONS
+from ithildin.contract.loader import AsyncJsonRpcLoader, ContractLoader
+from ithildin.contract.rpc import create_client
+from ithildin.report.analysis import Outcome, Report
+
+log = logging.getLogger(__name__)
+
+# Wrapper of each executor thread, or worker process, whose analysis session is reused for all contracts it analyzes
+_local = threading.local()
+
+
+def _get_laser_wrapper() -> LaserWrapper:
+    if getattr(_local, 'laser_wrapper', None) is None:
+        _local.laser_wrapper = LaserWrapper()
+    return _local.laser_wrapper
+
+
+def _analyze_contract(contract_loader: ContractLoader, execute_options: Dict[Text, Any],
+                      cancellation_token: CancellationToken) -> Report:
+    """ Executor function analyzing a single contract. Strategies are reset since the thread's wrapper keeps them. """
+    strategy_loader = _get_laser_wrapper().strategy_loader
+    strategy_loader.reset_strategies()
+    report = _get_laser_wrapper().execute(contract_loader=contract_loader, cancellation_token=cancellation_token,
+                                          **execute_options)
+    strategy_loader.reset_strategies()
+    return report
+
+
+class AsyncAnalyzer:
+    """
+    Analyzes contracts from asyncio code without blocking the event loop. Contracts deployed at an address are loaded
+    through *rpc* with an *AsyncJsonRpc* client shared by all analyses, which keeps at most *max_connections* requests in
+    flight. Symbolic execution then runs in an executor of *max_workers* threads, or of worker processes if *processes* is
+    set, each with its own *LaserWrapper*. Any number of analyses can be awaited at the same time, those exceeding the
+    workers wait for a free one.
+
+    Cancelling the task awaiting an analysis cancels the analysis' *CancellationToken*, so that its symbolic execution stops
+    before the next executed state and the worker becomes free again. Threads execute one contract at a time (see
+    *ithildin.analysis.session.LASER_LOCK*), so only worker processes analyze several contracts in parallel.
+
+    The *execute_options* are passed to *LaserWrapper.execute()* for every analysis, and have to be picklable when using
+    worker processes. The analyzer is closed with *close()*, or by using it as an async context manager.
+    """
+
+    def __init__(self,
+                 rpc: Optional[Text] = None,
+                 max_workers: Optional[int] = None,
+                 processes: bool = False,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 **execute_options) -> None:
+        self.rpc = rpc
+        self.processes = processes
+        self.execute_options = execute_options
+        self.client = create_client(rpc, AsyncJsonRpc, max_connections=max_connections)
+        if processes:
+            self._executor = ProcessPoolExecutor(max_workers)
+            # Tokens of analyses in worker processes are backed by events of a manager process
+            self._manager = multiprocessing.Manager()
+        else:
+            self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='ithildin-analysis')
+            self._manager = None
+
+    async def load(self, address: Text, resolve_proxies: bool = False) -> AsyncJsonRpcLoader:
+        """ Loads the contract deployed at *address*, see *AsyncJsonRpcLoader*. """
+        return await AsyncJsonRpcLoader(address, self.rpc, resolve_proxies).load(self.client)
+
+    async def analyze(self,
+                      address: Optional[Text] = None,
+                      contract_loader: Optional[ContractLoader] = None,
+                      resolve_proxies: bool = False,
+                      **execute_options) -> Report:
+        """
+        Analyzes the contract deployed at *address*, or the contract of *contract_loader*, e.g. a *BinaryLoader*, which
+        is then loaded in the executor. *execute_options* override the analyzer's options for this analysis.
+        """
+        assert (address is None) != (contract_loader is None), 'Either address or contract_loader needs to be provided'
+        if contract_loader is None:
+            contract_loader = await self.load(address, resolve_proxies)
+        cancellation_token = CancellationToken(self._manager.Event() if self._manager is not None else None)
+        options = dict(self.execute_options, **execute_options)
+        future = asyncio.get_event_loop().run_in_executor(self._executor, _analyze_contract, contract_loader, options,
+                                                          cancellation_token)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            log.info('Cancelling analysis of %s', address or contract_loader)
+            cancellation_token.cancel()
+            raise
+
+    async def analyze_many(self,
+                           addresses: Iterable[Text],
+                           resolve_proxies: bool = False,
+                           **execute_options) -> AsyncIterator[Report]:
+        """
+        Analyzes the contracts deployed at *addresses* concurrently, and yields their reports in the order the analyses
+        complete. Contracts that couldn't be loaded or analyzed get a report with outcome ERROR. The remaining analyses
+        are cancelled when the iteration stops early.
+        """
+        tasks = [asyncio.ensure_future(self._analyze_address(address, resolve_proxies, execute_options)) for address in addresses]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _analyze_address(self, address: Text, resolve_proxies: bool, execute_options: Dict[Text, Any]) -> Report:
+        try:
+            return await self.analyze(address, resolve_proxies=resolve_proxies, **execute_options)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.exception('Analysis of %s failed', address)
+            return failed_report(Outcome.ERROR, contract_address=address)
+
+    async def close(self) -> None:
+        """ Waits for the running analyses to finish and shuts down the executor. """
+        await asyncio.get_event_loop().run_in_executor(None, self._executor.shutdown)
+        if self._manager is not None:
+            self._manager.shutdown()
+
+    async def __aenter__(self) -> 'AsyncAnalyzer':
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
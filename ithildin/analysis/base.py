@@ -1,10 +1,11 @@
 import logging
 
 from abc import ABC, abstractmethod
-from typing import List, Optional, Set, Text, Type
+from typing import Dict, List, Optional, Set, Text, Type
 
 from ithildin.report.analysis import ReportItem, Result
 
+from mythril.disassembler.disassembly import Disassembly
 from mythril.laser.ethereum.state.global_state import GlobalState
 from mythril.laser.smt.bitvec import BitVec
 
@@ -13,8 +14,8 @@ log = logging.getLogger(__name__)
 
 class AnalysisStrategy(ABC):
     """
-    Base class for contract analysis strategies. Subclasses can be instantiated by using the AnalysisStrategyFactory
-    from the module \'ithildin.analysis.factory\'.
+    Base class for contract analysis strategies. Subclasses listed in *STRATEGIES* can be instantiated by using
+    *create_strategies()* from the module \'ithildin.analysis.loader\'.
 
     When creating a new analysis strategy by subclassing this base class, override the *_analyze()* function.
     """
@@ -52,6 +53,21 @@ class AnalysisStrategy(ABC):
             self.cache.add(state.environment.active_function_name)
         return result
 
+    def cache_sizes(self) -> Dict[Text, int]:
+        """ Returns the number of entries in each cache kept during execution, override this when adding caches. """
+        return {'cache': len(self.cache)}
+
+    def analyze_statically(self, disassembly: Disassembly) -> bool:
+        """
+        Analyzes the runtime code in *disassembly* without symbolic execution. Override this if the pattern can be
+        detected statically, storing the results as *execute()* would.
+
+        Returns
+        -------
+        True if the analysis was conclusive and symbolic execution isn't needed for this strategy, False otherwise.
+        """
+        return False
+
     @abstractmethod
     def _analyze(self, state: GlobalState, prev_state: Optional[GlobalState] = None) -> Optional[Result]:
         """ Actual implementation of the analysis strategy. Override this when inheriting AnalysisStrategy. """
@@ -0,0 +1,108 @@
+import logging
+import multiprocessing
+import os
+import time
+
+from typing import Dict, List, Optional, Text, Tuple
+
+from ithildin.analysis.dedup import CodeGroup, fan_out_report, group_by_code
+from ithildin.analysis.supervisor import SupervisedExecutor
+from ithildin.analysis.symbolic import LaserWrapper
+from ithildin.contract.batch import CompiledContract
+from ithildin.report.analysis import Outcome, Report
+
+from mythril.support.support_utils import get_code_hash
+
+log = logging.getLogger(__name__)
+
+# Wrapper of the current worker process, whose analysis session is reused for all contracts the worker analyzes
+_laser_wrapper: Optional[LaserWrapper] = None
+
+
+def _get_laser_wrapper() -> LaserWrapper:
+    global _laser_wrapper
+    if _laser_wrapper is None:
+        _laser_wrapper = LaserWrapper()
+    return _laser_wrapper
+
+
+def _analyze_contract(task: Tuple[CompiledContract, Dict]) -> Report:
+    """ Worker function analyzing a single compiled contract. Strategies are reset since the worker's wrapper keeps them. """
+    contract, execute_options = task
+    log.info('Analyzing contract %s', contract.qualified_name)
+    strategy_loader = _get_laser_wrapper().strategy_loader
+    strategy_loader.reset_strategies()
+    report = _get_laser_wrapper().execute(creation_code=contract.creation_code, runtime_code=contract.runtime_code,
+                                          **execute_options)
+    report.contract_name = contract.qualified_name
+    strategy_loader.reset_strategies()
+    return report
+
+
+def analyze_contracts(contracts: List[CompiledContract],
+                      jobs: Optional[int] = None,
+                      hard_timeout: Optional[float] = None,
+                      memory_limit: Optional[int] = None,
+                      max_tasks_per_worker: Optional[int] = None,
+                      trace_directory: Optional[Text] = None,
+                      deduplicate: bool = True,
+                      **execute_options) -> List[Report]:
+    """
+    Analyzes every contract in *contracts* using a pool of *jobs* worker processes (defaults to the CPU count)
+    and returns one report per contract, in the same order as the given contracts. The *execute_options* are
+    passed on to *LaserWrapper.execute()* and thus need to be picklable.
+
+    If any of *hard_timeout* (seconds), *memory_limit* (bytes) or *max_tasks_per_worker* is given, the contracts are
+    analyzed by a *SupervisedExecutor* instead, and contracts whose worker had to be killed get a report with the
+    respective outcome.
+
+    If *trace_directory* is given, a trace of every contract's symbolic execution is recorded to a file named after the
+    contract's qualified name in that directory.
+
+    With *deduplicate*, contracts whose runtime code only differs in the metadata are analyzed once, and the other
+    contracts of the group get a copy of the report, see *ithildin.analysis.dedup*.
+    """
+    groups = group_by_code([contract.qualified_name for contract in contracts], [contract.runtime_code for contract in contracts])
+    if not deduplicate:
+        groups = [CodeGroup(group.code_hash, [member]) for group in groups for member in group.members]
+    contracts_by_name = {contract.qualified_name: contract for contract in contracts}
+    representatives = [contracts_by_name[group.representative] for group in groups]
+    tasks = [(contract, execute_options) for contract in representatives]
+    if trace_directory is not None:
+        os.makedirs(trace_directory, exist_ok=True)
+        tasks = [(contract, dict(execute_options, trace_path=os.path.join(trace_directory, trace_filename(contract.qualified_name))))
+                 for contract in representatives]
+    jobs = min(jobs or multiprocessing.cpu_count(), max(len(tasks), 1))
+    log.info('Analyzing %d contract(s) with %d distinct code(s) using %d worker process(es)', len(contracts), len(tasks), jobs)
+    if hard_timeout is not None or memory_limit is not None or max_tasks_per_worker is not None:
+        with SupervisedExecutor(_analyze_contract, jobs, hard_timeout, memory_limit, max_tasks_per_worker) as executor:
+            reports = [report if outcome == Outcome.COMPLETED else failed_report(outcome, contract_name=contract.qualified_name)
+                       for contract, (outcome, report) in zip(representatives, executor.map(tasks))]
+    elif jobs == 1:
+        reports = [_analyze_contract(task) for task in tasks]
+    else:
+        with multiprocessing.Pool(processes=jobs) as pool:
+            reports = pool.map(_analyze_contract, tasks, chunksize=1)
+    reports_by_name: Dict[Text, Report] = {}
+    for group, report in zip(groups, reports):
+        reports_by_name[group.representative] = report
+        for member in group.members[1:]:
+            member_contract = contracts_by_name[member]
+            member_report = fan_out_report(report, code_hash=get_code_hash(member_contract.runtime_code) or None)
+            member_report.contract_name = member
+            member_report.contract_code = member_contract.creation_code
+            reports_by_name[member] = member_report
+    return [reports_by_name[contract.qualified_name] for contract in contracts]
+
+
+def trace_filename(contract_name: Text) -> Text:
+    return '{}.trace'.format(contract_name.replace(os.sep, '_').replace(':', '_'))
+
+
+def failed_report(outcome: Outcome, contract_name: Optional[Text] = None, contract_address: Optional[Text] = None) -> Report:
+    """ Creates the report of a contract whose analysis was aborted with *outcome*. """
+    report = Report(start_time=time.time(), end_time=time.time())
+    report.outcome = outcome
+    report.contract_name = contract_name
+    report.contract_address = contract_address
+    return report
@@ -0,0 +1,107 @@
+import logging
+import time
+
+from typing import Dict, Optional
+
+from mythril.disassembler.disassembly import Disassembly
+
+log = logging.getLogger(__name__)
+
+# Feature values at which a contract is considered as complex as it gets
+REFERENCE_CODE_SIZE = 24576
+REFERENCE_SELECTOR_COUNT = 64
+REFERENCE_JUMPI_COUNT = 1024
+REFERENCE_JUMPIS_PER_FUNCTION = 32
+
+
+class Budget:
+    """ The execution timeout and max depth used for analyzing a contract, together with the features they were based on. """
+
+    def __init__(self, execution_timeout: float, max_depth: int, features: Optional[Dict[str, int]] = None,
+                 deadline_exceeded: bool = False) -> None:
+        self.execution_timeout = execution_timeout
+        self.max_depth = max_depth
+        self.features = features
+        self.deadline_exceeded = deadline_exceeded
+
+    @property
+    def adaptive(self) -> bool:
+        return self.features is not None
+
+    def to_dict(self) -> Dict:
+        as_dict = {
+            'executionTimeout': self.execution_timeout,
+            'maxDepth': self.max_depth,
+            'adaptive': self.adaptive
+        }
+        if self.features is not None:
+            as_dict['features'] = self.features
+        if self.deadline_exceeded:
+            as_dict['deadlineExceeded'] = True
+        return as_dict
+
+    def __repr__(self):
+        return (
+            '<Budget '
+            'execution_timeout={0.execution_timeout} '
+            'max_depth={0.max_depth} '
+            'features={0.features}'
+            '>'
+        ).format(self)
+
+
+class BudgetPlanner:
+    """
+    Computes per-contract budgets from cheap static features of the bytecode. The timeout grows with the overall
+    size of the contract (code size, number of selectors and JUMPIs) between *min_timeout* and *max_timeout*, and
+    the depth grows with the average number of JUMPIs per function between *min_depth* and *max_depth*.
+
+    When a *deadline* (Unix time) is given, no budget exceeds the time left until the deadline. Contracts planned
+    after the deadline get an empty budget that is flagged accordingly.
+    """
+
+    def __init__(self, min_timeout: float, max_timeout: float, min_depth: int, max_depth: int, deadline: Optional[float] = None) -> None:
+        assert 0 < min_timeout <= max_timeout, 'Invalid timeout range'
+        assert 0 < min_depth <= max_depth, 'Invalid depth range'
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.min_depth = min_depth
+        self.max_depth = max_depth
+        self.deadline = deadline
+
+    def plan(self, disassembly: Disassembly) -> Budget:
+        features = self.extract_features(disassembly)
+        size_weight = (0.2 * min(features['codeSize'] / REFERENCE_CODE_SIZE, 1) +
+                       0.5 * min(features['selectorCount'] / REFERENCE_SELECTOR_COUNT, 1) +
+                       0.3 * min(features['jumpiCount'] / REFERENCE_JUMPI_COUNT, 1))
+        jumpis_per_function = features['jumpiCount'] / max(features['selectorCount'], 1)
+        depth_weight = min(jumpis_per_function / REFERENCE_JUMPIS_PER_FUNCTION, 1)
+        execution_timeout = round(self.min_timeout + (self.max_timeout - self.min_timeout) * size_weight, 2)
+        max_depth = round(self.min_depth + (self.max_depth - self.min_depth) * depth_weight)
+
+        if self.deadline is not None:
+            time_left = self.deadline - time.time()
+            if time_left < 1:
+                log.warning('Batch deadline exceeded, no time left for analysis')
+                return Budget(0, max_depth, features, deadline_exceeded=True)
+            execution_timeout = min(execution_timeout, round(time_left, 2))
+
+        log.info('Planned budget of %.2f seconds and max depth %d for %s', execution_timeout, max_depth, features)
+        return Budget(execution_timeout, max_depth, features)
+
+    @staticmethod
+    def extract_features(disassembly: Disassembly) -> Dict[str, int]:
+        bytecode = disassembly.bytecode[2:] if disassembly.bytecode.startswith('0x') else disassembly.bytecode
+        return {
+            'codeSize': len(bytecode) // 2,
+            'selectorCount': len(disassembly.func_hashes),
+            'jumpiCount': sum(1 for instruction in disassembly.instruction_list if instruction['opcode'] == 'JUMPI')
+        }
+
+
+def get_budget_planner(args) -> Optional[BudgetPlanner]:
+    """ Returns the budget planner configured by the parsed command line *args*, None if adaptive budgets are disabled. """
+    if not args.adaptive_budget:
+        return None
+    deadline = time.time() + args.batch_deadline if getattr(args, 'batch_deadline', None) else None
+    return BudgetPlanner(args.min_timeout, args.timeout, args.min_depth, args.max_depth, deadline=deadline)
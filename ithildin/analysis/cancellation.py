@@ -0,0 +1,49 @@
+import threading
+import time
+
+from typing import Any, Optional
+
+from ithildin.exception import AnalysisCancelled
+
+# Seconds between two reads of the token's event, which is a call to the manager process for tokens shared with workers
+DEFAULT_CHECK_INTERVAL = 0.05
+
+
+class CancellationToken:
+    """
+    Tells a running analysis to stop. Symbolic execution checks the token before executing each state, and raises
+    *AnalysisCancelled* once the token has been cancelled, see *AnalysisSession*.
+
+    The token is backed by a threading event unless another *event* is given, e.g. the event of a multiprocessing
+    manager for analyses running in worker processes. The event is read at most every *check_interval* seconds.
+    """
+
+    def __init__(self, event: Optional[Any] = None, check_interval: float = DEFAULT_CHECK_INTERVAL) -> None:
+        self._event = event if event is not None else threading.Event()
+        self._check_interval = check_interval
+        self._cancelled = False
+        self._last_check = 0.0
+
+    def cancel(self) -> None:
+        self._cancelled = True
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if not self._cancelled:
+            now = time.monotonic()
+            if now - self._last_check >= self._check_interval:
+                self._last_check = now
+                self._cancelled = self._event.is_set()
+        return self._cancelled
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancelled:
+            raise AnalysisCancelled('Analysis has been cancelled')
+
+    def __repr__(self):
+        return (
+            '<CancellationToken '
+            'cancelled={0.cancelled}'
+            '>'
+        ).format(self)
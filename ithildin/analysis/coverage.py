@@ -0,0 +1,155 @@
+import logging
+import time
+
+from typing import Dict, Optional, Set, Text, Tuple
+
+from mythril.laser.ethereum.state.global_state import GlobalState
+from mythril.laser.ethereum.svm import LaserEVM
+from mythril.laser.plugin.plugins.coverage import InstructionCoveragePlugin
+
+log = logging.getLogger(__name__)
+
+
+class Coverage:
+    """ Instruction and branch (JUMPI edge) coverage summed over all code executed during an analysis. """
+
+    def __init__(self, covered_instructions: int, total_instructions: int, covered_branches: int, total_branches: int,
+                 plateau_stop: bool = False, executed_states: int = 0) -> None:
+        self.covered_instructions = covered_instructions
+        self.total_instructions = total_instructions
+        self.covered_branches = covered_branches
+        self.total_branches = total_branches
+        self.plateau_stop = plateau_stop
+        self.executed_states = executed_states
+
+    @property
+    def instruction_coverage(self) -> Optional[float]:
+        return self.covered_instructions / self.total_instructions if self.total_instructions > 0 else None
+
+    @property
+    def branch_coverage(self) -> Optional[float]:
+        return self.covered_branches / self.total_branches if self.total_branches > 0 else None
+
+    def to_dict(self) -> Dict:
+        return {
+            'coveredInstructions': self.covered_instructions,
+            'totalInstructions': self.total_instructions,
+            'coveredBranches': self.covered_branches,
+            'totalBranches': self.total_branches,
+            'plateauStop': self.plateau_stop,
+            'executedStates': self.executed_states
+        }
+
+    def __repr__(self):
+        return (
+            '<Coverage '
+            'instruction_coverage={0.instruction_coverage} '
+            'branch_coverage={0.branch_coverage} '
+            'plateau_stop={0.plateau_stop} '
+            'executed_states={0.executed_states}'
+            '>'
+        ).format(self)
+
+
+class CoveragePlateauPlugin(InstructionCoveragePlugin):
+    """
+    Extends Mythril's instruction coverage plugin by branch coverage, and optionally stops symbolic execution once the
+    coverage hasn't grown for *window_seconds* seconds and *window_states* executed states. If only one of the windows
+    is given, the other one is ignored.
+
+    Execution is stopped by lowering the timeouts of the Laser EVM, which are checked before each state, and by
+    dropping the open states at the end of the current transaction, so that no further transactions are executed.
+    """
+
+    def __init__(self, window_seconds: Optional[float] = None, window_states: Optional[int] = None) -> None:
+        super().__init__()
+        self.window_seconds = window_seconds
+        self.window_states = window_states
+        self.branches: Dict[Text, Set[Tuple[int, int]]] = {}
+        self.jumpi_counts: Dict[Text, int] = {}
+        self.plateau_stop = False
+        self.executed_states = 0
+        self._visited: Dict[Text, Set[int]] = {}
+        self._last_growth_time = 0.0
+        self._states_since_growth = 0
+
+    @property
+    def stopping_enabled(self) -> bool:
+        return self.window_seconds is not None or self.window_states is not None
+
+    def initialize(self, symbolic_vm: LaserEVM) -> None:
+        super().initialize(symbolic_vm)
+        self.reset()
+
+        @symbolic_vm.laser_hook('execute_state')
+        def execute_state_hook(global_state: GlobalState):
+            self.executed_states += 1
+            new_instruction = self._record_instruction(global_state)
+            if self._record_branch(global_state) or new_instruction:
+                self._last_growth_time = time.time()
+                self._states_since_growth = 0
+            else:
+                self._states_since_growth += 1
+            if self.stopping_enabled and not self.plateau_stop and self._has_plateaued():
+                log.info('Coverage has not grown for %d states and %.2f seconds, stopping symbolic execution',
+                         self._states_since_growth, time.time() - self._last_growth_time)
+                self.plateau_stop = True
+                symbolic_vm.execution_timeout = symbolic_vm.create_timeout = 1e-6
+
+        @symbolic_vm.laser_hook('stop_sym_trans')
+        def stop_sym_trans_hook():
+            if self.plateau_stop:
+                symbolic_vm.open_states = []
+
+    def reset(self) -> None:
+        """ Resets the coverage, so that the plugin can be reused for another execution without registering its hooks again. """
+        self.coverage = {}
+        self.initial_coverage = 0
+        self.tx_id = 0
+        self.branches = {}
+        self.jumpi_counts = {}
+        self.plateau_stop = False
+        self.executed_states = 0
+        self._visited = {}
+        self._last_growth_time = time.time()
+        self._states_since_growth = 0
+
+    def _record_instruction(self, global_state: GlobalState) -> bool:
+        """ Records the instruction *global_state* is about to execute, returns True if it hasn't been executed before. """
+        code = global_state.environment.code
+        if code.bytecode not in self._visited:
+            self._visited[code.bytecode] = set()
+            self.jumpi_counts[code.bytecode] = sum(1 for instruction in code.instruction_list if instruction['opcode'] == 'JUMPI')
+        visited = self._visited[code.bytecode]
+        if global_state.mstate.pc in visited:
+            return False
+        visited.add(global_state.mstate.pc)
+        return True
+
+    def _record_branch(self, global_state: GlobalState) -> bool:
+        """ Records the JUMPI edge leading to *global_state*, returns True if the edge hasn't been taken before. """
+        prev_pc = global_state.mstate.prev_pc
+        instruction_list = global_state.environment.code.instruction_list
+        if prev_pc < 0 or prev_pc >= len(instruction_list) or instruction_list[prev_pc]['opcode'] != 'JUMPI':
+            return False
+        edges = self.branches.setdefault(global_state.environment.code.bytecode, set())
+        edge = (prev_pc, global_state.mstate.pc)
+        if edge in edges:
+            return False
+        edges.add(edge)
+        return True
+
+    def _has_plateaued(self) -> bool:
+        if self.window_states is not None and self._states_since_growth < self.window_states:
+            return False
+        if self.window_seconds is not None and time.time() - self._last_growth_time < self.window_seconds:
+            return False
+        return True
+
+    def get_coverage(self) -> Coverage:
+        covered_instructions = sum(sum(code_coverage[1]) for code_coverage in self.coverage.values())
+        total_instructions = sum(code_coverage[0] for code_coverage in self.coverage.values())
+        covered_branches = sum(len(edges) for edges in self.branches.values())
+        total_branches = 2 * sum(self.jumpi_counts.values())
+        return Coverage(covered_instructions, total_instructions, covered_branches, total_branches, self.plateau_stop,
+                        self.executed_states)
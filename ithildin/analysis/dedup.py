@@ -0,0 +1,116 @@
+import logging
+import time
+
+from copy import deepcopy
+from typing import Dict, Iterable, List, Optional, Sequence, Text
+
+from ithildin.report.analysis import Report, Result
+
+from mythril.support.loader import DynLoader
+from mythril.support.support_utils import get_code_hash
+
+log = logging.getLogger(__name__)
+
+STORAGE_INDEX_SUFFIX = ' Storage Index'
+
+
+def strip_metadata(code: Text) -> Text:
+    """
+    Strips the CBOR encoded metadata solc appends to the runtime code, which holds the hash of the contract's source
+    and thus differs between deployments of the same code compiled from differently formatted sources. The length of
+    the metadata is given by the last two bytes, and the metadata itself is a CBOR map.
+    """
+    code = code[2:] if code.startswith('0x') else code
+    if len(code) < 4:
+        return code
+    try:
+        metadata_length = int(code[-4:], 16)
+    except ValueError:
+        return code
+    trailer_start = len(code) - 2 * (metadata_length + 2)
+    if metadata_length == 0 or trailer_start < 0 or not 0xA0 <= int(code[trailer_start:trailer_start + 2], 16) <= 0xBF:
+        return code
+    return code[:trailer_start]
+
+
+def normalized_code_hash(code: Optional[Text]) -> Optional[Text]:
+    """ Returns the keccak hash of *code* without its metadata, None if there's no code. """
+    if code is None or len(code) <= 2:
+        return None
+    return get_code_hash(strip_metadata(code)) or None
+
+
+class CodeGroup:
+    """ Contracts sharing the same code up to the metadata, the first *member* gets analyzed on behalf of all of them. """
+
+    def __init__(self, code_hash: Optional[Text], members: List[Text]) -> None:
+        self.code_hash = code_hash
+        self.members = members
+
+    @property
+    def representative(self) -> Text:
+        return self.members[0]
+
+    def to_dict(self) -> Dict:
+        return {
+            'codeHash': self.code_hash,
+            'members': self.members
+        }
+
+    def __repr__(self):
+        return (
+            '<CodeGroup '
+            'code_hash={0.code_hash} '
+            'members={0.members}'
+            '>'
+        ).format(self)
+
+
+def group_by_code(members: Sequence[Text], codes: Sequence[Optional[Text]]) -> List[CodeGroup]:
+    """
+    Groups the *members*, e.g. addresses, by the normalized hash of their *codes*, keeping the order in which the
+    groups' first members appear. Members without code get a group of their own.
+    """
+    groups: Dict[Text, CodeGroup] = {}
+    ungrouped: List[CodeGroup] = []
+    ordered: List[CodeGroup] = []
+    for member, code in zip(members, codes):
+        code_hash = normalized_code_hash(code)
+        if code_hash is None:
+            ungrouped.append(CodeGroup(None, [member]))
+            ordered.append(ungrouped[-1])
+        elif code_hash in groups:
+            groups[code_hash].members.append(member)
+        else:
+            groups[code_hash] = CodeGroup(code_hash, [member])
+            ordered.append(groups[code_hash])
+    log.info('Grouped %d contracts into %d distinct codes', len(members), len(ordered))
+    return ordered
+
+
+def fan_out_report(report: Report,
+                   contract_address: Optional[Text] = None,
+                   dyn_loader: Optional[DynLoader] = None,
+                   code_hash: Optional[Text] = None) -> Report:
+    """
+    Returns a copy of the post-processed *report* of a group's representative for another member of the group. The
+    storage values of the results are read again at *contract_address* if *dyn_loader* is given, since members share
+    their code but not their storage.
+    """
+    member_report = deepcopy(report)
+    member_report.start_time = member_report.end_time = time.time()
+    member_report.analyzed_as = report.analyzed_as or report.contract_address or report.contract_name
+    member_report.contract_address = contract_address
+    member_report.code_hash = code_hash or report.code_hash
+    reread_storage_values([result for report_item in member_report.reports for result in report_item.results], contract_address,
+                          dyn_loader)
+    return member_report
+
+
+def reread_storage_values(results: Iterable[Result], contract_address: Optional[Text], dyn_loader: Optional[DynLoader]) -> None:
+    """ Reads the values of the attributes with a storage index of *results* at *contract_address*, None without *dyn_loader*. """
+    for result in results:
+        for attr_name, attr_value in list(result.attributes.items()):
+            value_name = attr_name[:-len(STORAGE_INDEX_SUFFIX)]
+            if attr_name.endswith(STORAGE_INDEX_SUFFIX) and value_name in result.attributes:
+                result.attributes[value_name] = dyn_loader.read_storage(contract_address, attr_value) if dyn_loader else None
@@ -0,0 +1,63 @@
+import logging
+
+from datetime import datetime
+from typing import Optional, Text
+
+from ithildin.analysis.session import LASER_LOCK
+
+from ethereum.utils import mk_contract_address
+from mythril.disassembler.disassembly import Disassembly
+from mythril.laser.ethereum import svm
+from mythril.laser.ethereum.state.calldata import ConcreteCalldata
+from mythril.laser.ethereum.state.world_state import WorldState
+from mythril.laser.ethereum.time_handler import time_handler
+from mythril.laser.ethereum.transaction.concolic import _setup_global_state_for_execution
+from mythril.laser.ethereum.transaction.symbolic import ACTORS
+from mythril.laser.ethereum.transaction.transaction_models import ContractCreationTransaction, get_next_transaction_id
+from mythril.laser.smt import symbol_factory
+
+log = logging.getLogger(__name__)
+
+# Seconds the constructor may take to deploy a contract concretely
+DEFAULT_DEPLOYMENT_TIMEOUT = 10
+# Block gas limit Laser uses for contract creation
+DEPLOYMENT_GAS_LIMIT = 8000000
+
+# Address of the first contract created by Laser's creator account, at which runtime code without an address is executed
+RUNTIME_ADDRESS = '0x' + mk_contract_address(ACTORS['CREATOR'].value, 0).hex()
+
+
+def deploy(creation_code: Text, timeout: float = DEFAULT_DEPLOYMENT_TIMEOUT) -> Optional[Text]:
+    """
+    Returns the runtime code returned by the constructor of *creation_code*, executed concretely by Laser's creator
+    account with no value and all constructor arguments zero. No strategy hooks or plugins are run.
+
+    Returns None if the constructor reverts, doesn't finish within *timeout* seconds, or returns code that depends on
+    values that are symbolic even in a concrete transaction, e.g. the block's timestamp.
+    """
+    with LASER_LOCK:
+        laser = svm.LaserEVM(requires_statespace=False, create_timeout=timeout)
+        laser.time = datetime.now()
+        # Solver timeouts are derived from the time handler, which Laser only starts in sym_exec()
+        time_handler.start_execution(timeout)
+        transaction_id = get_next_transaction_id()
+        transaction = ContractCreationTransaction(world_state=WorldState(),
+                                                  identifier=transaction_id,
+                                                  gas_price=symbol_factory.BitVecVal(0, 256),
+                                                  gas_limit=DEPLOYMENT_GAS_LIMIT,
+                                                  origin=ACTORS['CREATOR'],
+                                                  code=Disassembly(creation_code),
+                                                  caller=ACTORS['CREATOR'],
+                                                  call_data=ConcreteCalldata(transaction_id, []),
+                                                  call_value=symbol_factory.BitVecVal(0, 256))
+        _setup_global_state_for_execution(laser, transaction)
+        laser.exec(create=True)
+
+        address = transaction.callee_account.address.value
+        for world_state in laser.open_states:
+            runtime_code = world_state.accounts[address].code.bytecode if address in world_state.accounts else None
+            if runtime_code:
+                log.info('Deployed contract concretely, runtime code has %d bytes', len(runtime_code) // 2)
+                return runtime_code
+    log.warning('Constructor did not return runtime code when executed concretely')
+    return None
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import logging
+
+from copy import deepcopy
+from typing import Dict, FrozenSet, List, Optional, Set, Text
+
+from ithildin.analysis.dedup import reread_storage_values
+from ithildin.analysis.functions import dispatcher_entries, function_selector
+from ithildin.report.analysis import Report, ReportItem
+
+from mythril.disassembler import asm
+from mythril.ethereum import util
+from mythril.support.loader import DynLoader
+
+log = logging.getLogger(__name__)
+
+# Key of the code reachable from the start of the runtime code without entering a dispatched function
+DISPATCHER = 'dispatcher'
+
+HALTING_OPCODES = {'STOP', 'RETURN', 'REVERT', 'SUICIDE', 'SELFDESTRUCT', 'INVALID', 'ASSERT_FAIL'}
+BLOCK_ENDING_OPCODES = HALTING_OPCODES | {'JUMP', 'JUMPI'}
+# Opcodes of the blocks comparing the selector, which change whenever a function is added or removed
+DISPATCH_OPCODES = {'JUMPDEST', 'JUMPI', 'EQ', 'GT', 'LT'}
+
+
+class BasicBlock:
+    """ A basic block of runtime code, with the jump destinations it pushes, e.g. jump targets and return addresses. """
+
+    def __init__(self, address: int, instructions: List[Dict], jump_destinations: Set[int]) -> None:
+        self.address = address
+        self.opcodes = [instruction['opcode'] for instruction in instructions]
+        self.falls_through = self.opcodes[-1] not in HALTING_OPCODES and self.opcodes[-1] != 'JUMP'
+        self.pushed_destinations = [int(instruction['argument'], 16) for instruction in instructions
+                                    if instruction['opcode'].startswith('PUSH') and int(instruction['argument'], 16) in jump_destinations]
+        self.is_dispatch = self.opcodes[-1] == 'JUMPI' and all(opcode in DISPATCH_OPCODES or opcode.startswith('PUSH') or
+                                                               opcode.startswith('DUP') for opcode in self.opcodes)
+        # Pushed jump destinations shift whenever code before them changes, so they don't take part in the hash
+        self.hash = hashlib.sha256(' '.join(
+            instruction['opcode'] + ('' if not instruction['opcode'].startswith('PUSH') else
+                                     ' TAG' if int(instruction['argument'], 16) in jump_destinations else ' ' + instruction['argument'])
+            for instruction in instructions).encode('utf-8')).hexdigest()
+
+
+def basic_blocks(instructions: List[Dict]) -> Dict[int, BasicBlock]:
+    """ Splits *instructions* into basic blocks, by the address of their first instruction. """
+    jump_destinations = {instruction['address'] for instruction in instructions if instruction['opcode'] == 'JUMPDEST'}
+    blocks: Dict[int, BasicBlock] = {}
+    start = 0
+    for index, instruction in enumerate(instructions):
+        ends_block = instruction['opcode'] in BLOCK_ENDING_OPCODES
+        next_starts_block = index + 1 < len(instructions) and instructions[index + 1]['opcode'] == 'JUMPDEST'
+        if ends_block or next_starts_block or index + 1 == len(instructions):
+            blocks[instructions[start]['address']] = BasicBlock(instructions[start]['address'], instructions[start:index + 1],
+                                                                jump_destinations)
+            start = index + 1
+    return blocks
+
+
+def function_hashes(code: Text) -> Dict[Text, Text]:
+    """
+    Returns a hash of the code of each function dispatched to in the runtime *code* by selector, and of the code only
+    reachable through the dispatcher, e.g. the fallback function, under the key DISPATCHER.
+
+    The code of a function consists of the basic blocks reachable from its entry point, following fall-throughs and every jump
+    destination pushed by a reachable block, which over-approximates jumps to internal functions and their returns.
+    Blocks are hashed without the jump destinations they push, so that a function keeps its hash if only code before
+    it changed. The blocks comparing the selector are left out of the dispatcher's hash, since they change whenever a
+    function is added or removed.
+    """
+    instructions = asm.disassemble(util.safe_decode(code))
+    if len(instructions) == 0:
+        return {}
+    blocks = basic_blocks(instructions)
+    block_addresses = sorted(blocks)
+    following = {address: block_addresses[i + 1] for i, address in enumerate(block_addresses[:-1])}
+    entries = dispatcher_entries(instructions)
+
+    def reachable_hash(start: int, excluded: FrozenSet[int] = frozenset()) -> Text:
+        visited: Set[int] = set()
+        work_list = [start]
+        while len(work_list) > 0:
+            address = work_list.pop()
+            if address in visited or address in excluded or address not in blocks:
+                continue
+            visited.add(address)
+            block = blocks[address]
+            work_list.extend(block.pushed_destinations)
+            if block.falls_through and address in following:
+                work_list.append(following[address])
+        block_hashes = sorted(blocks[address].hash for address in visited
+                              if not (excluded and blocks[address].is_dispatch))
+        return hashlib.sha256(''.join(block_hashes).encode('utf-8')).hexdigest()
+
+    hashes = {selector: reachable_hash(entry) for entry, selector in entries.items()}
+    hashes[DISPATCHER] = reachable_hash(instructions[0]['address'], frozenset(entries))
+    return hashes
+
+
+class FunctionDiff:
+    """ The selectors of the functions that changed or were added since the baseline, and of those that did not change. """
+
+    def __init__(self, changed: Set[Text], unchanged: Set[Text]) -> None:
+        self.changed = changed
+        self.unchanged = unchanged
+
+    def __repr__(self):
+        return (
+            '<FunctionDiff '
+            'changed={0.changed} '
+            'unchanged={0.unchanged}'
+            '>'
+        ).format(self)
+
+
+class Baseline:
+    """
+    A prior version of a contract to analyze another version against, given by the hashes of its functions (see
+    *function_hashes()*) and, if it has been analyzed, its report.
+    """
+
+    def __init__(self, function_hashes: Dict[Text, Text], report: Optional[Report] = None) -> None:
+        self.function_hashes = function_hashes
+        self.report = report
+
+    def diff(self, code: Optional[Text]) -> Optional[FunctionDiff]:
+        """
+        Compares the functions of the runtime *code* against the baseline. Returns None if the code is unknown or its
+        dispatcher changed, in which case the whole contract has to be analyzed again.
+        """
+        if code is None or len(code) <= 2:
+            log.warning('No runtime code to compare against the baseline, analyzing all functions')
+            return None
+        hashes = function_hashes(code)
+        if DISPATCHER not in hashes or hashes[DISPATCHER] != self.function_hashes.get(DISPATCHER):
+            log.info('Dispatcher or fallback function changed since the baseline, analyzing all functions')
+            return None
+        selectors = set(hashes) - {DISPATCHER}
+        unchanged = {selector for selector in selectors if self.function_hashes.get(selector) == hashes[selector]}
+        log.info('%d of %d functions changed since the baseline', len(selectors - unchanged), len(selectors))
+        return FunctionDiff(selectors - unchanged, unchanged)
+
+    def carry_over(self, report: Report, unchanged: Set[Text], contract_address: Optional[Text] = None,
+                   dyn_loader: Optional[DynLoader] = None) -> None:
+        """
+        Adds the baseline's results of the *unchanged* functions, and of the fallback function, to *report*, marked as
+        carried over. Their storage values are read again at *contract_address* if *dyn_loader* is given.
+        """
+        report.unchanged_functions = sorted(unchanged)
+        if self.report is None:
+            return
+        report_items = {report_item.pattern_name: report_item for report_item in report.reports}
+        for baseline_item in self.report.reports:
+            results = [deepcopy(result) for result in baseline_item.results if result.function_name != 'constructor' and
+                       (function_selector(result.function_name) in unchanged or function_selector(result.function_name) is None)]
+            if len(results) == 0:
+                continue
+            reread_storage_values(results, contract_address, dyn_loader)
+            if baseline_item.pattern_name not in report_items:
+                report_items[baseline_item.pattern_name] = ReportItem(baseline_item.title, baseline_item.description,
+                                                                      baseline_item.pattern_name)
+                report.add_report(report_items[baseline_item.pattern_name])
+            for result in results:
+                result.carried_over = True
+                report_items[baseline_item.pattern_name].add_result(result)
+
+
+def load_baseline(path: Text) -> Baseline:
+    """
+    Loads a baseline from a JSON report printed by *analyze --json*, whose results are carried over, or from a file
+    holding the hex encoded runtime code of the prior version, in which case only the changed functions are reported.
+    """
+    with open(path, 'r', encoding='utf-8') as baseline_file:
+        content = baseline_file.read().strip()
+    try:
+        as_dict = json.loads(content)
+    except ValueError:
+        try:
+            return Baseline(function_hashes(content))
+        except ValueError:
+            raise ValueError('Baseline is neither a JSON report nor hex encoded bytecode: {}'.format(path))
+    if isinstance(as_dict, list):
+        raise ValueError('Baseline must be the report of a single contract: {}'.format(path))
+    report = Report.from_dict(as_dict)
+    if report.function_hashes is None:
+        raise ValueError('Baseline report has no function hashes, its runtime code was unknown: {}'.format(path))
+    return Baseline(report.function_hashes, report)
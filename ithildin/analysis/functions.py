@@ -0,0 +1,125 @@
+import logging
+import re
+
+from typing import Dict, FrozenSet, Iterable, List, Optional, Text
+
+from ithildin.report.analysis import Report
+
+from mythril.disassembler.disassembly import Disassembly
+from mythril.laser.ethereum.state.global_state import GlobalState
+from mythril.laser.ethereum.svm import LaserEVM
+from mythril.laser.ethereum.transaction.transaction_models import MessageCallTransaction
+from mythril.laser.plugin.interface import LaserPlugin
+from mythril.laser.plugin.signals import PluginSkipState
+from mythril.laser.smt import Concat, Or, symbol_factory
+from mythril.mythril import MythrilDisassembler
+
+log = logging.getLogger(__name__)
+
+SELECTOR_REGEX = r'0x[0-9a-fA-F]{8}'
+UNKNOWN_FUNCTION_REGEX = r'_function_(0x[0-9a-fA-F]{8})'
+
+
+def parse_selector(function: Text) -> Text:
+    """ Returns the selector of *function*, given either as a 4-byte selector or as a signature like 'mint(address,uint256)'. """
+    function = function.strip()
+    if re.fullmatch(SELECTOR_REGEX, function):
+        return function.lower()
+    if re.fullmatch(r'[A-Za-z_$][A-Za-z0-9_$]*\(.*\)', function):
+        return MythrilDisassembler.hash_for_function_signature(function.replace(' ', ''))
+    raise ValueError('Not a function selector or signature: {}'.format(function))
+
+
+def function_selector(function_name: Text) -> Optional[Text]:
+    """ Returns the selector of the function named *function_name* by Mythril, None for the fallback and constructor. """
+    match = re.fullmatch(UNKNOWN_FUNCTION_REGEX, function_name)
+    if match:
+        return match.group(1).lower()
+    if '(' in function_name:
+        return MythrilDisassembler.hash_for_function_signature(function_name)
+    return None
+
+
+def dispatcher_entries(instructions: List[Dict]) -> Dict[int, Text]:
+    """
+    Returns the selectors of the functions dispatched to in *instructions* by the address of their entry point. Dispatcher
+    branches are recognized by the selector being compared and the entry point being pushed right before the JUMPI, as
+    in *PUSH4 selector, EQ, PUSH2 entry, JUMPI*, with the selector optionally followed by a DUP.
+    """
+    entries: Dict[int, Text] = {}
+    for index in range(3, len(instructions)):
+        if instructions[index]['opcode'] != 'JUMPI' or not instructions[index - 1]['opcode'].startswith('PUSH') \
+                or instructions[index - 2]['opcode'] != 'EQ':
+            continue
+        selector_index = index - 4 if instructions[index - 3]['opcode'].startswith('DUP') else index - 3
+        if selector_index < 0 or instructions[selector_index]['opcode'] not in ('PUSH1', 'PUSH2', 'PUSH3', 'PUSH4'):
+            continue
+        selector = '0x' + instructions[selector_index]['argument'][2:].rjust(8, '0')
+        entries[int(instructions[index - 1]['argument'], 16)] = selector.lower()
+    return entries
+
+
+def filter_report(report: Report, selectors: Iterable[Text]) -> None:
+    """ Removes the results of functions other than those with the given *selectors* from *report*. """
+    selectors = set(selectors)
+    for report_item in report.reports:
+        report_item.results = [result for result in report_item.results if function_selector(result.function_name) in selectors]
+
+
+class FunctionSelectorPlugin(LaserPlugin):
+    """
+    Restricts symbolic execution to the functions with the given *selectors*, so that the whole time budget is spent on
+    them. Two measures are combined, since Laser only drops infeasible states at the end of a transaction:
+
+    - States entering a function other than the selected ones through the dispatcher are skipped right after the
+      JUMPI, see *dispatcher_entries()*. Only JUMPIs executed in the dispatcher of the analyzed contract count, so that
+      neither the dispatcher of a called contract nor a function body comparing constants skips the caller's path.
+    - The selector read from the calldata of each message call to the analyzed contract is constrained to the
+      selected ones, which rules out the fallback function and any dispatcher branch not recognized by its shape.
+
+    Without selectors, the plugin does nothing, so that it can be registered once and enabled per contract.
+    """
+
+    def __init__(self, selectors: Optional[Iterable[Text]] = None) -> None:
+        self.selectors: Optional[FrozenSet[Text]] = None
+        self.skipped_states = 0
+        self._entries: Dict[Text, Dict[int, Text]] = {}
+        self.reset(selectors)
+
+    def reset(self, selectors: Optional[Iterable[Text]] = None) -> None:
+        self.selectors = frozenset(selector.lower() for selector in selectors) if selectors is not None else None
+        self.skipped_states = 0
+        self._entries = {}
+
+    def initialize(self, symbolic_vm: LaserEVM) -> None:
+
+        @symbolic_vm.laser_hook('execute_state')
+        def execute_state_hook(global_state: GlobalState):
+            if self.selectors is None or global_state.mstate.pc != 0 or len(global_state.transaction_stack) != 1:
+                return
+            if not isinstance(global_state.current_transaction, MessageCallTransaction):
+                return
+            selector = Concat(global_state.environment.calldata[0:4])
+            global_state.world_state.constraints.append(
+                Or(*[selector == symbol_factory.BitVecVal(int(s, 16), 32) for s in sorted(self.selectors)]))
+
+        @symbolic_vm.post_hook('JUMPI')
+        def jumpi_hook(global_state: GlobalState):
+            if self.selectors is None or len(global_state.transaction_stack) != 1:
+                return
+            # Laser names the function only once the jump has been taken, so this is the function the JUMPI is in
+            if global_state.environment.active_function_name in global_state.environment.code.function_name_to_address:
+                return
+            try:
+                address = global_state.get_current_instruction()['address']
+            except IndexError:
+                return
+            selector = self._dispatcher_entries(global_state.environment.code).get(address)
+            if selector is not None and selector not in self.selectors:
+                self.skipped_states += 1
+                raise PluginSkipState
+
+    def _dispatcher_entries(self, disassembly: Disassembly) -> Dict[int, Text]:
+        if disassembly.bytecode not in self._entries:
+            self._entries[disassembly.bytecode] = dispatcher_entries(disassembly.instruction_list)
+        return self._entries[disassembly.bytecode]
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Iterable, List, Optional, Text
 
 from .base import AnalysisStrategy
 from .strategies.hash_lock import HashLock
@@ -7,8 +7,6 @@ from .strategies.ownership import Ownership
 from .strategies.roles import RoleBasedAccessControl
 from .strategies.x_confirmation import XConfirmation
 
-from ithildin.support.singleton import Singleton
-
 STRATEGIES = {
     HashLock.pattern_name: HashLock,
     MultipleAuthorization.pattern_name: MultipleAuthorization,
@@ -18,11 +16,24 @@ STRATEGIES = {
 }
 
 
-class StrategyLoader(metaclass=Singleton):
+def create_strategies(pattern_names: Optional[Iterable[Text]] = None) -> List[AnalysisStrategy]:
+    """ Returns new instances of the strategies with the given *pattern_names*, of all strategies if none are given. """
+    if pattern_names is None:
+        return [Strategy() for Strategy in STRATEGIES.values()]
+    return [STRATEGIES[pattern_name]() for pattern_name in pattern_names]
+
 
-    def __init__(self) -> None:
+class StrategyLoader:
+    """
+    Holds the strategy instances used by one *LaserWrapper*, new instances of all strategies unless *strategies* are
+    given. Strategies keep the state of the contract they currently analyze, e.g. their results and caches, so a
+    loader and its strategies must not be shared between wrappers used concurrently. Each loader creates its own
+    instances, which makes creating one loader per wrapper sufficient.
+    """
+
+    def __init__(self, strategies: Optional[List[AnalysisStrategy]] = None) -> None:
         self.strategies = []
-        self.strategies.extend(self.default_strategies())
+        self.strategies.extend(strategies if strategies is not None else self.default_strategies())
 
     def get_strategies(self) -> List[AnalysisStrategy]:
         return self.strategies
@@ -40,4 +51,4 @@ class StrategyLoader(metaclass=Singleton):
             strategy.reset()
 
     def default_strategies(self) -> List[AnalysisStrategy]:
-        return [Strategy() for Strategy in STRATEGIES.values()]
+        return create_strategies()
@@ -0,0 +1,207 @@
+import gc
+import logging
+import os
+import tracemalloc
+
+from typing import Dict, List, Optional, Text, Tuple
+
+from ithildin.analysis.base import AnalysisStrategy
+from ithildin.analysis.search import base_strategy
+
+from mythril.laser.ethereum.state.global_state import GlobalState
+from mythril.laser.ethereum.svm import LaserEVM
+from mythril.support.support_args import args as mythril_args
+
+log = logging.getLogger(__name__)
+
+# Number of executed states between two samples
+DEFAULT_SAMPLE_INTERVAL = 500
+# Number of allocation sites reported when tracing allocations
+TOP_ALLOCATORS = 10
+
+
+def current_rss() -> Optional[int]:
+    """
+    Returns the resident set size of this process in bytes, None where /proc isn't available. The peak RSS reported by
+    getrusage() isn't used as a fallback, as it covers the lifetime of the process rather than a single analysis.
+    """
+    try:
+        with open('/proc/self/statm', 'r') as statm_file:
+            return int(statm_file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, ValueError, IndexError):
+        return None
+
+
+class MemoryUsage:
+    """
+    High-water marks of the memory related quantities sampled during an analysis. The peak RSS is the highest RSS
+    sampled, None if the RSS couldn't be sampled.
+    """
+
+    def __init__(self, samples: int = 0, peak_rss: Optional[int] = None, peak_open_states: int = 0, peak_work_list: int = 0,
+                 total_states: int = 0, peak_stack_annotations: int = 0, peak_cache_sizes: Optional[Dict[Text, Dict[Text, int]]] = None,
+                 soft_limit: Optional[int] = None, soft_limit_reached: bool = False, pruned_states: int = 0,
+                 peak_traced_memory: Optional[int] = None, top_allocators: Optional[List[Tuple[Text, int, int]]] = None) -> None:
+        self.samples = samples
+        self.peak_rss = peak_rss
+        self.peak_open_states = peak_open_states
+        self.peak_work_list = peak_work_list
+        self.total_states = total_states
+        self.peak_stack_annotations = peak_stack_annotations
+        self.peak_cache_sizes = peak_cache_sizes or {}
+        self.soft_limit = soft_limit
+        self.soft_limit_reached = soft_limit_reached
+        self.pruned_states = pruned_states
+        self.peak_traced_memory = peak_traced_memory
+        self.top_allocators = top_allocators or []
+
+    def to_dict(self) -> Dict:
+        as_dict = {
+            'samples': self.samples,
+            'peakRss': self.peak_rss,
+            'peakOpenStates': self.peak_open_states,
+            'peakWorkList': self.peak_work_list,
+            'totalStates': self.total_states,
+            'peakStackAnnotations': self.peak_stack_annotations,
+            'peakCacheSizes': self.peak_cache_sizes,
+            'softLimit': self.soft_limit,
+            'softLimitReached': self.soft_limit_reached,
+            'prunedStates': self.pruned_states
+        }
+        if self.peak_traced_memory is not None:
+            as_dict['peakTracedMemory'] = self.peak_traced_memory
+            as_dict['topAllocators'] = [{'location': location, 'size': size, 'count': count}
+                                        for location, size, count in self.top_allocators]
+        return as_dict
+
+    def __repr__(self):
+        return (
+            '<MemoryUsage '
+            'samples={0.samples} '
+            'peak_rss={0.peak_rss} '
+            'peak_open_states={0.peak_open_states} '
+            'peak_work_list={0.peak_work_list} '
+            'total_states={0.total_states} '
+            'soft_limit_reached={0.soft_limit_reached} '
+            'pruned_states={0.pruned_states}'
+            '>'
+        ).format(self)
+
+
+class MemorySamplingPlugin:
+    """
+    Samples the memory usage of symbolic execution every *sample_interval* executed states: the open world states and
+    the work list of the Laser EVM, the annotations the strategies put on the stack of the executed state, the caches
+    of the strategies and the RSS of the process. With *trace_allocations*, tracemalloc reports the top allocation
+    sites at the end of the analysis, which slows down execution considerably.
+
+    Once the RSS exceeds *soft_limit* bytes, pruning becomes more aggressive: Laser checks the reachability of every new
+    state instead of only at the start of transactions, and half of the pending work list is dropped at every sample
+    taken while the RSS stays above the limit. The dropped states are the oldest ones, which depth-first search would
+    have explored last.
+    """
+
+    def __init__(self, strategies: List[AnalysisStrategy], sample_interval: int = DEFAULT_SAMPLE_INTERVAL,
+                 soft_limit: Optional[int] = None, trace_allocations: bool = False) -> None:
+        assert sample_interval > 0, 'Sample interval must be positive'
+        self.strategies = strategies
+        self.sample_interval = sample_interval
+        self.soft_limit = soft_limit
+        self.trace_allocations = trace_allocations
+        self.usage = MemoryUsage(soft_limit=soft_limit)
+        self._states_until_sample = sample_interval
+        self._sparse_pruning = mythril_args.sparse_pruning
+        self._started_tracing = False
+
+    def initialize(self, symbolic_vm: LaserEVM) -> None:
+        self.reset()
+
+        @symbolic_vm.laser_hook('start_sym_exec')
+        def start_sym_exec_hook():
+            self._sparse_pruning = mythril_args.sparse_pruning
+            if self.soft_limit is not None and current_rss() is None:
+                log.warning('The RSS cannot be sampled on this platform, the memory soft limit is ignored')
+            if self.trace_allocations and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+
+        @symbolic_vm.laser_hook('execute_state')
+        def execute_state_hook(global_state: GlobalState):
+            self._states_until_sample -= 1
+            if self._states_until_sample <= 0:
+                self._states_until_sample = self.sample_interval
+                self._sample(symbolic_vm, global_state)
+
+        @symbolic_vm.laser_hook('stop_sym_exec')
+        def stop_sym_exec_hook():
+            self._sample(symbolic_vm, None)
+            self.finish()
+
+    def reset(self) -> None:
+        """ Resets the usage, so that the plugin can be reused for another execution without registering its hooks again. """
+        self.usage = MemoryUsage(soft_limit=self.soft_limit)
+        self._states_until_sample = self.sample_interval
+
+    def finish(self) -> None:
+        """ Restores Mythril's pruning setting and stops tracing allocations, also called if execution failed. """
+        mythril_args.sparse_pruning = self._sparse_pruning
+        if self._started_tracing:
+            snapshot = tracemalloc.take_snapshot()
+            self.usage.peak_traced_memory = tracemalloc.get_traced_memory()[1]
+            self.usage.top_allocators = [(str(statistic.traceback), statistic.size, statistic.count)
+                                         for statistic in snapshot.statistics('lineno')[:TOP_ALLOCATORS]]
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def get_memory_usage(self) -> MemoryUsage:
+        self._sample_rss()
+        return self.usage
+
+    def _sample(self, symbolic_vm: LaserEVM, global_state: Optional[GlobalState]) -> None:
+        usage = self.usage
+        usage.samples += 1
+        usage.peak_open_states = max(usage.peak_open_states, len(symbolic_vm.open_states))
+        usage.peak_work_list = max(usage.peak_work_list, _pending_states(symbolic_vm))
+        usage.total_states = symbolic_vm.total_states
+        if global_state is not None:
+            annotations = sum(len(item.annotations) for item in global_state.mstate.stack if hasattr(item, 'annotations'))
+            usage.peak_stack_annotations = max(usage.peak_stack_annotations, annotations)
+        for strategy in self.strategies:
+            cache_sizes = usage.peak_cache_sizes.setdefault(strategy.pattern_name, {})
+            for name, size in strategy.cache_sizes().items():
+                cache_sizes[name] = max(cache_sizes.get(name, 0), size)
+        rss = self._sample_rss()
+        if self.soft_limit is not None and rss is not None and rss > self.soft_limit:
+            self._prune(symbolic_vm, rss)
+
+    def _sample_rss(self) -> Optional[int]:
+        rss = current_rss()
+        if rss is not None:
+            self.usage.peak_rss = max(self.usage.peak_rss or 0, rss)
+        return rss
+
+    def _prune(self, symbolic_vm: LaserEVM, rss: int) -> None:
+        if not self.usage.soft_limit_reached:
+            log.warning('RSS of %d MB exceeds the soft limit of %d MB, pruning aggressively', rss // 1048576, self.soft_limit // 1048576)
+            self.usage.soft_limit_reached = True
+            mythril_args.sparse_pruning = False
+        search_strategy = base_strategy(symbolic_vm.strategy)
+        if hasattr(search_strategy, 'drop_oldest'):
+            # Strategies keeping their own queues, e.g. the guard-first strategy, drop their deep states
+            drop_count = search_strategy.drop_oldest(_pending_states(symbolic_vm) // 2)
+        else:
+            # The work list is shared with the search strategy, so it has to be modified in place
+            drop_count = len(symbolic_vm.work_list) // 2
+            del symbolic_vm.work_list[:drop_count]
+        if drop_count > 0:
+            self.usage.pruned_states += drop_count
+            log.info('Dropped %d pending states to reduce memory usage', drop_count)
+        gc.collect()
+
+
+def _pending_states(symbolic_vm: LaserEVM) -> int:
+    """ Returns the number of states waiting to be executed, including those queued by the search strategy. """
+    search_strategy = base_strategy(symbolic_vm.strategy)
+    if hasattr(search_strategy, 'pending_states'):
+        return search_strategy.pending_states()
+    return len(symbolic_vm.work_list)
@@ -0,0 +1,195 @@
+import logging
+
+from copy import copy
+from typing import Dict, Optional, Text
+
+from ithildin.analysis.functions import dispatcher_entries
+
+from mythril.disassembler.disassembly import Disassembly
+from mythril.laser.ethereum.state.annotation import StateAnnotation
+from mythril.laser.ethereum.state.global_state import GlobalState
+from mythril.laser.ethereum.svm import LaserEVM
+from mythril.laser.plugin.interface import LaserPlugin
+from mythril.laser.plugin.signals import PluginSkipState, PluginSkipWorldState
+from mythril.support.opcodes import opcodes
+
+log = logging.getLogger(__name__)
+
+# Opcodes changing state or handing control to another contract, which only paths past the guards of a function reach.
+# STATICCALL is left out, since signature checks call the ecrecover precompile before deciding.
+EFFECT_OPCODES = {'SSTORE', 'CALL', 'CALLCODE', 'DELEGATECALL', 'CREATE', 'CREATE2', 'SELFDESTRUCT',
+                  'LOG0', 'LOG1', 'LOG2', 'LOG3', 'LOG4'}
+
+# Opcodes of all instructions Laser executes. The disassembler names bytes missing from Mythril's opcode table
+# 'INVALID', e.g. PUSH0 and BASEFEE, which Laser executes as such.
+INSTRUCTION_OPCODES = {opcode for opcode, _, _, _ in opcodes.values()} | {'INVALID'}
+
+
+class PrologueBound:
+    """
+    Bounds each path entering a function through the dispatcher to the function's prologue, where its guards are: at
+    most *jumpis* JUMPIs and *instructions* instructions are executed from the function's entry point, and with
+    *effects* the path ends at its first state changing instruction or external call (see EFFECT_OPCODES). Any
+    combination of bounds can be given. Reports record the bound together with the number of *dropped_states*.
+    """
+
+    def __init__(self, jumpis: Optional[int] = None, instructions: Optional[int] = None, effects: bool = False,
+                 dropped_states: int = 0) -> None:
+        assert jumpis is None or jumpis >= 0, 'Number of JUMPIs must not be negative'
+        assert instructions is None or instructions > 0, 'Number of instructions must be positive'
+        self.jumpis = jumpis
+        self.instructions = instructions
+        self.effects = effects
+        self.dropped_states = dropped_states
+
+    @property
+    def enabled(self) -> bool:
+        return self.jumpis is not None or self.instructions is not None or self.effects
+
+    @property
+    def description(self) -> Text:
+        bounds = []
+        if self.jumpis is not None:
+            bounds.append('{} JUMPIs'.format(self.jumpis))
+        if self.instructions is not None:
+            bounds.append('{} instructions'.format(self.instructions))
+        if self.effects:
+            bounds.append('first effect')
+        return ', '.join(bounds)
+
+    def exceeded(self, jumpis: int, instructions: int, opcode: Text) -> bool:
+        """ Whether a path that executed *jumpis* JUMPIs and *instructions* instructions must end before *opcode*. """
+        return ((self.jumpis is not None and jumpis > self.jumpis) or
+                (self.instructions is not None and instructions > self.instructions) or
+                (self.effects and opcode in EFFECT_OPCODES))
+
+    def to_dict(self) -> Dict:
+        return {
+            'jumpis': self.jumpis,
+            'instructions': self.instructions,
+            'effects': self.effects,
+            'droppedStates': self.dropped_states
+        }
+
+    def __repr__(self):
+        return (
+            '<PrologueBound '
+            'jumpis={0.jumpis} '
+            'instructions={0.instructions} '
+            'effects={0.effects} '
+            'dropped_states={0.dropped_states}'
+            '>'
+        ).format(self)
+
+
+class PrologueAnnotation(StateAnnotation):
+    """ Counts the JUMPIs and instructions a path executed since it entered a function through the dispatcher. """
+
+    def __init__(self) -> None:
+        self.jumpis = 0
+        self.instructions = 0
+        self.dropped = False
+
+    def __copy__(self) -> 'PrologueAnnotation':
+        annotation = PrologueAnnotation()
+        annotation.jumpis = self.jumpis
+        annotation.instructions = self.instructions
+        return annotation
+
+
+class PrologueBoundPlugin(LaserPlugin):
+    """
+    Drops the paths of a function once they leave its prologue, as given by a *PrologueBound*, so that the time budget
+    goes to the guards of other functions rather than to transfer logic, loops and external calls behind the guards.
+
+    The budget of a path starts when it takes a dispatcher branch into a function (see *dispatcher_entries()*), so the
+    dispatcher and the fallback function are not bounded. A path is dropped before executing the instruction that
+    exceeds the bound. Since the plugin is registered after the strategies, their hooks still see that instruction.
+    The world state of a dropped path is not carried over to the next transaction.
+
+    Without a bound, the plugin does nothing, so that it can be registered once and enabled per contract. Its hooks are
+    only registered with the first bound, so that sessions without a bound don't pay for them.
+    """
+
+    def __init__(self, bound: Optional[PrologueBound] = None) -> None:
+        self.bound: Optional[PrologueBound] = None
+        self.dropped_states = 0
+        self._entries: Dict[Text, Dict[int, Text]] = {}
+        self._symbolic_vm: Optional[LaserEVM] = None
+        self._hooks_registered = False
+        self.reset(bound)
+
+    def reset(self, bound: Optional[PrologueBound] = None) -> None:
+        self.bound = bound if bound is not None and bound.enabled else None
+        self.dropped_states = 0
+        self._entries = {}
+        if self.bound is not None:
+            self._register_hooks()
+
+    def get_bound(self) -> Optional[PrologueBound]:
+        """ Returns the bound of the last contract with the number of states dropped, None if it wasn't bounded. """
+        if self.bound is None:
+            return None
+        bound = copy(self.bound)
+        bound.dropped_states = self.dropped_states
+        return bound
+
+    def initialize(self, symbolic_vm: LaserEVM) -> None:
+        """ Remembers *symbolic_vm*, whose hooks are only registered once a bound is set. """
+        self._symbolic_vm = symbolic_vm
+        if self.bound is not None:
+            self._register_hooks()
+
+    def _register_hooks(self) -> None:
+        # A pre hook on every instruction costs unbounded sessions a good part of their throughput
+        if self._hooks_registered or self._symbolic_vm is None:
+            return
+        self._hooks_registered = True
+        symbolic_vm = self._symbolic_vm
+
+        @symbolic_vm.post_hook('JUMPI')
+        def jumpi_hook(global_state: GlobalState):
+            if self.bound is None or len(global_state.transaction_stack) != 1:
+                return
+            if _prologue_annotation(global_state) is not None:
+                return
+            try:
+                address = global_state.get_current_instruction()['address']
+            except IndexError:
+                return
+            if address in self._dispatcher_entries(global_state.environment.code):
+                global_state.annotate(PrologueAnnotation())
+
+        def instruction_hook(global_state: GlobalState):
+            if self.bound is None:
+                return
+            annotation = _prologue_annotation(global_state)
+            if annotation is None:
+                return
+            opcode = global_state.get_current_instruction()['opcode']
+            annotation.instructions += 1
+            if opcode == 'JUMPI':
+                annotation.jumpis += 1
+            if self.bound.exceeded(annotation.jumpis, annotation.instructions, opcode):
+                annotation.dropped = True
+                self.dropped_states += 1
+                raise PluginSkipState
+
+        for opcode in INSTRUCTION_OPCODES:
+            symbolic_vm.pre_hook(opcode)(instruction_hook)
+
+        @symbolic_vm.laser_hook('add_world_state')
+        def world_state_hook(global_state: GlobalState):
+            # Laser keeps the world state of a state skipped in a pre hook for the next transaction
+            annotation = _prologue_annotation(global_state)
+            if annotation is not None and annotation.dropped:
+                raise PluginSkipWorldState
+
+    def _dispatcher_entries(self, disassembly: Disassembly) -> Dict[int, Text]:
+        if disassembly.bytecode not in self._entries:
+            self._entries[disassembly.bytecode] = dispatcher_entries(disassembly.instruction_list)
+        return self._entries[disassembly.bytecode]
+
+
+def _prologue_annotation(global_state: GlobalState) -> Optional[PrologueAnnotation]:
+    return next(iter(global_state.get_annotations(PrologueAnnotation)), None)
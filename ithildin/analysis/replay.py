@@ -0,0 +1,185 @@
+import logging
+import os
+import time
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Text, Tuple
+
+from mythril.laser.smt import symbol_factory
+
+from ithildin.analysis.base import AnalysisStrategy
+from ithildin.analysis.trace import HOOK_PRE, StackElement, StateRecord, TraceEvent, TraceReader
+from ithildin.report.analysis import post_process_report, Report
+
+log = logging.getLogger(__name__)
+
+
+class AnnotationLog:
+    """
+    Shared record of the annotations added to and discarded from replayed stack elements. Mythril copies annotations
+    to derived expressions, so the annotations of an element are computed from the changes made to the element itself
+    and to all elements it has been derived from, applied in the order they were made.
+    """
+
+    def __init__(self) -> None:
+        self._changes: Dict[int, List[Tuple[int, bool, Any]]] = defaultdict(list)
+        self._sequence = 0
+
+    def add(self, tag: int, annotation: Any) -> None:
+        self._record(tag, True, annotation)
+
+    def discard(self, tag: int, annotation: Any) -> None:
+        self._record(tag, False, annotation)
+
+    def annotations(self, tags: Iterable[int]) -> Set[Any]:
+        changes = sorted(change for tag in tags for change in self._changes.get(tag, []))
+        annotations = set()
+        for _, added, annotation in changes:
+            if added:
+                annotations.add(annotation)
+            else:
+                annotations.discard(annotation)
+        return annotations
+
+    def _record(self, tag: int, added: bool, annotation: Any) -> None:
+        self._changes[tag].append((self._sequence, added, annotation))
+        self._sequence += 1
+
+
+class AnnotationView(set):
+    """ Snapshot of the annotations of a replayed element, forwarding modifications to the annotation log. """
+
+    def __init__(self, element: 'ReplayValue') -> None:
+        super().__init__(element.log.annotations(element.tags))
+        self._element = element
+
+    def add(self, annotation: Any) -> None:
+        super().add(annotation)
+        self._element.log.add(self._element.tag, annotation)
+
+    def discard(self, annotation: Any) -> None:
+        super().discard(annotation)
+        self._element.log.discard(self._element.tag, annotation)
+
+
+class ReplayValue:
+    """ Stands in for a Mythril BitVec on the stack of a replayed state. """
+
+    def __init__(self, element: StackElement, log: AnnotationLog) -> None:
+        self.tag = element.tag
+        self.tags = (element.tag,) + element.ancestor_tags
+        self.value = element.value
+        self.log = log
+
+    @property
+    def symbolic(self) -> bool:
+        return self.value is None
+
+    @property
+    def annotations(self) -> AnnotationView:
+        return AnnotationView(self)
+
+    def annotate(self, annotation: Any) -> None:
+        self.log.add(self.tag, annotation)
+
+
+class ReplayStack:
+    """ Stack of a replayed state, of which only the topmost elements are available. """
+
+    def __init__(self, size: int, elements: List[ReplayValue]) -> None:
+        self._size = size
+        self._elements = elements
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> ReplayValue:
+        if not -len(self._elements) <= index < 0:
+            raise IndexError('Stack element {} has not been recorded'.format(index))
+        return self._elements[-index - 1]
+
+
+class ReplayMemory:
+    """ Memory of a replayed state, holding the recorded bytes. Symbolic bytes are replaced by fresh symbols. """
+
+    def __init__(self, offset: int, data: List[Optional[int]]) -> None:
+        self._offset = offset
+        self._data = data
+
+    def __getitem__(self, item: slice) -> List:
+        return [self._byte(index) for index in range(item.start, item.stop)]
+
+    def _byte(self, index: int):
+        if not self._offset <= index < self._offset + len(self._data):
+            return 0
+        byte = self._data[index - self._offset]
+        return byte if byte is not None else symbol_factory.BitVecSym('replay_memory_{}'.format(index), 8)
+
+
+class ReplayMachineState:
+
+    def __init__(self, stack: ReplayStack, memory: ReplayMemory) -> None:
+        self.stack = stack
+        self.memory = memory
+
+
+class ReplayEnvironment:
+
+    def __init__(self, active_function_name: Text) -> None:
+        self.active_function_name = active_function_name
+
+
+class ReplayNode:
+
+    def __init__(self, states: List['ReplayState']) -> None:
+        self.states = states
+
+
+class ReplayState:
+    """ Stands in for a Mythril GlobalState, providing the parts that strategies access. """
+
+    def __init__(self, record: StateRecord, function_name: Text, log: AnnotationLog, memory: ReplayMemory,
+                 prev_state: Optional['ReplayState'] = None) -> None:
+        self.instruction = {'opcode': record.opcode}
+        self.mstate = ReplayMachineState(ReplayStack(record.stack_size, [ReplayValue(element, log) for element in record.stack]), memory)
+        self.environment = ReplayEnvironment(function_name)
+        self.node = ReplayNode([prev_state] if prev_state is not None else [])
+
+
+def replay_trace(path: Text, strategies: List[AnalysisStrategy]) -> Report:
+    """
+    Feeds the events of the trace file at *path* to *strategies*, calling each strategy for the events of the opcodes
+    it hooks, and returns the resulting report. Strategies may only hook opcodes that have been recorded.
+    """
+    start_time = time.time()
+    trace = TraceReader(path)
+    for strategy in strategies:
+        missing_hooks = (set(strategy.pre_hooks) - set(trace.metadata.get('preHooks', [])) |
+                         set(strategy.post_hooks) - set(trace.metadata.get('postHooks', [])))
+        if len(missing_hooks) > 0:
+            log.warning('Trace %s lacks opcodes hooked by %s: %s', path, strategy.pattern_name, ', '.join(sorted(missing_hooks)))
+
+    annotation_log = AnnotationLog()
+    for event in trace.events():
+        state = _replay_state(event, annotation_log)
+        for strategy in strategies:
+            hooks = strategy.pre_hooks if event.hook_type == HOOK_PRE else strategy.post_hooks
+            if event.hooked_opcode in hooks:
+                strategy.execute(state)
+
+    report = Report(start_time=start_time, end_time=time.time())
+    report.contract_address = trace.metadata.get('contractAddress')
+    if report.contract_address is None:
+        report.contract_name = os.path.splitext(os.path.basename(path))[0]
+    for strategy in strategies:
+        report.add_report(strategy.generate_report())
+    post_process_report(report, None, None)
+    return report
+
+
+def _replay_state(event: TraceEvent, annotation_log: AnnotationLog) -> ReplayState:
+    memory = ReplayMemory(event.memory_offset, event.memory)
+    prev_state = None
+    if event.prev_state is not None:
+        prev_state = ReplayState(event.prev_state, event.function_name, annotation_log, memory)
+    return ReplayState(event.state, event.function_name, annotation_log, memory, prev_state)
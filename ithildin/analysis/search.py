@@ -0,0 +1,157 @@
+import heapq
+import logging
+
+from collections import defaultdict
+from itertools import count
+from typing import Dict, List, Optional, Text, Tuple
+
+from mythril.laser.ethereum.state.annotation import StateAnnotation
+from mythril.laser.ethereum.state.global_state import GlobalState
+from mythril.laser.ethereum.strategy import BasicSearchStrategy
+from mythril.laser.ethereum.strategy.basic import BreadthFirstSearchStrategy, DepthFirstSearchStrategy
+from mythril.laser.ethereum.svm import LaserEVM
+
+log = logging.getLogger(__name__)
+
+
+class GuardDepthAnnotation(StateAnnotation):
+    """ State annotation memorizing the function a path is in and the number of JUMPIs it executed in the function. """
+
+    def __init__(self, function_name: Optional[Text] = None, jumpi_count: int = 0) -> None:
+        self.function_name = function_name
+        self.jumpi_count = jumpi_count
+
+    def __copy__(self):
+        return GuardDepthAnnotation(self.function_name, self.jumpi_count)
+
+
+class GuardFirstSearchStrategy(BasicSearchStrategy):
+    """
+    Search strategy aimed at authorization checks, which are usually decided by the first few conditional jumps after
+    the dispatcher jumps into a function.
+
+    States of the dispatcher (i.e. outside of any known function, including the fallback function) are explored first
+    and breadth-first, so that every function entry is reached early. States inside a function that have executed at
+    most *guard_depth* JUMPIs since the function entry are explored next, level by level across all functions,
+    preferring the functions that have been explored the least. Only once no such state is left, the remaining (deep)
+    states are explored depth-first.
+
+    JUMPIs are counted by a hook registered with *initialize()*, so that unconditional jumps, e.g. into internal
+    functions such as *_checkOwner()* or *_msgSender()*, don't count. Laser appends new states to the work list, from
+    where they are moved into a priority queue and a stack of deep states, whose sizes are returned by *pending_states()*.
+    The priority of a state is decided when it's moved, so the exploration counts of the functions are the ones of that
+    step. A single successor in the same function and at the same JUMPI count as the last state is executed right away,
+    so that paths only interleave where they branch; strategies such as Roles carry state from one instruction of a path
+    to the next.
+    """
+
+    guard_depth = 3
+
+    def __init__(self, work_list, max_depth) -> None:
+        super().__init__(work_list, max_depth)
+        self.function_visits: Dict[Text, int] = defaultdict(int)
+        self._guard_states: List[Tuple[Tuple[int, int, int, int], int, GlobalState]] = []
+        self._deep_states: List[GlobalState] = []
+        self._sequence = count()
+        self._last_level: Optional[Tuple[Optional[Text], int]] = None
+
+    def initialize(self, symbolic_vm: LaserEVM) -> None:
+        """ Registers the hook counting the JUMPIs of each path, called once by the session owning *symbolic_vm*. """
+
+        @symbolic_vm.pre_hook('JUMPI')
+        def jumpi_hook(global_state: GlobalState):
+            function_name = _function_name(global_state)
+            if function_name is None:
+                return
+            annotation = _guard_depth_annotation(global_state)
+            if annotation.function_name != function_name:
+                annotation.function_name = function_name
+                annotation.jumpi_count = 0
+            annotation.jumpi_count += 1
+
+    def reset(self) -> None:
+        """ Drops the queued states and exploration counts, so that the strategy can be reused for another contract. """
+        self.function_visits = defaultdict(int)
+        self._guard_states = []
+        self._deep_states = []
+        self._last_level = None
+
+    def pending_states(self) -> int:
+        return len(self.work_list) + len(self._guard_states) + len(self._deep_states)
+
+    def drop_oldest(self, drop_count: int) -> int:
+        """ Drops up to *drop_count* of the deep states that would be explored last, and returns the number dropped. """
+        drop_count = min(drop_count, len(self._deep_states))
+        del self._deep_states[:drop_count]
+        return drop_count
+
+    def get_strategic_global_state(self) -> GlobalState:
+        if len(self.work_list) == 1 and self._level(self.work_list[0]) == self._last_level:
+            # Linear successor of the last state
+            return self.work_list.pop()
+        for state in self.work_list:
+            priority = self._priority(state)
+            if priority is None:
+                self._deep_states.append(state)
+            else:
+                heapq.heappush(self._guard_states, (priority, next(self._sequence), state))
+        # The work list is shared with Laser, so it has to be cleared in place
+        del self.work_list[:]
+        if len(self._guard_states) == 0:
+            # Only deep states are left, continue depth-first
+            state = self._deep_states.pop()
+        else:
+            state = heapq.heappop(self._guard_states)[2]
+            self.function_visits[state.environment.active_function_name] += 1
+        self._last_level = self._level(state)
+        return state
+
+    def _priority(self, state: GlobalState) -> Optional[Tuple[int, int, int, int]]:
+        """ Returns the priority of *state* (lower is better), or None if the state is past the function's guards. """
+        function_name, jumpi_count = self._level(state)
+        if function_name is None:
+            return 0, 0, 0, state.mstate.depth
+        if jumpi_count > self.guard_depth:
+            return None
+        return 1, jumpi_count, self.function_visits[function_name], state.mstate.depth
+
+    @staticmethod
+    def _level(state: GlobalState) -> Tuple[Optional[Text], int]:
+        """ Returns the function *state* is in and the number of JUMPIs it executed in the function. """
+        function_name = _function_name(state)
+        if function_name is None:
+            return None, 0
+        annotation = next(iter(state.get_annotations(GuardDepthAnnotation)), None)
+        return function_name, annotation.jumpi_count if annotation is not None and annotation.function_name == function_name else 0
+
+
+def base_strategy(search_strategy: BasicSearchStrategy) -> BasicSearchStrategy:
+    """ Returns the search strategy wrapped by the strategy extensions of *search_strategy*, e.g. bounded loops. """
+    while getattr(search_strategy, 'super_strategy', None) is not None:
+        search_strategy = search_strategy.super_strategy
+    return search_strategy
+
+
+def _function_name(state: GlobalState) -> Optional[Text]:
+    """ Returns the function *state* is in, None if it's in the dispatcher. """
+    function_name = state.environment.active_function_name
+    # Laser names the dispatcher 'fallback' as well as the fallback function, which is reached without a jump
+    if function_name not in state.environment.code.function_name_to_address:
+        return None
+    return function_name
+
+
+def _guard_depth_annotation(state: GlobalState) -> GuardDepthAnnotation:
+    annotations = list(state.get_annotations(GuardDepthAnnotation))
+    if len(annotations) > 0:
+        return annotations[0]
+    annotation = GuardDepthAnnotation()
+    state.annotate(annotation)
+    return annotation
+
+
+SEARCH_STRATEGIES = {
+    'dfs': DepthFirstSearchStrategy,
+    'bfs': BreadthFirstSearchStrategy,
+    'guard-first': GuardFirstSearchStrategy
+}
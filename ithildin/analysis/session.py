@@ -0,0 +1,271 @@
+import logging
+import threading
+import time
+
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, List, Optional, Set, Text, Type
+
+from ithildin.analysis.base import AnalysisStrategy
+from ithildin.analysis.cancellation import CancellationToken
+from ithildin.analysis.coverage import CoveragePlateauPlugin
+from ithildin.analysis.functions import FunctionSelectorPlugin
+from ithildin.analysis.memory import DEFAULT_SAMPLE_INTERVAL, MemorySamplingPlugin
+from ithildin.analysis.prologue import PrologueBound, PrologueBoundPlugin
+from ithildin.analysis.search import base_strategy
+from ithildin.analysis.trace import HOOK_POST, HOOK_PRE, recorded_hooks, TraceRecorder
+from ithildin.report.analysis import Report
+from ithildin.support.profiler import CATEGORY_HOOKS, Profiler
+
+from mythril.disassembler.disassembly import Disassembly
+from mythril.laser.ethereum import svm
+from mythril.laser.ethereum.state.global_state import GlobalState
+from mythril.laser.ethereum.state.world_state import WorldState
+from mythril.laser.ethereum.strategy import BasicSearchStrategy
+from mythril.laser.ethereum.strategy.basic import DepthFirstSearchStrategy
+from mythril.laser.ethereum.strategy.extensions.bounded_loops import BoundedLoopsStrategy
+from mythril.support.loader import DynLoader
+
+from mythril.laser.plugin.plugins import (
+    MutationPrunerBuilder,
+    DependencyPrunerBuilder,
+    # CallDepthLimitBuilder,
+    InstructionProfilerBuilder,
+)
+
+log = logging.getLogger(__name__)
+
+# Laser's default timeout for contract creation, which the coverage plateau plugin lowers to stop execution
+CREATE_TIMEOUT = 10
+
+# Held while a session executes a contract, since Laser relies on process-wide state, e.g. its time handler, the keccak
+# function manager and z3's default context, which concurrent executions in different threads would corrupt
+LASER_LOCK = threading.RLock()
+
+
+class AnalysisSession:
+    """
+    A Laser EVM set up once and reused to analyze many contracts, one at a time. The hooks of the *strategies*, the
+    bounded loops extension of the *search_strategy*, Mythril's pruning plugins and the coverage, memory and prologue
+    bound plugins are registered when the session is created. Before each contract, only the per-contract state is
+    reset: the open states and work list of the Laser EVM, its timeouts and depth limit, the state of the plugins, the
+    selected functions, the prologue bound and the results of the strategies run on the contract. After each contract,
+    the states are released again, so that no state of one contract is seen by, or kept alive during, the analysis of
+    the next one.
+
+    Traces can only be recorded if the session is created with *record_traces*, since the recording hooks have to be
+    registered before the strategies' hooks.
+
+    Sessions in different threads run one at a time, each holding *LASER_LOCK* while it executes a contract. A contract
+    executed with a *CancellationToken* stops before the next executed state once the token has been cancelled.
+    """
+
+    def __init__(self,
+                 strategies: List[AnalysisStrategy],
+                 bounded_loops_limit: Optional[int] = 3,
+                 search_strategy: Type[BasicSearchStrategy] = DepthFirstSearchStrategy,
+                 plateau_seconds: Optional[float] = None,
+                 plateau_states: Optional[int] = None,
+                 memory_sample_interval: int = DEFAULT_SAMPLE_INTERVAL,
+                 memory_soft_limit: Optional[int] = None,
+                 trace_allocations: bool = False,
+                 record_traces: bool = False) -> None:
+        assert strategies is not None and len(strategies) > 0, 'No strategies provided'
+        self.strategies = list(strategies)
+        self.record_traces = record_traces
+        self.laser = svm.LaserEVM(strategy=search_strategy, requires_statespace=False)
+        self.contracts_analyzed = 0
+        self._active_strategies: Set[AnalysisStrategy] = set()
+        self._creation_mode = False
+        self._recorder: Optional[TraceRecorder] = None
+        self._cancellation_token: Optional[CancellationToken] = None
+
+        if record_traces:
+            # Registered before the strategies' hooks, so that states are recorded before strategies annotate them
+            pre_hooks, post_hooks = recorded_hooks()
+            for opcode in pre_hooks:
+                self.laser.register_hooks('pre', {opcode: [self._trace_hook(HOOK_PRE, opcode)]})
+            for opcode in post_hooks:
+                self.laser.register_hooks('post', {opcode: [self._trace_hook(HOOK_POST, opcode)]})
+        Profiler().instrument(self.laser, lambda: self._creation_mode)
+        for strategy in self.strategies:
+            hook_function = self._strategy_hook(strategy)
+            for hook in strategy.pre_hooks:
+                self.laser.register_hooks('pre', {hook: [hook_function]})
+            for hook in strategy.post_hooks:
+                self.laser.register_hooks('post', {hook: [hook_function]})
+
+        # Load laser plugins, references are kept so that their state can be reset per contract
+        self.laser.extend_strategy(BoundedLoopsStrategy, bounded_loops_limit)
+        if hasattr(base_strategy(self.laser.strategy), 'initialize'):
+            base_strategy(self.laser.strategy).initialize(self.laser)
+        # Temporarily disabled due to unhandled exception
+        # CallDepthLimitBuilder()(call_depth_limit=call_depth_limit)
+        self.plugins = [MutationPrunerBuilder()(), InstructionProfilerBuilder()(), DependencyPrunerBuilder()()]
+        for plugin in self.plugins:
+            plugin.initialize(self.laser)
+        self.coverage_plugin = CoveragePlateauPlugin(plateau_seconds, plateau_states)
+        self.coverage_plugin.initialize(self.laser)
+        self.memory_plugin = MemorySamplingPlugin(self.strategies, memory_sample_interval, memory_soft_limit, trace_allocations)
+        self.memory_plugin.initialize(self.laser)
+        self.function_plugin = FunctionSelectorPlugin()
+        self.function_plugin.initialize(self.laser)
+        self.prologue_plugin = PrologueBoundPlugin()
+        self.prologue_plugin.initialize(self.laser)
+        self.laser.register_laser_hooks('execute_state', self._check_cancellation)
+
+    def run(self,
+            strategies: Optional[List[AnalysisStrategy]] = None,
+            timeout: Optional[float] = 60,
+            max_depth: Optional[int] = 128,
+            creation_code: Optional[Text] = None,
+            target_address: Optional[Text] = None,
+            runtime_code: Optional[Text] = None,
+            dyn_loader: Optional[DynLoader] = None,
+            trace_path: Optional[Text] = None,
+            selectors: Optional[Iterable[Text]] = None,
+            cancellation_token: Optional[CancellationToken] = None,
+            prologue_bound: Optional[PrologueBound] = None) -> Report:
+        """
+        Symbolically executes a single contract, given either as *creation_code* or deployed at *target_address*, see
+        *LaserWrapper.execute()*. Only the *strategies* are run, which must be part of the session and default to all
+        of its strategies. Their results are reset before execution. If *selectors* are given, only the functions with
+        these selectors are executed, see *FunctionSelectorPlugin*. Paths of functions are bounded by *prologue_bound*
+        if given, see *PrologueBoundPlugin*. If the *cancellation_token* gets cancelled, execution stops and
+        *AnalysisCancelled* is raised.
+        """
+        strategies = self.strategies if strategies is None else strategies
+        assert all(strategy in self.strategies for strategy in strategies), 'Strategies must be part of the session'
+        assert trace_path is None or self.record_traces, 'Session has not been created to record traces'
+        # Building the world state creates z3 expressions as well, so it happens while holding the lock
+        with LASER_LOCK:
+            if cancellation_token is not None:
+                # Cancelled while waiting for the lock
+                cancellation_token.raise_if_cancelled()
+            world_state = None
+            if creation_code is not None and target_address is None:
+                log.info('Running symbolic execution in creation mode...')
+            elif creation_code is None and target_address is not None:
+                assert dyn_loader is not None or runtime_code is not None, "Dynamic Loader has not been provided"
+                log.info('Running symbolic execution in existing mode...')
+                world_state = WorldState()
+                if runtime_code is not None:
+                    world_state.create_account(address=int(target_address, 16),
+                                               dynamic_loader=dyn_loader,
+                                               code=Disassembly(runtime_code))
+                else:
+                    world_state.accounts_exist_or_load(target_address, dyn_loader)
+            else:
+                raise ValueError('Either creation_code or target_address needs to be provided')
+
+            self._reset(strategies, timeout, max_depth, dyn_loader, selectors, prologue_bound)
+            self._creation_mode = creation_code is not None
+            self._cancellation_token = cancellation_token
+            if trace_path is not None:
+                self._recorder = TraceRecorder(trace_path, {'contractAddress': target_address, 'creationMode': self._creation_mode})
+
+            # Run symbolic execution
+            profiler = Profiler()
+            start_time = time.time()
+            try:
+                with profiler.phase('symbolic execution'):
+                    self.laser.sym_exec(creation_code=creation_code,
+                                        contract_name='Unknown',
+                                        world_state=world_state,
+                                        target_address=int(target_address, 16) if target_address else None)
+                timed_out = self._timed_out()
+            finally:
+                self.memory_plugin.finish()
+                if self._recorder is not None:
+                    self._recorder.close()
+                    self._recorder = None
+                self._release()
+            log.info('Symbolic execution finished in %.2f seconds.', time.time() - start_time)
+            if self.function_plugin.skipped_states > 0:
+                log.info('Skipped %d states entering functions that were not selected', self.function_plugin.skipped_states)
+            if self.prologue_plugin.dropped_states > 0:
+                log.info('Dropped %d states beyond the prologue bound', self.prologue_plugin.dropped_states)
+            self.contracts_analyzed += 1
+
+            report = Report(start_time=start_time, end_time=time.time())
+            report.timed_out = timed_out
+            report.coverage = self.coverage_plugin.get_coverage()
+            report.memory = self.memory_plugin.get_memory_usage()
+            report.prologue_bound = self.prologue_plugin.get_bound()
+            with profiler.phase('report generation'):
+                for strategy in strategies:
+                    report.add_report(strategy.generate_report())
+            return report
+
+    def _reset(self, strategies: List[AnalysisStrategy], timeout: Optional[float], max_depth: Optional[int],
+               dyn_loader: Optional[DynLoader], selectors: Optional[Iterable[Text]] = None,
+               prologue_bound: Optional[PrologueBound] = None) -> None:
+        laser = self.laser
+        laser.open_states = []
+        # The work list is shared with the search strategy, so it has to be cleared in place
+        del laser.work_list[:]
+        laser.total_states = 0
+        laser.execution_info = []
+        laser.time = None
+        laser.dynamic_loader = dyn_loader
+        laser.execution_timeout = timeout or 0
+        laser.create_timeout = CREATE_TIMEOUT
+        laser.max_depth = max_depth
+        search_strategy = laser.strategy
+        while search_strategy is not None:
+            search_strategy.max_depth = max_depth
+            if hasattr(search_strategy, 'reset'):
+                search_strategy.reset()
+            search_strategy = getattr(search_strategy, 'super_strategy', None)
+        for plugin in self.plugins:
+            # Initializing Mythril's plugins again would register their hooks twice, so their state is reset directly
+            if hasattr(plugin, '_reset'):
+                plugin._reset()
+        self.coverage_plugin.reset()
+        self.memory_plugin.strategies = strategies
+        self.memory_plugin.reset()
+        self.function_plugin.reset(selectors)
+        self.prologue_plugin.reset(prologue_bound)
+        for strategy in strategies:
+            strategy.reset()
+        self._active_strategies = set(strategies)
+
+    def _release(self) -> None:
+        """ Drops the references to the states of the analyzed contract, the strategies' results are kept for the report. """
+        self.laser.open_states = []
+        del self.laser.work_list[:]
+        if hasattr(base_strategy(self.laser.strategy), 'reset'):
+            base_strategy(self.laser.strategy).reset()
+        self.laser.dynamic_loader = None
+        self._active_strategies = set()
+        self._cancellation_token = None
+
+    def _timed_out(self) -> bool:
+        """ Whether Laser stopped at its execution timeout, by Laser's own criterion, rather than at a coverage plateau. """
+        laser = self.laser
+        return not self.coverage_plugin.plateau_stop and laser.execution_timeout > 0 and \
+            datetime.now() >= laser.time + timedelta(seconds=laser.execution_timeout)
+
+    def _check_cancellation(self, state: GlobalState) -> None:
+        if self._cancellation_token is not None:
+            self._cancellation_token.raise_if_cancelled()
+
+    def _strategy_hook(self, strategy: AnalysisStrategy) -> Callable[[GlobalState], None]:
+        """ Returns the hook running *strategy* if it's run on the current contract, timed if the profiler is enabled. """
+        profiler = Profiler()
+        phase_name = 'hook {}'.format(strategy.pattern_name)
+
+        def hook(state: GlobalState) -> None:
+            if strategy not in self._active_strategies:
+                return
+            if profiler.enabled:
+                with profiler.phase(phase_name, CATEGORY_HOOKS):
+                    strategy.execute(state)
+            else:
+                strategy.execute(state)
+        return hook
+
+    def _trace_hook(self, hook_type: int, opcode: Text) -> Callable[[GlobalState], None]:
+        def hook(state: GlobalState) -> None:
+            if self._recorder is not None:
+                self._recorder.record(hook_type, opcode, state)
+        return hook
@@ -0,0 +1,190 @@
+import logging
+
+from typing import Dict, FrozenSet, List, Optional, Set, Text, Tuple
+
+from mythril.disassembler.disassembly import Disassembly
+from mythril.support.opcodes import opcodes
+
+log = logging.getLogger(__name__)
+
+# Upper bound of distinct abstract states at block entries, beyond which the analysis is inconclusive
+MAX_STATES = 20000
+MAX_STACK_SIZE = 1024
+
+# Tags of abstract stack values, mirroring the annotations of the Ownership strategy
+CALLER = ('CALLER',)
+COMPARED = ('COMPARED',)
+STORAGE = 'STORAGE'
+
+# Opcodes whose result carries the tags of their operands, as Mythril propagates annotations through these
+PROPAGATING_OPCODES = {name for code, (name, _, _, _) in opcodes.items() if 0x01 <= code <= 0x1D}
+HALTING_OPCODES = {'STOP', 'RETURN', 'REVERT', 'SUICIDE', 'SELFDESTRUCT', 'ASSERT_FAIL'}
+STACK_EFFECTS = {name: (inputs, outputs) for name, inputs, outputs, _ in opcodes.values()}
+# Opcodes Mythril's table gives a wrong stack effect (EXTCODEHASH takes one operand and pushes the hash)
+UNSUPPORTED_OPCODES = {'EXTCODEHASH'}
+# Opcodes writing to and reading from memory, Mythril's annotations flow through memory
+MEMORY_STORE_OPCODES = {'MSTORE', 'MSTORE8'}
+MEMORY_LOAD_OPCODES = {'MLOAD', 'SHA3'}
+
+Value = Tuple[Optional[int], FrozenSet[Tuple]]
+Stack = Tuple[Value, ...]
+# Entry index of a block, function name, stack and whether tagged values have been stored in memory
+Entry = Tuple[int, Text, Stack, bool]
+
+UNKNOWN: Value = (None, frozenset())
+
+
+class Inconclusive(Exception):
+    pass
+
+
+class StaticOwnershipResult:
+
+    def __init__(self, conclusive: bool, guarded_functions: Dict[Text, Optional[int]], explored_states: int,
+                 reason: Optional[Text] = None) -> None:
+        self.conclusive = conclusive
+        self.guarded_functions = guarded_functions
+        self.explored_states = explored_states
+        self.reason = reason
+
+    def __repr__(self):
+        return (
+            '<StaticOwnershipResult '
+            'conclusive={0.conclusive} '
+            'guarded_functions={0.guarded_functions} '
+            'explored_states={0.explored_states} '
+            'reason={0.reason}'
+            '>'
+        ).format(self)
+
+
+class StaticOwnershipAnalysis:
+    """
+    Abstract interpretation of the stack over the control flow graph of runtime code, tracking the provenance of
+    stack values instead of their contents. Values are tagged when produced by CALLER or by SLOAD with a constant
+    index of at most 0xFF, and the result of EQ is tagged as compared if one operand stems from CALLER and the other
+    from such an SLOAD. Tags are propagated through arithmetic, comparison and bitwise operations. A function is
+    guarded if one of its JUMPIs branches on a compared value.
+
+    Only constants pushed by PUSH and moved by DUP and SWAP are tracked concretely, which suffices to resolve the jump
+    targets of compiled Solidity. Memory isn't modelled, so a path loading from memory after storing a tagged value
+    in it is inconclusive. The result is also inconclusive whenever a jump target cannot be resolved, an unknown or
+    unsupported opcode is reached, or the number of abstract states exceeds MAX_STATES.
+    """
+
+    def __init__(self, disassembly: Disassembly) -> None:
+        self.disassembly = disassembly
+        self.instructions = disassembly.instruction_list
+        self.address_to_index = {instruction['address']: index for index, instruction in enumerate(self.instructions)}
+
+    def analyze(self) -> StaticOwnershipResult:
+        guarded_functions: Dict[Text, Optional[int]] = {}
+        visited: Set[Entry] = set()
+        work_list: List[Entry] = [(0, 'fallback', (), False)]
+        try:
+            while len(work_list) > 0:
+                entry = work_list.pop()
+                if entry in visited:
+                    continue
+                visited.add(entry)
+                if len(visited) > MAX_STATES:
+                    raise Inconclusive('state limit of {} exceeded'.format(MAX_STATES))
+                work_list.extend(self._execute_block(*entry, guarded_functions))
+        except Inconclusive as e:
+            log.info('Static ownership analysis inconclusive: %s', e)
+            return StaticOwnershipResult(False, guarded_functions, len(visited), reason=str(e))
+        log.info('Static ownership analysis explored %d states, found %d guarded function(s)', len(visited), len(guarded_functions))
+        return StaticOwnershipResult(True, guarded_functions, len(visited))
+
+    def _execute_block(self, index: int, function_name: Text, stack: Stack, memory_tagged: bool,
+                       guarded_functions: Dict[Text, Optional[int]]) -> List[Entry]:
+        """ Interprets the instructions starting at *index* up to the next jump, returns the successor states. """
+        stack = list(stack)
+        start_index = index
+        while index < len(self.instructions):
+            instruction = self.instructions[index]
+            opcode = instruction['opcode']
+            if opcode in HALTING_OPCODES:
+                return []
+            if opcode not in STACK_EFFECTS or opcode == 'INVALID':
+                # Mythril disassembles unknown bytes as INVALID, these might be valid in newer forks (e.g. PUSH0)
+                raise Inconclusive('unknown opcode at address {}'.format(instruction['address']))
+            if opcode in UNSUPPORTED_OPCODES:
+                raise Inconclusive('unsupported opcode {}'.format(opcode))
+            inputs, _ = STACK_EFFECTS[opcode]
+            if len(stack) < inputs:
+                # Stack underflow, the path throws
+                return []
+
+            if opcode == 'JUMP':
+                return self._jump(stack.pop(), function_name, stack, memory_tagged)
+            if opcode == 'JUMPI':
+                destination, condition = stack.pop(), stack.pop()
+                if COMPARED in condition[1] and function_name not in guarded_functions:
+                    guarded_functions[function_name] = self._storage_index(condition)
+                return self._jump(destination, function_name, stack, memory_tagged) + \
+                    [self._enter(index + 1, function_name, stack, memory_tagged)]
+            if opcode == 'JUMPDEST' and index != start_index:
+                # Fall through into a block that might have been reached before
+                return [self._enter(index, function_name, stack, memory_tagged)]
+            if opcode in MEMORY_STORE_OPCODES and len(stack[-2][1]) > 0:
+                memory_tagged = True
+            if opcode in MEMORY_LOAD_OPCODES and memory_tagged:
+                raise Inconclusive('tagged value loaded from memory at address {}'.format(instruction['address']))
+
+            self._step(opcode, instruction, stack)
+            if len(stack) > MAX_STACK_SIZE:
+                return []
+            index += 1
+        return []
+
+    @staticmethod
+    def _step(opcode: Text, instruction: Dict, stack: List[Value]) -> None:
+        if opcode.startswith('PUSH'):
+            argument = instruction.get('argument', '0x')
+            stack.append((int(argument, 16) if len(argument) > 2 else 0, frozenset()))
+        elif opcode.startswith('DUP'):
+            stack.append(stack[-int(opcode[3:])])
+        elif opcode.startswith('SWAP'):
+            position = int(opcode[4:]) + 1
+            stack[-1], stack[-position] = stack[-position], stack[-1]
+        elif opcode == 'CALLER':
+            stack.append((None, frozenset([CALLER])))
+        elif opcode == 'SLOAD':
+            storage_index = stack.pop()[0]
+            stack.append((None, frozenset([(STORAGE, storage_index)])) if storage_index is not None and storage_index <= 0xFF else UNKNOWN)
+        elif opcode == 'EQ':
+            first, second = stack.pop(), stack.pop()
+            tags = first[1] | second[1]
+            if (CALLER in first[1] and StaticOwnershipAnalysis._is_storage(second)) or \
+                    (CALLER in second[1] and StaticOwnershipAnalysis._is_storage(first)):
+                tags = tags | {COMPARED}
+            stack.append((None, tags))
+        else:
+            inputs, outputs = STACK_EFFECTS[opcode]
+            operands = [stack.pop() for _ in range(inputs)]
+            tags = frozenset().union(*[operand[1] for operand in operands]) if opcode in PROPAGATING_OPCODES else frozenset()
+            stack.extend([(None, tags)] * outputs)
+
+    def _jump(self, destination: Value, function_name: Text, stack: List[Value], memory_tagged: bool) -> List[Entry]:
+        if destination[0] is None:
+            raise Inconclusive('unresolved jump target')
+        index = self.address_to_index.get(destination[0])
+        if index is None or self.instructions[index]['opcode'] != 'JUMPDEST':
+            # Invalid jump destination, the path throws
+            return []
+        return [self._enter(index, self.disassembly.address_to_function_name.get(destination[0], function_name), stack,
+                            memory_tagged)]
+
+    @staticmethod
+    def _enter(index: int, function_name: Text, stack: List[Value], memory_tagged: bool) -> Entry:
+        return index, function_name, tuple(stack), memory_tagged
+
+    @staticmethod
+    def _is_storage(value: Value) -> bool:
+        return any(tag[0] == STORAGE for tag in value[1])
+
+    @staticmethod
+    def _storage_index(value: Value) -> Optional[int]:
+        indices = [tag[1] for tag in value[1] if tag[0] == STORAGE]
+        return min(indices) if len(indices) > 0 else None
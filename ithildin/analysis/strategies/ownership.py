@@ -1,9 +1,11 @@
 from typing import Optional
 
+from mythril.disassembler.disassembly import Disassembly
 from mythril.laser.ethereum.state.global_state import GlobalState
 from mythril.laser.smt.bitvec import BitVec
 
 from ithildin.analysis.base import AnalysisStrategy
+from ithildin.analysis.static import StaticOwnershipAnalysis
 from ithildin.report.analysis import Result
 
 
@@ -51,6 +53,16 @@ class Ownership(AnalysisStrategy):
     pre_hooks = ['JUMPI']
     post_hooks = ['CALLER', 'SLOAD', 'EQ']
 
+    def analyze_statically(self, disassembly: Disassembly) -> bool:
+        static_result = StaticOwnershipAnalysis(disassembly).analyze()
+        if not static_result.conclusive:
+            return False
+        for function_name, storage_address in static_result.guarded_functions.items():
+            if function_name not in self.cache:
+                self.results.append(Result(function_name, _index_owner=storage_address))
+                self.cache.add(function_name)
+        return True
+
     def _analyze(self, state: GlobalState, prev_state: Optional[GlobalState] = None) -> Optional[Result]:
         if prev_state and prev_state.instruction['opcode'] == 'CALLER':
             state.mstate.stack[-1].annotate(Caller())
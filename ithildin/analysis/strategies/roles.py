@@ -2,7 +2,7 @@ import codecs
 import logging
 import re
 
-from typing import Optional
+from typing import Dict, Optional, Text
 
 from mythril.laser.smt import symbol_factory, simplify, BitVec, Concat
 from mythril.laser.ethereum.state.global_state import GlobalState
@@ -77,6 +77,12 @@ class RoleBasedAccessControl(AnalysisStrategy):
         self.role_cache = {}
         self.concrete_memory_cache = set()
 
+    def cache_sizes(self) -> Dict[Text, int]:
+        cache_sizes = super().cache_sizes()
+        cache_sizes['role_cache'] = len(self.role_cache)
+        cache_sizes['concrete_memory_cache'] = len(self.concrete_memory_cache)
+        return cache_sizes
+
     def _analyze(self, state: GlobalState, prev_state: Optional[GlobalState] = None) -> Optional[Result]:
         if prev_state and prev_state.instruction['opcode'] == 'CALLER':
             state.mstate.stack[-1].annotate(Caller())
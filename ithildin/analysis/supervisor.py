@@ -0,0 +1,186 @@
+import logging
+import multiprocessing
+import os
+import resource
+import signal
+import time
+
+from collections import deque
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Deque, List, Optional, Tuple
+
+from ithildin.report.analysis import Outcome
+
+log = logging.getLogger(__name__)
+
+# Seconds between two checks of the running workers' deadlines and memory usage
+POLL_INTERVAL = 0.5
+
+STATM_PATH = '/proc/{}/statm'
+
+
+def _rss(pid: int) -> Optional[int]:
+    """ Returns the resident set size of process *pid* in bytes, None if it cannot be determined. """
+    try:
+        with open(STATM_PATH.format(pid), 'r') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _worker_main(function: Callable, connection: Connection, max_tasks: Optional[int], memory_limit: Optional[int]) -> None:
+    if memory_limit is not None and _rss(os.getpid()) is None:
+        # The supervisor can't read the RSS on this platform, fall back to limiting the address space
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    task_count = 0
+    while max_tasks is None or task_count < max_tasks:
+        message = connection.recv()
+        if message is None:
+            break
+        index, task = message
+        try:
+            connection.send((index, Outcome.COMPLETED, function(task)))
+        except MemoryError:
+            connection.send((index, Outcome.OOM, None))
+        except Exception:
+            log.exception('Task %d failed', index)
+            connection.send((index, Outcome.ERROR, None))
+        task_count += 1
+    connection.close()
+
+
+class _Worker:
+
+    def __init__(self, function: Callable, max_tasks: Optional[int], memory_limit: Optional[int]) -> None:
+        self.connection, child_connection = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_worker_main, args=(function, child_connection, max_tasks, memory_limit),
+                                               daemon=True)
+        self.process.start()
+        child_connection.close()
+        self.max_tasks = max_tasks
+        self.task_count = 0
+        self.task_index: Optional[int] = None
+        self.task_start = 0.0
+
+    @property
+    def busy(self) -> bool:
+        return self.task_index is not None
+
+    @property
+    def exhausted(self) -> bool:
+        return self.max_tasks is not None and self.task_count >= self.max_tasks
+
+    def submit(self, index: int, task: Any) -> None:
+        self.connection.send((index, task))
+        self.task_index = index
+        self.task_start = time.time()
+        self.task_count += 1
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            os.kill(self.process.pid, signal.SIGKILL)
+        self.process.join()
+        self.connection.close()
+
+    def stop(self) -> None:
+        if self.process.is_alive() and not self.exhausted:
+            try:
+                self.connection.send(None)
+            except OSError:
+                pass
+        self.process.join(timeout=POLL_INTERVAL)
+        if self.process.is_alive():
+            self.kill()
+        self.connection.close()
+
+
+class SupervisedExecutor:
+    """
+    Applies *function* to tasks in supervised child processes. A task whose worker exceeds *hard_timeout* seconds of
+    wall-clock time or *memory_limit* bytes of resident memory gets its worker killed, so the deadline holds even while
+    the worker is stuck in native code (e.g. a long z3 query). Workers are replaced after *max_tasks_per_worker* tasks
+    to release memory accumulated across tasks.
+
+    The executor can be used for several calls to *map()*, the workers are shut down when leaving the context.
+    """
+
+    def __init__(self, function: Callable, jobs: int = 1, hard_timeout: Optional[float] = None,
+                 memory_limit: Optional[int] = None, max_tasks_per_worker: Optional[int] = None) -> None:
+        assert jobs > 0, 'At least one worker is required'
+        assert max_tasks_per_worker is None or max_tasks_per_worker > 0, 'Workers need to execute at least one task'
+        self.function = function
+        self.jobs = jobs
+        self.hard_timeout = hard_timeout
+        self.memory_limit = memory_limit
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._workers: List[_Worker] = []
+
+    def __enter__(self) -> 'SupervisedExecutor':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for worker in self._workers:
+            worker.stop()
+        self._workers = []
+
+    def map(self, tasks: List[Any]) -> List[Tuple[Outcome, Any]]:
+        """
+        Returns
+        -------
+        A tuple of outcome and result for every task in *tasks*, in the same order. The result is None unless the
+        outcome is COMPLETED.
+        """
+        pending: Deque[Tuple[int, Any]] = deque(enumerate(tasks))
+        results: List[Optional[Tuple[Outcome, Any]]] = [None] * len(tasks)
+        while len(pending) > 0 or any(worker.busy for worker in self._workers):
+            self._replace_exhausted_workers()
+            for worker in [worker for worker in self._workers if not worker.busy]:
+                if len(pending) == 0:
+                    break
+                worker.submit(*pending.popleft())
+            busy_workers = [worker for worker in self._workers if worker.busy]
+            wait([worker.connection for worker in busy_workers], timeout=POLL_INTERVAL)
+            for worker in busy_workers:
+                outcome = self._check_worker(worker, results)
+                if outcome is not None:
+                    results[worker.task_index] = (outcome, None)
+                    worker.task_index = None
+                    self._workers.remove(worker)
+        return results
+
+    def _replace_exhausted_workers(self) -> None:
+        for worker in [worker for worker in self._workers if worker.exhausted and not worker.busy]:
+            worker.stop()
+            self._workers.remove(worker)
+        while len(self._workers) < self.jobs:
+            self._workers.append(_Worker(self.function, self.max_tasks_per_worker, self.memory_limit))
+
+    def _check_worker(self, worker: _Worker, results: List[Optional[Tuple[Outcome, Any]]]) -> Optional[Outcome]:
+        """ Collects the result of *worker* if available, or returns the outcome the worker was killed with. """
+        if worker.connection.poll():
+            try:
+                index, outcome, result = worker.connection.recv()
+                results[index] = (outcome, result)
+                worker.task_index = None
+                return None
+            except (EOFError, OSError):
+                pass
+        elapsed = time.time() - worker.task_start
+        if self.hard_timeout is not None and elapsed > self.hard_timeout:
+            log.warning('Task %d exceeded the hard timeout of %.2f seconds, killing worker', worker.task_index, self.hard_timeout)
+            worker.kill()
+            return Outcome.TIMEOUT
+        rss = _rss(worker.process.pid)
+        if self.memory_limit is not None and rss is not None and rss > self.memory_limit:
+            log.warning('Task %d exceeded the memory limit with %d bytes, killing worker', worker.task_index, rss)
+            worker.kill()
+            return Outcome.OOM
+        if not worker.process.is_alive():
+            # Killed by the kernel's OOM killer, or crashed in native code
+            log.warning('Worker died with exit code %s while executing task %d', worker.process.exitcode, worker.task_index)
+            worker.kill()
+            return Outcome.OOM if worker.process.exitcode == -signal.SIGKILL else Outcome.ERROR
+        return None
@@ -1,108 +1,361 @@
 import logging
 import time
-from typing import Optional, Text, Union
+from collections import OrderedDict
+from copy import deepcopy
+from typing import Dict, List, Optional, Sequence, Text, Tuple, Type, Union
 
+from ithildin.analysis.base import AnalysisStrategy
+from ithildin.analysis.budget import Budget, BudgetPlanner
+from ithildin.analysis.cancellation import CancellationToken
+from ithildin.analysis.dedup import normalized_code_hash
+from ithildin.analysis.deployment import deploy, RUNTIME_ADDRESS
+from ithildin.analysis.diff import Baseline, function_hashes
+from ithildin.analysis.functions import dispatcher_entries, filter_report, parse_selector
 from ithildin.analysis.loader import StrategyLoader
-from ithildin.contract.loader import FileLoader, JsonRpcLoader
-from ithildin.report.analysis import Report
+from ithildin.analysis.memory import DEFAULT_SAMPLE_INTERVAL
+from ithildin.analysis.prologue import PrologueBound
+from ithildin.analysis.session import AnalysisSession, LASER_LOCK
+from ithildin.contract.loader import AsyncJsonRpcLoader, CorpusLoader, FileLoader, JsonRpcLoader
+from ithildin.contract.proxy import ProxyType
+from ithildin.report.analysis import Outcome, post_process_report, Report
+from ithildin.support.profiler import CATEGORY_LOADING, Profiler
 
-from mythril.laser.ethereum import svm
-from mythril.laser.ethereum.state.world_state import WorldState
-from mythril.laser.ethereum.strategy.extensions.bounded_loops import BoundedLoopsStrategy
-from mythril.laser.plugin.loader import LaserPluginLoader
+from mythril.disassembler.disassembly import Disassembly
+from mythril.laser.ethereum.strategy import BasicSearchStrategy
+from mythril.laser.ethereum.strategy.basic import DepthFirstSearchStrategy
 from mythril.support.loader import DynLoader
-
-from mythril.laser.plugin.plugins import (
-    MutationPrunerBuilder,
-    DependencyPrunerBuilder,
-    CoveragePluginBuilder,
-    # CallDepthLimitBuilder,
-    InstructionProfilerBuilder,
-)
+from mythril.support.support_utils import get_code_hash
 
 log = logging.getLogger(__name__)
 
+# Number of implementation reports kept by a wrapper, the least recently used ones are dropped first
+IMPLEMENTATION_REPORTS_SIZE = 256
+
 
 class LaserWrapper:
+    """
+    Runs the loaded analysis strategies on a contract using the Laser EVM.
+
+    Reports of proxy implementations are kept by the wrapper, so that the implementation behind many proxies gets
+    symbolically executed only once, per selection of functions and execution options. Reports of analyses that
+    timed out, failed or were skipped after the deadline are not kept. Each proxy still gets its storage values read
+    at its own address when post-processing the report, and the functions of the proxy's own code, e.g.
+    *upgradeTo()* and *changeAdmin()*, are analyzed for every proxy.
+
+    The Laser EVM is kept as well, in an *AnalysisSession* that is reused for the next contract as long as the loaded
+    strategies and the execution options it was set up with stay the same. Analyzing many contracts with the same
+    wrapper thus only pays for setting up hooks and plugins once.
 
-    def __init__(self, strategy_loader: Optional[StrategyLoader] = StrategyLoader()):
-        self.strategy_loader = strategy_loader
+    A wrapper analyzes one contract at a time and must not be used by several threads at once. Wrappers created with
+    their own *strategy_loader*, which is the default, can be used concurrently from different threads: contract
+    loading, static analysis and storage post-processing run in parallel, while symbolic execution itself is
+    serialized, see *ithildin.analysis.session.LASER_LOCK*.
+    """
+
+    def __init__(self, strategy_loader: Optional[StrategyLoader] = None):
+        self.strategy_loader = strategy_loader if strategy_loader is not None else StrategyLoader()
+        self._implementation_reports: Dict[Tuple, Report] = OrderedDict()
+        self._session: Optional[AnalysisSession] = None
+        self._session_key: Optional[Tuple] = None
 
     def execute(self,
                 timeout: Optional[float] = 60,
                 max_depth: Optional[int] = 128,
                 call_depth_limit: Optional[int] = 3,
                 bounded_loops_limit: Optional[int] = 3,
+                search_strategy: Type[BasicSearchStrategy] = DepthFirstSearchStrategy,
                 creation_code: Optional[Text] = None,
                 target_address: Optional[Text] = None,
+                runtime_code: Optional[Text] = None,
                 dyn_loader: Optional[DynLoader] = None,
-                contract_loader: Optional[Union[FileLoader, JsonRpcLoader]] = None) -> Report:
+                contract_loader: Optional[Union[FileLoader, JsonRpcLoader, AsyncJsonRpcLoader, CorpusLoader]] = None,
+                budget_planner: Optional[BudgetPlanner] = None,
+                plateau_seconds: Optional[float] = None,
+                plateau_states: Optional[int] = None,
+                static_fast_path: bool = False,
+                trace_path: Optional[Text] = None,
+                memory_sample_interval: int = DEFAULT_SAMPLE_INTERVAL,
+                memory_soft_limit: Optional[int] = None,
+                trace_allocations: bool = False,
+                functions: Optional[Sequence[Text]] = None,
+                baseline: Optional[Baseline] = None,
+                runtime_mode: bool = False,
+                prologue_bound: Optional[PrologueBound] = None,
+                cancellation_token: Optional[CancellationToken] = None) -> Report:
+        """
+        Analyzes the contract given either as *creation_code*, or deployed at *target_address*. Providing *runtime_code*
+        together with *target_address* executes that code instead of the code deployed at the address, while storage
+        is still loaded from *target_address* through *dyn_loader*. The *search_strategy* decides in which order Laser
+        explores states, see *ithildin.analysis.search* for strategies tuned for access control detection. If a
+        *budget_planner* is given, *timeout* and *max_depth* are replaced by a budget computed from the contract's code.
+        Execution stops early once coverage hasn't grown for *plateau_seconds* seconds and *plateau_states* states.
+
+        With *static_fast_path*, strategies that support it first analyze the runtime code statically, and only the
+        strategies whose static analysis is inconclusive are run during symbolic execution. In creation mode, the
+        runtime code is taken from *runtime_code* if given.
+
+        If *trace_path* is given, the states at all opcodes hooked by any known strategy are recorded to a trace file
+        at that path, which can be replayed with *ithildin.analysis.replay.replay_trace()*.
+
+        Memory usage is sampled every *memory_sample_interval* executed states, see *ithildin.analysis.memory*. Once
+        the RSS exceeds *memory_soft_limit* bytes, states are pruned more aggressively. With *trace_allocations*, the
+        top allocation sites are reported as well.
+
+        If *functions* are given, by signature or selector, only these functions are analyzed and reported, see
+        *ithildin.analysis.functions.FunctionSelectorPlugin*.
+
+        Given a *baseline*, e.g. the report of the previous implementation of an upgraded contract, only the functions
+        whose code changed since the baseline are analyzed, and the baseline's results of the other functions are carried
+        over, see *ithildin.analysis.diff*.
+
+        For proxies resolved by a *JsonRpcLoader* or *AsyncJsonRpcLoader*, the implementation's code is executed. The
+        functions dispatched by the proxy's own code, e.g. its admin interface, are then executed at the proxy with the
+        same options, and their results merged into the report. EIP-1167 minimal proxies have no functions of their own.
+
+        With *runtime_mode*, the constructor of *creation_code* isn't executed symbolically. Its runtime code is derived
+        by deploying it concretely (see *ithildin.analysis.deployment.deploy()*), falling back to *runtime_code* if
+        given. Runtime code without a *target_address* is executed at *RUNTIME_ADDRESS* with symbolic storage, starting
+        from the runtime world state as in existing mode.
+
+        With a *prologue_bound*, paths are dropped once they leave the prologue of the function they entered, see
+        *ithildin.analysis.prologue*. The bound is recorded in the report.
+
+        Symbolic execution stops once the *cancellation_token* has been cancelled, raising *AnalysisCancelled*.
+        """
+        profiler = Profiler()
+        selected = tuple(sorted({parse_selector(function) for function in functions})) if functions else None
+        selectors = selected
+        implementation_address = None
+        proxy_type = None
+        proxy_code = None
         if contract_loader is not None:
-            if isinstance(contract_loader, FileLoader):
-                creation_code = contract_loader.contract().creation_disassembly.bytecode
-            elif isinstance(contract_loader, JsonRpcLoader):
-                target_address = contract_loader.address
-                dyn_loader = contract_loader.dyn_loader
+            with profiler.phase('contract loading', CATEGORY_LOADING):
+                if isinstance(contract_loader, FileLoader):
+                    contract = contract_loader.contract()
+                    creation_code = contract.creation_disassembly.bytecode
+                    runtime_code = contract.disassembly.bytecode or None
+                    if creation_code == '' and runtime_code is not None:
+                        # Runtime bytecode files come without creation code
+                        creation_code = None
+                elif isinstance(contract_loader, JsonRpcLoader):
+                    target_address = contract_loader.address
+                    dyn_loader = contract_loader.dyn_loader
+                    if contract_loader.implementation_address is not None:
+                        implementation_address = contract_loader.implementation_address
+                        proxy_type = contract_loader.proxy_type.value
+                        proxy_code = self._runtime_code(target_address, None, dyn_loader)
+                        runtime_code = contract_loader.implementation_code
+                elif isinstance(contract_loader, AsyncJsonRpcLoader):
+                    assert contract_loader.loaded, 'Contract loader has not been loaded'
+                    target_address = contract_loader.address
+                    dyn_loader = contract_loader.dyn_loader
+                    runtime_code = contract_loader.runtime_code
+                    if contract_loader.implementation_address is not None:
+                        implementation_address = contract_loader.implementation_address
+                        proxy_type = contract_loader.proxy_type.value
+                        proxy_code = contract_loader.code
+                elif isinstance(contract_loader, CorpusLoader):
+                    if contract_loader.creation:
+                        creation_code = contract_loader.code
+                    else:
+                        target_address = contract_loader.address
+                        runtime_code = contract_loader.code
+                        dyn_loader = contract_loader.dyn_loader
+                else:
+                    raise ValueError('Invalid type for contract_loader parameter')
+
+        contract_code = creation_code
+        contract_address = target_address
+        if runtime_mode and creation_code is not None:
+            with profiler.phase('concrete deployment'):
+                runtime_code = deploy(creation_code) or runtime_code
+            if runtime_code is not None:
+                creation_code = None
             else:
-                raise ValueError('Invalid type for contract_loader parameter')
-
-        world_state = None
-        if creation_code is not None and target_address is None:
-            log.info('Running symbolic execution in creation mode...')
-            laser = svm.LaserEVM(execution_timeout=timeout,
-                                 max_depth=max_depth,
-                                 requires_statespace=False)
-        elif creation_code is None and target_address is not None:
-            assert dyn_loader is not None, "Dynamic Loader has not been provided"
-            log.info('Running symbolic execution in existing mode...')
-            laser = svm.LaserEVM(dynamic_loader=dyn_loader,
-                                 execution_timeout=timeout,
-                                 max_depth=max_depth,
-                                 requires_statespace=False)
-            world_state = WorldState()
-            world_state.accounts_exist_or_load(target_address, dyn_loader)
+                log.warning('No runtime code available, executing the constructor symbolically')
+        executed_without_address = creation_code is None and target_address is None and runtime_code is not None
+        if executed_without_address:
+            target_address = RUNTIME_ADDRESS
+
+        executed_code = self._runtime_code(target_address, runtime_code, dyn_loader)
+        hashes = None
+        function_diff = None
+        if executed_code is not None:
+            with profiler.phase('function hashing'):
+                hashes = function_hashes(executed_code)
+                function_diff = baseline.diff(executed_code) if baseline is not None else None
+        if function_diff is not None:
+            selectors = tuple(sorted(function_diff.changed if selected is None else function_diff.changed & set(selected)))
+
+        # Reports only carry over to proxies analyzed with the same options
+        implementation_key = (implementation_address, selectors, timeout, max_depth, call_depth_limit, bounded_loops_limit,
+                              search_strategy, budget_planner, plateau_seconds, plateau_states, static_fast_path, memory_soft_limit,
+                              prologue_bound.description if prologue_bound is not None else '')
+        if selectors == ():
+            log.info('No changed functions to analyze')
+            report = Report(start_time=time.time(), end_time=time.time())
+        elif implementation_key in self._implementation_reports:
+            log.info('Reusing analysis results of implementation %s for proxy %s', implementation_address, target_address)
+            self._implementation_reports.move_to_end(implementation_key)
+            report = deepcopy(self._implementation_reports[implementation_key])
+            report.start_time = report.end_time = time.time()
         else:
-            raise ValueError('Either creation_code or target_address needs to be provided')
+            static_strategies = []
+            if static_fast_path:
+                with profiler.phase('static analysis'):
+                    static_strategies = self._analyze_statically(target_address, runtime_code, dyn_loader)
+            strategies = [strategy for strategy in self.strategy_loader.get_strategies() if strategy not in static_strategies]
+            with profiler.phase('budget planning'):
+                budget = self._plan_budget(budget_planner, timeout, max_depth, creation_code, target_address, runtime_code, dyn_loader)
+            if budget.deadline_exceeded or len(strategies) == 0:
+                report = Report(start_time=time.time(), end_time=time.time())
+            else:
+                report = self._execute(strategies, budget.execution_timeout, budget.max_depth, bounded_loops_limit, search_strategy,
+                                       creation_code, target_address, runtime_code, dyn_loader, plateau_seconds, plateau_states,
+                                       trace_path, memory_sample_interval, memory_soft_limit, trace_allocations, selectors,
+                                       cancellation_token, prologue_bound)
+            for strategy in static_strategies:
+                report.add_report(strategy.generate_report())
+            report.static_patterns = [strategy.pattern_name for strategy in static_strategies]
+            report.budget = budget
+            if selectors is not None:
+                # Static analysis covers all functions, so its results are filtered as well
+                filter_report(report, selectors)
+            if (implementation_address is not None and not budget.deadline_exceeded and not report.timed_out
+                    and report.outcome == Outcome.COMPLETED):
+                self._implementation_reports[implementation_key] = deepcopy(report)
+                if len(self._implementation_reports) > IMPLEMENTATION_REPORTS_SIZE:
+                    self._implementation_reports.popitem(last=False)
 
-        for strategy in self.strategy_loader.get_strategies():
-            for hook in strategy.pre_hooks:
-                laser.register_hooks('pre', {hook: [strategy.execute]})
-            for hook in strategy.post_hooks:
-                laser.register_hooks('post', {hook: [strategy.execute]})
-
-        # Load laser plugins
-        laser.extend_strategy(BoundedLoopsStrategy, bounded_loops_limit)
-        plugin_loader = LaserPluginLoader()
-        plugin_loader.load(CoveragePluginBuilder())
-        plugin_loader.load(MutationPrunerBuilder())
-        # Temporarily disabled due to unhandled exception
-        # plugin_loader.load(CallDepthLimitBuilder())
-        plugin_loader.load(InstructionProfilerBuilder())
-        plugin_loader.load(DependencyPrunerBuilder())
-        # plugin_loader.add_args("call-depth-limit", call_depth_limit=call_depth_limit)
-        plugin_loader.instrument_virtual_machine(laser, None)
-
-        # Run symbolic execution
-        start_time = time.time()
-        laser.sym_exec(creation_code=creation_code,
-                       contract_name='Unknown',
-                       world_state=world_state,
-                       target_address=int(target_address, 16) if target_address else None)
-        log.info('Symbolic execution finished in %.2f seconds.', time.time() - start_time)
-
-        report = Report(start_time=start_time, end_time=time.time())
-        report.contract_code = creation_code
-        report.contract_address = target_address
-        for strategy in self.strategy_loader.get_strategies():
-            report.add_report(strategy.generate_report())
-        self._post_process_report(report, target_address, dyn_loader)
+        proxy_functions = None
+        if proxy_code is not None and proxy_type != ProxyType.MINIMAL.value:
+            # Minimal proxies have no functions of their own, other proxies may have an admin interface
+            proxy_functions = sorted(set(dispatcher_entries(Disassembly(proxy_code).instruction_list).values()))
+            if selected is not None:
+                proxy_functions = [selector for selector in proxy_functions if selector in selected]
+            if len(proxy_functions) > 0:
+                log.info('Analyzing %d functions of proxy %s', len(proxy_functions), target_address)
+                with profiler.phase('budget planning'):
+                    budget = self._plan_budget(budget_planner, timeout, max_depth, None, target_address, proxy_code, dyn_loader)
+                if not budget.deadline_exceeded:
+                    proxy_report = self._execute(self.strategy_loader.get_strategies(), budget.execution_timeout, budget.max_depth,
+                                                 bounded_loops_limit, search_strategy, None, target_address, proxy_code, dyn_loader,
+                                                 plateau_seconds, plateau_states, selectors=proxy_functions,
+                                                 cancellation_token=cancellation_token, prologue_bound=prologue_bound)
+                    report.merge_results(proxy_report)
+                    report.timed_out = report.timed_out or proxy_report.timed_out
+
+        report.contract_code = contract_code
+        report.contract_address = contract_address
+        report.runtime_mode = executed_without_address
+        report.implementation_address = implementation_address
+        report.proxy_type = proxy_type
+        report.proxy_functions = proxy_functions or None
+        report.functions = list(selected) if selected is not None else None
+        report.function_hashes = hashes
+        code = executed_code or contract_code
+        report.code_hash = get_code_hash(code) or None if code else None
+        report.normalized_code_hash = normalized_code_hash(code)
+        with profiler.phase('storage post-processing'):
+            post_process_report(report, target_address, dyn_loader)
+            if function_diff is not None:
+                unchanged = function_diff.unchanged if selected is None else function_diff.unchanged & set(selected)
+                baseline.carry_over(report, unchanged, target_address, dyn_loader)
         return report
 
-    def _post_process_report(self, report: Report, target_address: Text, dyn_loader: DynLoader) -> None:
-        for result in [result for report_item in report.reports for result in report_item.results]:
-            for attr_name, attr_value in [(k, v) for k, v in result.attributes.items() if k.startswith('_index')]:
-                attr_name_pretty = ' '.join(map(lambda s: s.capitalize(), attr_name.split('_')[2:]))
-                result.add_attribute(f'{attr_name_pretty} Storage Index', attr_value)
-                if dyn_loader:
-                    result.add_attribute(attr_name_pretty, dyn_loader.read_storage(target_address, attr_value))
-                result.remove_attribute(attr_name)
+    @staticmethod
+    def _runtime_code(target_address: Optional[Text],
+                      runtime_code: Optional[Text],
+                      dyn_loader: Optional[DynLoader]) -> Optional[Text]:
+        """ Returns the executed runtime code, None if it isn't known, e.g. when analyzing creation code. """
+        if runtime_code is None and target_address is not None and dyn_loader is not None:
+            disassembly = dyn_loader.dynld(target_address)
+            runtime_code = disassembly.bytecode if disassembly is not None else None
+        return runtime_code or None
+
+    def _analyze_statically(self,
+                            target_address: Optional[Text],
+                            runtime_code: Optional[Text],
+                            dyn_loader: Optional[DynLoader]) -> List[AnalysisStrategy]:
+        """ Returns the strategies whose results could be determined statically from the runtime code. """
+        if runtime_code is not None:
+            disassembly = Disassembly(runtime_code)
+        elif target_address is not None and dyn_loader is not None:
+            disassembly = dyn_loader.dynld(target_address)
+        else:
+            disassembly = None
+        if disassembly is None or len(disassembly.instruction_list) == 0:
+            log.info('No runtime code available for static analysis')
+            return []
+        static_strategies = []
+        for strategy in self.strategy_loader.get_strategies():
+            # Strategies analyzed statically aren't reset by the session, results of the previous contract are dropped here
+            strategy.reset()
+            if strategy.analyze_statically(disassembly):
+                static_strategies.append(strategy)
+        log.info('Statically analyzed patterns: %s', ', '.join(strategy.pattern_name for strategy in static_strategies) or 'none')
+        return static_strategies
+
+    @staticmethod
+    def _plan_budget(budget_planner: Optional[BudgetPlanner],
+                     timeout: Optional[float],
+                     max_depth: Optional[int],
+                     creation_code: Optional[Text],
+                     target_address: Optional[Text],
+                     runtime_code: Optional[Text],
+                     dyn_loader: Optional[DynLoader]) -> Budget:
+        if budget_planner is None:
+            return Budget(timeout, max_depth)
+        if creation_code is not None or runtime_code is not None:
+            disassembly = Disassembly(creation_code or runtime_code)
+        else:
+            disassembly = dyn_loader.dynld(target_address)
+        if disassembly is None:
+            log.warning('No code to plan a budget for, falling back to fixed budget')
+            return Budget(timeout, max_depth)
+        return budget_planner.plan(disassembly)
+
+    def _execute(self,
+                 strategies: List[AnalysisStrategy],
+                 timeout: Optional[float],
+                 max_depth: Optional[int],
+                 bounded_loops_limit: Optional[int],
+                 search_strategy: Type[BasicSearchStrategy],
+                 creation_code: Optional[Text],
+                 target_address: Optional[Text],
+                 runtime_code: Optional[Text],
+                 dyn_loader: Optional[DynLoader],
+                 plateau_seconds: Optional[float],
+                 plateau_states: Optional[int],
+                 trace_path: Optional[Text] = None,
+                 memory_sample_interval: int = DEFAULT_SAMPLE_INTERVAL,
+                 memory_soft_limit: Optional[int] = None,
+                 trace_allocations: bool = False,
+                 selectors: Optional[Sequence[Text]] = None,
+                 cancellation_token: Optional[CancellationToken] = None,
+                 prologue_bound: Optional[PrologueBound] = None) -> Report:
+        session = self._get_session(bounded_loops_limit, search_strategy, plateau_seconds, plateau_states, memory_sample_interval,
+                                    memory_soft_limit, trace_allocations, trace_path is not None)
+        return session.run(strategies, timeout, max_depth, creation_code, target_address, runtime_code, dyn_loader, trace_path,
+                           selectors, cancellation_token, prologue_bound)
+
+    def _get_session(self,
+                     bounded_loops_limit: Optional[int],
+                     search_strategy: Type[BasicSearchStrategy],
+                     plateau_seconds: Optional[float],
+                     plateau_states: Optional[int],
+                     memory_sample_interval: int,
+                     memory_soft_limit: Optional[int],
+                     trace_allocations: bool,
+                     record_traces: bool) -> AnalysisSession:
+        """ Returns the session of the previous contract if it has been created with the same options, a new one otherwise. """
+        strategies = self.strategy_loader.get_strategies()
+        session_key = (tuple(id(strategy) for strategy in strategies), bounded_loops_limit, search_strategy, plateau_seconds,
+                       plateau_states, memory_sample_interval, memory_soft_limit, trace_allocations, record_traces)
+        if self._session is None or session_key != self._session_key:
+            log.debug('Creating analysis session')
+            with LASER_LOCK:
+                self._session = AnalysisSession(strategies, bounded_loops_limit, search_strategy, plateau_seconds, plateau_states,
+                                                memory_sample_interval, memory_soft_limit, trace_allocations, record_traces)
+            self._session_key = session_key
+        return self._session
@@ -0,0 +1,291 @@
+import json
+import logging
+import struct
+import zlib
+
+from typing import BinaryIO, Dict, Iterator, List, Optional, Text, Tuple
+
+from mythril.laser.ethereum.state.global_state import GlobalState
+from mythril.support.opcodes import opcodes, reverse_opcodes
+
+from ithildin.analysis.loader import STRATEGIES
+
+log = logging.getLogger(__name__)
+
+MAGIC = b'ITHTRACE'
+FORMAT_VERSION = 1
+
+HOOK_PRE = 0
+HOOK_POST = 1
+
+RECORD_STRING = 0
+RECORD_EVENT = 1
+
+# Stack elements recorded per state, strategies only look at the two topmost ones
+RECORDED_STACK_ELEMENTS = 2
+# Memory hashed by SHA3 is only recorded up to this length
+MAX_RECORDED_MEMORY = 1024
+
+INVALID_OPCODE = 0xFE
+
+_HEADER = struct.Struct('<8sBI')
+_STRING = struct.Struct('<BHH')
+_EVENT = struct.Struct('<BBBBHH')
+_PREV_STATE = struct.Struct('<BH')
+_ELEMENT = struct.Struct('<BIH')
+_MEMORY = struct.Struct('<IH')
+_U8 = struct.Struct('<B')
+_U16 = struct.Struct('<H')
+
+
+class TraceTag:
+    """
+    Annotation identifying a stack element in a trace. Since Mythril propagates annotations to derived expressions, the
+    tags found on an element tell which of the previously recorded elements it has been derived from. The element's own
+    tag is the one created for its expression, identified by the z3 expression id.
+    """
+
+    def __init__(self, tag_id: int, expression_id: int) -> None:
+        self.tag_id = tag_id
+        self.expression_id = expression_id
+
+    def __hash__(self):
+        return hash((type(self), self.tag_id))
+
+    def __eq__(self, other):
+        return isinstance(other, TraceTag) and self.tag_id == other.tag_id
+
+
+class StackElement:
+    """ A recorded stack element: its own tag, the tags it has been derived from and its value if concrete. """
+
+    def __init__(self, tag: int, ancestor_tags: Tuple[int, ...], value: Optional[int]) -> None:
+        self.tag = tag
+        self.ancestor_tags = ancestor_tags
+        self.value = value
+
+
+class StateRecord:
+    """ The recorded parts of a global state. """
+
+    def __init__(self, opcode: Text, stack_size: int, stack: List[StackElement]) -> None:
+        self.opcode = opcode
+        self.stack_size = stack_size
+        self.stack = stack
+
+
+class TraceEvent:
+    """ A strategy hook call: *hooked_opcode* is the opcode of the hook, which for post hooks has already been executed. """
+
+    def __init__(self, hook_type: int, hooked_opcode: Text, function_name: Text, state: StateRecord,
+                 prev_state: Optional[StateRecord] = None, memory_offset: int = 0,
+                 memory: Optional[List[Optional[int]]] = None) -> None:
+        self.hook_type = hook_type
+        self.hooked_opcode = hooked_opcode
+        self.function_name = function_name
+        self.state = state
+        self.prev_state = prev_state
+        self.memory_offset = memory_offset
+        self.memory = memory or []
+
+
+def recorded_hooks() -> Tuple[List[Text], List[Text]]:
+    """ Returns the pre and post hooks of all known strategies, which are the opcodes recorded in traces. """
+    pre_hooks = sorted({hook for strategy in STRATEGIES.values() for hook in strategy.pre_hooks})
+    post_hooks = sorted({hook for strategy in STRATEGIES.values() for hook in strategy.post_hooks})
+    return pre_hooks, post_hooks
+
+
+def _opcode_to_byte(opcode: Text) -> int:
+    return reverse_opcodes.get(opcode, INVALID_OPCODE)
+
+
+def _byte_to_opcode(byte: int) -> Text:
+    return opcodes[byte][0] if byte in opcodes else 'INVALID'
+
+
+class TraceWriter:
+    """
+    Writes trace files. A trace file starts with a header holding the magic bytes, the format version and JSON metadata,
+    followed by a zlib stream of records. Strings (function names) are written once as string records and referenced
+    by their id in event records.
+    """
+
+    def __init__(self, file: BinaryIO, metadata: Optional[Dict] = None) -> None:
+        encoded_metadata = json.dumps(metadata or {}).encode('utf-8')
+        file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(encoded_metadata)))
+        file.write(encoded_metadata)
+        self._file = file
+        self._compressor = zlib.compressobj()
+        self._strings: Dict[Text, int] = {}
+        self.event_count = 0
+
+    def write_event(self, event: TraceEvent) -> None:
+        function_id = self._string_id(event.function_name)
+        buffer = bytearray(_EVENT.pack(RECORD_EVENT, event.hook_type, _opcode_to_byte(event.hooked_opcode),
+                                       _opcode_to_byte(event.state.opcode), function_id, event.state.stack_size))
+        self._pack_stack(buffer, event.state.stack)
+        if event.prev_state is None:
+            buffer += _U8.pack(0)
+        else:
+            buffer += _U8.pack(1)
+            buffer += _PREV_STATE.pack(_opcode_to_byte(event.prev_state.opcode), event.prev_state.stack_size)
+            self._pack_stack(buffer, event.prev_state.stack)
+        buffer += _MEMORY.pack(event.memory_offset, len(event.memory))
+        if len(event.memory) > 0:
+            bitmap = bytearray((len(event.memory) + 7) // 8)
+            for index, byte in enumerate(event.memory):
+                if byte is not None:
+                    bitmap[index // 8] |= 1 << (index % 8)
+            buffer += bitmap
+            buffer += bytes(byte or 0 for byte in event.memory)
+        self._file.write(self._compressor.compress(bytes(buffer)))
+        self.event_count += 1
+
+    def close(self) -> None:
+        self._file.write(self._compressor.flush())
+
+    def _string_id(self, string: Text) -> int:
+        if string not in self._strings:
+            string_id = len(self._strings)
+            encoded = string.encode('utf-8')
+            self._file.write(self._compressor.compress(_STRING.pack(RECORD_STRING, string_id, len(encoded)) + encoded))
+            self._strings[string] = string_id
+        return self._strings[string]
+
+    @staticmethod
+    def _pack_stack(buffer: bytearray, stack: List[StackElement]) -> None:
+        buffer += _U8.pack(len(stack))
+        for element in stack:
+            buffer += _ELEMENT.pack(1 if element.value is not None else 0, element.tag, len(element.ancestor_tags))
+            buffer += struct.pack('<{}I'.format(len(element.ancestor_tags)), *element.ancestor_tags)
+            if element.value is not None:
+                encoded_value = element.value.to_bytes((element.value.bit_length() + 7) // 8, 'big')
+                buffer += _U8.pack(len(encoded_value)) + encoded_value
+
+
+class TraceReader:
+
+    def __init__(self, path: Text) -> None:
+        with open(path, 'rb') as file:
+            magic, version, metadata_length = _HEADER.unpack(file.read(_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError('Not a trace file: {}'.format(path))
+            if version != FORMAT_VERSION:
+                raise ValueError('Unsupported trace format version {} in {}'.format(version, path))
+            self.metadata = json.loads(file.read(metadata_length).decode('utf-8'))
+            self._data = zlib.decompress(file.read())
+
+    def events(self) -> Iterator[TraceEvent]:
+        data = self._data
+        strings: Dict[int, Text] = {}
+        offset = 0
+        while offset < len(data):
+            if data[offset] == RECORD_STRING:
+                _, string_id, length = _STRING.unpack_from(data, offset)
+                offset += _STRING.size
+                strings[string_id] = data[offset:offset + length].decode('utf-8')
+                offset += length
+                continue
+            _, hook_type, hooked_opcode, opcode, function_id, stack_size = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            stack, offset = self._unpack_stack(data, offset)
+            state = StateRecord(_byte_to_opcode(opcode), stack_size, stack)
+            prev_state = None
+            offset += 1
+            if data[offset - 1] == 1:
+                prev_opcode, prev_stack_size = _PREV_STATE.unpack_from(data, offset)
+                offset += _PREV_STATE.size
+                prev_stack, offset = self._unpack_stack(data, offset)
+                prev_state = StateRecord(_byte_to_opcode(prev_opcode), prev_stack_size, prev_stack)
+            memory_offset, memory_length = _MEMORY.unpack_from(data, offset)
+            offset += _MEMORY.size
+            memory = []
+            if memory_length > 0:
+                bitmap_length = (memory_length + 7) // 8
+                bitmap = data[offset:offset + bitmap_length]
+                values = data[offset + bitmap_length:offset + bitmap_length + memory_length]
+                offset += bitmap_length + memory_length
+                memory = [values[index] if bitmap[index // 8] & (1 << (index % 8)) else None for index in range(memory_length)]
+            yield TraceEvent(hook_type, _byte_to_opcode(hooked_opcode), strings[function_id], state, prev_state, memory_offset, memory)
+
+    @staticmethod
+    def _unpack_stack(data: bytes, offset: int) -> Tuple[List[StackElement], int]:
+        stack = []
+        count = data[offset]
+        offset += 1
+        for _ in range(count):
+            concrete, tag, ancestor_count = _ELEMENT.unpack_from(data, offset)
+            offset += _ELEMENT.size
+            ancestor_tags = struct.unpack_from('<{}I'.format(ancestor_count), data, offset)
+            offset += 4 * ancestor_count
+            value = None
+            if concrete:
+                length = data[offset]
+                value = int.from_bytes(data[offset + 1:offset + 1 + length], 'big')
+                offset += 1 + length
+            stack.append(StackElement(tag, ancestor_tags, value))
+        return stack, offset
+
+
+class TraceRecorder:
+    """
+    Records a trace of the states at every opcode hooked by any of the known strategies during symbolic execution. For
+    each hook call the opcode, the topmost stack elements with their provenance and concrete values, the function name
+    and the same information about the previous state of the node is recorded, as well as the memory hashed by SHA3.
+    """
+
+    def __init__(self, path: Text, metadata: Optional[Dict] = None) -> None:
+        pre_hooks, post_hooks = recorded_hooks()
+        self.path = path
+        self.pre_hooks = pre_hooks
+        self.post_hooks = post_hooks
+        self._file = open(path, 'wb')
+        self._writer = TraceWriter(self._file, dict(metadata or {}, preHooks=pre_hooks, postHooks=post_hooks))
+        self._next_tag = 1
+
+    def close(self) -> None:
+        self._writer.close()
+        self._file.close()
+        log.info('Recorded %d events to trace file %s', self._writer.event_count, self.path)
+
+    def record(self, hook_type: int, hooked_opcode: Text, state: GlobalState) -> None:
+        """ Records the hook call of *hooked_opcode* on *state*, called by the hooks the analysis session registers. """
+        nodes_states = state.node.states if state.node is not None else []
+        prev_state = nodes_states[-1] if len(nodes_states) > 0 and state is not nodes_states[-1] else None
+        memory_offset, memory = 0, None
+        if hook_type == HOOK_PRE and state.instruction['opcode'] == 'SHA3':
+            memory_offset, memory = self._record_memory(state)
+        self._writer.write_event(TraceEvent(hook_type, hooked_opcode, state.environment.active_function_name,
+                                            self._record_state(state),
+                                            self._record_state(prev_state) if prev_state is not None else None,
+                                            memory_offset, memory))
+
+    def _record_state(self, state: GlobalState) -> StateRecord:
+        stack = state.mstate.stack
+        elements = [self._record_element(stack[-index]) for index in range(1, min(len(stack), RECORDED_STACK_ELEMENTS) + 1)]
+        return StateRecord(state.instruction['opcode'], len(stack), elements)
+
+    def _record_element(self, bitvec) -> StackElement:
+        expression_id = bitvec.raw.get_id()
+        tags = [annotation for annotation in bitvec.annotations if isinstance(annotation, TraceTag)]
+        own_tag = next((tag.tag_id for tag in tags if tag.expression_id == expression_id), None)
+        if own_tag is None:
+            own_tag = self._next_tag
+            self._next_tag += 1
+            bitvec.annotate(TraceTag(own_tag, expression_id))
+        ancestor_tags = tuple(sorted(tag.tag_id for tag in tags if tag.tag_id != own_tag))
+        return StackElement(own_tag, ancestor_tags, None if bitvec.symbolic else bitvec.value)
+
+    @staticmethod
+    def _record_memory(state: GlobalState) -> Tuple[int, Optional[List[Optional[int]]]]:
+        offset, length = state.mstate.stack[-1], state.mstate.stack[-2]
+        if offset.symbolic or length.symbolic or offset.value > 0xFFFFFFFF or length.value > MAX_RECORDED_MEMORY:
+            return 0, None
+        memory = []
+        for byte in state.mstate.memory[offset.value:offset.value + length.value]:
+            if isinstance(byte, int):
+                memory.append(byte)
+            else:
+                memory.append(None if byte.symbolic else byte.value)
+        return offset.value, memory
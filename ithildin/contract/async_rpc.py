@@ -0,0 +1,143 @@
+import asyncio
+import json
+import logging
+import ssl
+
+from typing import Any, Dict, List, Optional, Sequence, Text, Tuple
+
+from ithildin.contract.rpc import DEFAULT_BATCH_SIZE
+
+from mythril.ethereum.interface.rpc.client import GETH_DEFAULT_RPC_PORT, JSON_MEDIA_TYPE
+from mythril.ethereum.interface.rpc.exceptions import BadJsonError, BadResponseError, BadStatusCodeError, ConnectionError
+
+log = logging.getLogger(__name__)
+
+# Number of HTTP requests a client sends at the same time, further calls wait for one of them to finish
+DEFAULT_MAX_CONNECTIONS = 32
+# Seconds until a request that hasn't been answered fails
+DEFAULT_REQUEST_TIMEOUT = 30
+
+
+class AsyncJsonRpc:
+    """
+    JSON-RPC client for asyncio, with the calls needed to load contracts and resolve proxies. It accepts the same
+    arguments as *EthJsonRpc*, so that it can be created with *create_client()*, and raises the same exceptions.
+
+    Every call is sent in an HTTP/1.1 request on its own connection, with at most *max_connections* requests in flight,
+    so that one client can be shared by many concurrent analyses without overloading the provider. Requests fail after
+    *timeout* seconds. Like *BatchJsonRpc*, *batch_call()* sends many calls in a single request.
+    """
+
+    def __init__(self,
+                 host: Text = 'localhost',
+                 port: Optional[int] = GETH_DEFAULT_RPC_PORT,
+                 tls: bool = False,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 timeout: float = DEFAULT_REQUEST_TIMEOUT,
+                 batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        assert max_connections > 0, 'Number of connections must be positive'
+        assert batch_size > 0, 'Batch size must be positive'
+        # The host may include the path of the endpoint, as parsed by create_client()
+        self.hostname, _, path = host.partition('/')
+        self.path = '/' + path
+        self.port = int(port) if port else (443 if tls else 80)
+        self.tls = tls
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self._ssl_context = ssl.create_default_context() if tls else None
+        # Created on first use, since semaphores are bound to the event loop they're created in
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def call(self, method: Text, params: Optional[List] = None) -> Any:
+        response = await self._post({'jsonrpc': '2.0', 'method': method, 'params': params or [], 'id': 1})
+        if not isinstance(response, dict) or 'result' not in response:
+            raise BadResponseError(response)
+        return response['result']
+
+    async def batch_call(self, calls: Sequence[Tuple[Text, List]]) -> List[Optional[Any]]:
+        """ Sends the (method, params) *calls* in batches of *batch_size* calls, returns their results in the same order. """
+        batches = [calls[start:start + self.batch_size] for start in range(0, len(calls), self.batch_size)]
+        results = await asyncio.gather(*[self._batch_call(batch) for batch in batches])
+        return [result for batch_results in results for result in batch_results]
+
+    async def eth_getCode(self, address: Text, block: Text = 'latest') -> Optional[Text]:
+        return await self.call('eth_getCode', [address, block])
+
+    async def eth_getStorageAt(self, address: Text, position: int = 0, block: Text = 'latest') -> Optional[Text]:
+        return await self.call('eth_getStorageAt', [address, hex(position), block])
+
+    async def eth_call(self, transaction: Dict[Text, Text], block: Text = 'latest') -> Optional[Text]:
+        return await self.call('eth_call', [transaction, block])
+
+    async def _batch_call(self, calls: Sequence[Tuple[Text, List]]) -> List[Optional[Any]]:
+        responses = await self._post([{'jsonrpc': '2.0', 'method': method, 'params': params, 'id': i}
+                                      for i, (method, params) in enumerate(calls)])
+        if not isinstance(responses, list):
+            # Providers without batch support answer with a single error object
+            raise BadJsonError(responses)
+        results: List[Optional[Any]] = [None] * len(calls)
+        for item in responses:
+            if isinstance(item.get('id'), int) and 0 <= item['id'] < len(calls):
+                if 'error' in item:
+                    log.debug('Batched call %s failed: %s', calls[item['id']][0], item['error'])
+                results[item['id']] = item.get('result')
+        return results
+
+    async def _post(self, data: Any) -> Any:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+        async with self._semaphore:
+            try:
+                status, content = await asyncio.wait_for(self._request(json.dumps(data).encode('utf-8')), self.timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                log.debug('Request to %s:%d failed: %r', self.hostname, self.port, e)
+                raise ConnectionError
+        if status // 100 != 2:
+            raise BadStatusCodeError(status)
+        try:
+            return json.loads(content.decode('utf-8'))
+        except ValueError:
+            raise BadJsonError(content)
+
+    async def _request(self, body: bytes) -> Tuple[int, bytes]:
+        """ Posts *body* to the endpoint, returns the status code and content of the response. """
+        reader, writer = await asyncio.open_connection(self.hostname, self.port, ssl=self._ssl_context)
+        try:
+            default_port = 443 if self.tls else 80
+            host = self.hostname if self.port == default_port else '{}:{}'.format(self.hostname, self.port)
+            head = ('POST {} HTTP/1.1\r\n'
+                    'Host: {}\r\n'
+                    'Content-Type: {}\r\n'
+                    'Content-Length: {}\r\n'
+                    'Connection: close\r\n'
+                    '\r\n').format(self.path, host, JSON_MEDIA_TYPE, len(body))
+            writer.write(head.encode('latin-1') + body)
+            await writer.drain()
+
+            status_line = (await reader.readline()).decode('latin-1').split()
+            if len(status_line) < 2 or not status_line[1].isdigit():
+                raise BadStatusCodeError(' '.join(status_line))
+            headers: Dict[Text, Text] = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1').strip()
+                if line == '':
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            if headers.get('transfer-encoding', '').lower() == 'chunked':
+                content = b''
+                while True:
+                    chunk_size = int((await reader.readline()).split(b';')[0], 16)
+                    if chunk_size == 0:
+                        break
+                    content += await reader.readexactly(chunk_size)
+                    await reader.readline()
+            elif 'content-length' in headers:
+                content = await reader.readexactly(int(headers['content-length']))
+            else:
+                content = await reader.read()
+            return int(status_line[1]), content
+        finally:
+            writer.close()
@@ -0,0 +1,180 @@
+import json
+import logging
+import os
+import re
+import subprocess
+
+from typing import Dict, Iterable, List, Optional, Text
+
+from ithildin.support.compiler_version import Version, VersionMatcher, VERSION_REXEG
+from ithildin.support.profiler import CATEGORY_LOADING, Profiler
+
+log = logging.getLogger(__name__)
+
+SOLIDITY_EXTENSION = '.sol'
+LIBRARY_PLACEHOLDER_REGEX = r'(_{2}.{38})'
+
+
+class SolcBinary:
+    """ A solc executable together with the compiler version it reports. """
+
+    def __init__(self, path: Text):
+        self.path = path
+        self.version = self._query_version(path)
+
+    @staticmethod
+    def _query_version(path: Text) -> Version:
+        try:
+            output = subprocess.run([path, '--version'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True).stdout
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise ValueError('Unable to query version of solc binary \'%s\': %s' % (path, e))
+        match = re.search(VERSION_REXEG, output.decode('utf-8', 'replace').split('Version:')[-1])
+        if match is None:
+            raise ValueError('Unable to parse version of solc binary \'%s\'' % path)
+        return Version(raw=match.group(0))
+
+    def __repr__(self):
+        return (
+            '<SolcBinary '
+            'path={0.path} '
+            'version={0.version.raw}'
+            '>'
+        ).format(self)
+
+
+class CompiledContract:
+    """ A deployable contract taken from the standard JSON output of solc. """
+
+    def __init__(self, source_path: Text, name: Text, creation_code: Text, runtime_code: Text):
+        self.source_path = source_path
+        self.name = name
+        self.creation_code = creation_code
+        self.runtime_code = runtime_code
+
+    @property
+    def qualified_name(self) -> Text:
+        return '{}:{}'.format(self.source_path, self.name)
+
+    def __repr__(self):
+        return (
+            '<CompiledContract '
+            'source_path={0.source_path} '
+            'name={0.name}'
+            '>'
+        ).format(self)
+
+
+class SolidityBatchLoader:
+    """
+    Compiles a set of Solidity files (or all files found inside the given directories) with a single solc
+    standard JSON invocation per compiler version. The compiler for each file is chosen from the given solc
+    binaries by matching the file's version pragma, preferring the newest matching compiler. If the invocation of a
+    compiler fails, e.g. because of one broken file, its files are compiled one by one, so that only the broken ones
+    are dropped. Files whose pragma can't be expressed as a *VersionMatcher* are skipped.
+    """
+
+    def __init__(self, paths: Iterable[Text], solc_binaries: Iterable[Text]):
+        self._source_paths = self._find_sources(paths)
+        self._solc_binaries = sorted([SolcBinary(path) for path in solc_binaries],
+                                     key=lambda b: (b.version.major, b.version.minor, b.version.hotfix),
+                                     reverse=True)
+        assert len(self._solc_binaries) > 0, 'No solc binaries provided'
+
+    @property
+    def source_paths(self) -> List[Text]:
+        return self._source_paths
+
+    def contracts(self) -> List[CompiledContract]:
+        contracts = []
+        for solc, source_paths in self._group_by_compiler().items():
+            log.info('Compiling %d source file(s) with solc v%s', len(source_paths), solc.version.raw)
+            with Profiler().phase('solc compilation', CATEGORY_LOADING):
+                contracts.extend(self._compile(solc, source_paths))
+        return contracts
+
+    def _group_by_compiler(self) -> Dict[SolcBinary, List[Text]]:
+        groups: Dict[SolcBinary, List[Text]] = {}
+        for source_path in self._source_paths:
+            try:
+                solc = self._select_compiler(source_path)
+            except ValueError as e:
+                log.warning('%s in %s, skipping', e, source_path)
+                continue
+            if solc is None:
+                log.warning('No configured solc binary matches the version pragma of %s, skipping', source_path)
+                continue
+            groups.setdefault(solc, []).append(source_path)
+        return groups
+
+    def _select_compiler(self, source_path: Text) -> Optional[SolcBinary]:
+        with open(source_path, 'r', encoding='utf-8') as source_file:
+            version_matcher = VersionMatcher.from_pragma(source_file.read())
+        for solc in self._solc_binaries:
+            if version_matcher is None or version_matcher.matches(solc.version):
+                return solc
+        return None
+
+    def _compile(self, solc: SolcBinary, source_paths: List[Text]) -> List[CompiledContract]:
+        output = self._run_solc(solc, source_paths)
+        if output is None and len(source_paths) > 1:
+            # One broken file fails the whole invocation, so the files of the group are compiled one by one instead
+            log.warning('Compiling %d source files with solc v%s failed, compiling them separately',
+                        len(source_paths), solc.version.raw)
+            contracts = []
+            for source_path in source_paths:
+                contracts.extend(self._compile(solc, [source_path]))
+            return contracts
+        if output is None:
+            return []
+
+        contracts = []
+        for source_path in source_paths:
+            for name, contract in sorted(output.get('contracts', {}).get(source_path, {}).items()):
+                # Unlinked library addresses are replaced with a generic address, just like mythril does
+                creation_code = re.sub(LIBRARY_PLACEHOLDER_REGEX, 'aa' * 20, contract['evm']['bytecode']['object'])
+                runtime_code = re.sub(LIBRARY_PLACEHOLDER_REGEX, 'aa' * 20, contract['evm']['deployedBytecode']['object'])
+                # Interfaces and abstract contracts have no deployable bytecode
+                if len(runtime_code) > 0:
+                    contracts.append(CompiledContract(source_path, name, creation_code, runtime_code))
+        return contracts
+
+    @staticmethod
+    def _run_solc(solc: SolcBinary, source_paths: List[Text]) -> Optional[Dict]:
+        """ Returns the standard JSON output of compiling *source_paths* with *solc*, None if compilation failed. """
+        input_json = json.dumps({
+            'language': 'Solidity',
+            'sources': {path: {'urls': [path]} for path in source_paths},
+            'settings': {
+                'optimizer': {'enabled': True},
+                'outputSelection': {'*': {'*': ['evm.bytecode.object', 'evm.deployedBytecode.object']}}
+            }
+        })
+        allow_paths = os.path.commonpath([os.path.dirname(path) for path in source_paths])
+        command = [solc.path, '--standard-json', '--allow-paths', allow_paths]
+        try:
+            process = subprocess.run(command, input=input_json.encode('utf-8'), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            output = json.loads(process.stdout.decode('utf-8'))
+        except (OSError, ValueError) as e:
+            log.error('Failed to run solc v%s: %s', solc.version.raw, e)
+            return None
+
+        errors = [error for error in output.get('errors', []) if error.get('severity') == 'error']
+        if len(errors) > 0:
+            for error in errors:
+                log.error('solc v%s: %s', solc.version.raw, error.get('formattedMessage', error.get('message')))
+            return None
+        return output
+
+    @staticmethod
+    def _find_sources(paths: Iterable[Text]) -> List[Text]:
+        source_paths = []
+        for path in paths:
+            if os.path.isdir(path):
+                for root, _, filenames in os.walk(path):
+                    source_paths.extend(os.path.abspath(os.path.join(root, filename))
+                                        for filename in filenames if filename.endswith(SOLIDITY_EXTENSION))
+            elif os.path.isfile(path):
+                source_paths.append(os.path.abspath(path))
+            else:
+                raise IOError('No such file or directory: %s' % path)
+        return sorted(set(source_paths))
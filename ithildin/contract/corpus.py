@@ -0,0 +1,226 @@
+import hashlib
+import logging
+import mmap
+import os
+import struct
+
+from typing import Dict, Iterator, Optional, Text
+
+from ithildin.support.compiler_version import Version
+
+log = logging.getLogger(__name__)
+
+MAGIC = b'ITHCORPS'
+FORMAT_VERSION = 1
+
+# Entry flags
+FLAG_ADDRESS = 0x01
+FLAG_VERSION = 0x02
+FLAG_CREATION = 0x04
+
+_HEADER = struct.Struct('<8sBxxxIIQQQQ')
+_CODE = struct.Struct('<QI')
+_ENTRY = struct.Struct('<20sIBBBB')
+_ADDRESS_INDEX = struct.Struct('<I')
+
+
+class CorpusEntry:
+    """ A contract of a corpus, whose code is shared with all entries of the same *code_id*. """
+
+    def __init__(self, index: int, code_id: int, address: Optional[Text] = None, compiler_version: Optional[Version] = None,
+                 creation: bool = False) -> None:
+        self.index = index
+        self.code_id = code_id
+        self.address = address
+        self.compiler_version = compiler_version
+        self.creation = creation
+
+    def __repr__(self):
+        return (
+            '<CorpusEntry '
+            'index={0.index} '
+            'code_id={0.code_id} '
+            'address={0.address}'
+            '>'
+        ).format(self)
+
+
+class Corpus:
+    """
+    Read-only view of a packed bytecode corpus, a single file holding the raw bytecode of many contracts, each distinct
+    code stored once, together with an entry per contract. The file is memory-mapped, so opening a corpus takes the
+    same time regardless of its size, and codes are served as views into the mapping without copying.
+
+    A corpus file starts with a header holding the magic bytes, the format version, the counts of entries and codes
+    and the offsets of the sections, followed by the codes, the offset and length of each code, the entries with their
+    code id, address and compiler version, and the entry indexes ordered by address for lookups by address.
+    """
+
+    def __init__(self, path: Text) -> None:
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError('Not a corpus file: {}'.format(path))
+        try:
+            (magic, version, self.entry_count, self.code_count, self._blob_offset, self._code_table_offset,
+             self._entry_table_offset, self._address_index_offset) = _HEADER.unpack_from(self._mmap, 0)
+        except struct.error:
+            magic, version = None, None
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError('Not a corpus file of format version {}: {}'.format(FORMAT_VERSION, path))
+        self._view = memoryview(self._mmap)
+
+    def __len__(self) -> int:
+        return self.entry_count
+
+    def __iter__(self) -> Iterator[CorpusEntry]:
+        for index in range(self.entry_count):
+            yield self.entry(index)
+
+    def __enter__(self) -> 'Corpus':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def entry(self, index: int) -> CorpusEntry:
+        if not 0 <= index < self.entry_count:
+            raise IndexError('Corpus entry index out of range: {}'.format(index))
+        address, code_id, flags, major, minor, hotfix = _ENTRY.unpack_from(self._mmap, self._entry_table_offset + index * _ENTRY.size)
+        return CorpusEntry(index, code_id,
+                           address='0x' + address.hex() if flags & FLAG_ADDRESS else None,
+                           compiler_version=Version(major, minor, hotfix) if flags & FLAG_VERSION else None,
+                           creation=bool(flags & FLAG_CREATION))
+
+    def code(self, code_id: int) -> memoryview:
+        """ Returns the raw bytecode of *code_id* as a view into the mapped file, valid until the corpus is closed. """
+        if not 0 <= code_id < self.code_count:
+            raise IndexError('Corpus code id out of range: {}'.format(code_id))
+        offset, length = _CODE.unpack_from(self._mmap, self._code_table_offset + code_id * _CODE.size)
+        return self._view[self._blob_offset + offset:self._blob_offset + offset + length]
+
+    def find(self, address: Text) -> Optional[int]:
+        """ Returns the index of the first entry at *address* by binary search over the address index, None if there's none. """
+        key = bytes.fromhex(address[2:] if address.startswith('0x') else address)
+        low, high = 0, self.entry_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._address_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.entry_count and self._address_at(low) == key:
+            return _ADDRESS_INDEX.unpack_from(self._mmap, self._address_index_offset + low * _ADDRESS_INDEX.size)[0]
+        return None
+
+    def close(self) -> None:
+        if getattr(self, '_view', None) is not None:
+            self._view.release()
+            self._view = None
+        self._mmap.close()
+        self._file.close()
+
+    def _address_at(self, position: int) -> bytes:
+        """ Returns the address of the entry at *position* of the address index, entries without address sort first. """
+        index = _ADDRESS_INDEX.unpack_from(self._mmap, self._address_index_offset + position * _ADDRESS_INDEX.size)[0]
+        entry_offset = self._entry_table_offset + index * _ENTRY.size
+        if not self._mmap[entry_offset + 24] & FLAG_ADDRESS:
+            return b''
+        return self._mmap[entry_offset:entry_offset + 20]
+
+    def __repr__(self):
+        return (
+            '<Corpus '
+            'path={0.path} '
+            'entry_count={0.entry_count} '
+            'code_count={0.code_count}'
+            '>'
+        ).format(self)
+
+
+class CorpusWriter:
+    """
+    Writes a corpus file entry by entry. Codes are appended to the file as they are added, so only the hashes of the
+    distinct codes and the fixed size entries are kept in memory. The corpus is written to a temporary file that
+    replaces *path* once the writer is closed.
+    """
+
+    def __init__(self, path: Text) -> None:
+        self.path = path
+        self._temporary_path = '{}.{}.tmp'.format(path, os.getpid())
+        self._file = open(self._temporary_path, 'wb')
+        self._file.write(b'\0' * _HEADER.size)
+        self._blob_length = 0
+        self._code_ids: Dict[bytes, int] = {}
+        self._codes = bytearray()
+        self._entries = bytearray()
+        self.entry_count = 0
+
+    def __enter__(self) -> 'CorpusWriter':
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @property
+    def code_count(self) -> int:
+        return len(self._code_ids)
+
+    def add(self, code: bytes, address: Optional[Text] = None, compiler_version: Optional[Version] = None,
+            creation: bool = False) -> int:
+        """ Adds a contract with the raw bytecode *code*, returns the index of its entry. """
+        code_hash = hashlib.sha256(code).digest()
+        code_id = self._code_ids.get(code_hash)
+        if code_id is None:
+            code_id = self._code_ids[code_hash] = len(self._code_ids)
+            self._codes += _CODE.pack(self._blob_length, len(code))
+            self._file.write(code)
+            self._blob_length += len(code)
+        flags = FLAG_CREATION if creation else 0
+        raw_address = b'\0' * 20
+        if address is not None:
+            raw_address = bytes.fromhex(address[2:] if address.startswith('0x') else address)
+            assert len(raw_address) == 20, 'Invalid address: {}'.format(address)
+            flags |= FLAG_ADDRESS
+        major, minor, hotfix = 0, 0, 0
+        if compiler_version is not None:
+            major, minor, hotfix = compiler_version.major, compiler_version.minor, compiler_version.hotfix
+            flags |= FLAG_VERSION
+        self._entries += _ENTRY.pack(raw_address, code_id, flags, major, minor, hotfix)
+        self.entry_count += 1
+        return self.entry_count - 1
+
+    def close(self) -> None:
+        blob_offset = _HEADER.size
+        code_table_offset = blob_offset + self._blob_length
+        entry_table_offset = code_table_offset + len(self._codes)
+        address_index_offset = entry_table_offset + len(self._entries)
+        # Entries without address sort first, those at the same address in the order they were added
+        address_index = sorted(range(self.entry_count), key=lambda index: (self._entry_address(index), index))
+        self._file.write(self._codes)
+        self._file.write(self._entries)
+        for index in address_index:
+            self._file.write(_ADDRESS_INDEX.pack(index))
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, self.entry_count, self.code_count, blob_offset, code_table_offset,
+                                      entry_table_offset, address_index_offset))
+        self._file.close()
+        os.replace(self._temporary_path, self.path)
+        log.info('Wrote corpus of %d contracts with %d distinct codes to %s', self.entry_count, self.code_count, self.path)
+
+    def _entry_address(self, index: int) -> bytes:
+        entry_offset = index * _ENTRY.size
+        if not self._entries[entry_offset + 24] & FLAG_ADDRESS:
+            return b''
+        return bytes(self._entries[entry_offset:entry_offset + 20])
+
+    def abort(self) -> None:
+        self._file.close()
+        os.remove(self._temporary_path)
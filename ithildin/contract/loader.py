@@ -1,13 +1,15 @@
 import logging
-import re
 
-from ithildin.exception import ValidationError
+from ithildin.contract.async_rpc import AsyncJsonRpc
+from ithildin.contract.corpus import Corpus, CorpusEntry
+from ithildin.contract.proxy import ProxyType, resolve_proxy, resolve_proxy_async
+from ithildin.contract.rpc import create_client
+from ithildin.support.profiler import CATEGORY_LOADING, Profiler
 
 from abc import ABC, ABCMeta, abstractmethod
-from typing import Optional, Text
+from typing import Any, Dict, Optional, Text, Tuple, Union
 
 from mythril.ethereum.evmcontract import EVMContract
-from mythril.ethereum.interface.rpc.client import EthJsonRpc
 from mythril.disassembler.disassembly import Disassembly
 from mythril.solidity.soliditycontract import SolidityContract
 from mythril.support.loader import DynLoader
@@ -38,13 +40,22 @@ class FileLoader(ContractLoader, metaclass=ABCMeta):
 class BinaryLoader(FileLoader):
 
     def contract(self) -> EVMContract:
+        return EVMContract(creation_code=self._read_bytecode())
+
+    def _read_bytecode(self) -> Text:
         try:
             with open(self._file_path) as contract_bin:
-                bytecode = contract_bin.read()
+                return contract_bin.read()
         except IOError as e:
             log.error('Failed to open contract binary file: %s', e)
             raise IOError('Failed to open contract binary file')
-        return EVMContract(creation_code=bytecode)
+
+
+class RuntimeBinaryLoader(BinaryLoader):
+    """ Loads a contract from a file containing its runtime bytecode, e.g. as deployed or output by solc --bin-runtime. """
+
+    def contract(self) -> EVMContract:
+        return EVMContract(code=self._read_bytecode().strip())
 
 
 class SolidityLoader(FileLoader):
@@ -54,29 +65,24 @@ class SolidityLoader(FileLoader):
         self._solc = solc
 
     def contract(self) -> EVMContract:
-        return SolidityContract(self._file_path, solc_binary=self._solc)
+        with Profiler().phase('solc compilation', CATEGORY_LOADING):
+            return SolidityContract(self._file_path, solc_binary=self._solc)
 
 
 class JsonRpcLoader(ContractLoader):
+    """
+    Loads contracts deployed at *address*. When *resolve_proxies* is set, EIP-1167 minimal proxies and
+    EIP-1967 (or ZeppelinOS) proxies are recognized and the loader serves the implementation's code instead.
+    """
 
-    def __init__(self, address: Text, rpc: Optional[Text] = None):
+    def __init__(self, address: Text, rpc: Optional[Text] = None, resolve_proxies: bool = False):
         assert address is not None, "No contract address provided"
 
-        if rpc is None:
-            eth_json_rpc = EthJsonRpc()
-        else:
-            match = re.match(r'(http(s)?:\/\/)?([a-zA-Z0-9\.\-]+)(:([0-9]+))?(\/.+)?', rpc)
-            if match:
-                host = match.group(3)
-                port = match.group(5) if match.group(4) else None
-                path = match.group(6) if match.group(6) else ''
-                tls = bool(match.group(2))
-                log.debug('Parsed RPC provider params: host=%s, port=%s, tls=%r, path=%s', host, port, tls, path)
-                eth_json_rpc = EthJsonRpc(host=host + path, port=port, tls=tls)
-            else:
-                raise ValidationError('Invalid JSON RPC URL provided: "%s"' % rpc)
-        self._dyn_loader = DynLoader(eth_json_rpc)
+        self._dyn_loader = DynLoader(create_client(rpc))
         self._address = address
+        self._resolve_proxies = resolve_proxies
+        self._proxy: Optional[Tuple[ProxyType, Text, Text]] = None
+        self._proxy_resolved = False
 
     @property
     def dyn_loader(self) -> DynLoader:
@@ -86,5 +92,154 @@ class JsonRpcLoader(ContractLoader):
     def address(self) -> Text:
         return self._address
 
+    @property
+    def proxy_type(self) -> Optional[ProxyType]:
+        return self._resolve()[0] if self._resolve() else None
+
+    @property
+    def implementation_address(self) -> Optional[Text]:
+        """ The address of the code that is executed on behalf of this contract if it's a proxy, None otherwise. """
+        return self._resolve()[1] if self._resolve() else None
+
+    @property
+    def implementation_code(self) -> Optional[Text]:
+        return self._resolve()[2] if self._resolve() else None
+
     def disassembly(self) -> Optional[Disassembly]:
+        if self.implementation_address is not None:
+            return self.dyn_loader.dynld(self.implementation_address)
         return self.dyn_loader.dynld(self.address)
+
+    def _resolve(self) -> Optional[Tuple[ProxyType, Text, Text]]:
+        if self._resolve_proxies and not self._proxy_resolved:
+            self._proxy_resolved = True
+            code = self.dyn_loader.eth.eth_getCode(self.address)
+            if code is not None and len(code) > 2:
+                self._proxy = resolve_proxy(self.address, code, self.dyn_loader)
+            if self._proxy is not None:
+                log.info('Contract at %s is a %s proxy for %s', self.address, self._proxy[0].value, self._proxy[1])
+        return self._proxy
+
+
+class AsyncJsonRpcLoader(ContractLoader):
+    """
+    Loads contracts deployed at *address* like *JsonRpcLoader*, but fetches their code, and resolves proxies if
+    *resolve_proxies* is set, with an asyncio client when *load()* is awaited, which has to happen before the loader is
+    used. Storage is read during symbolic execution through a blocking *DynLoader*, which is only created on first use,
+    so that a loaded loader can be handed to the thread or worker process running the analysis.
+    """
+
+    def __init__(self, address: Text, rpc: Optional[Text] = None, resolve_proxies: bool = False):
+        assert address is not None, "No contract address provided"
+
+        self._address = address
+        self._rpc = rpc
+        self._resolve_proxies = resolve_proxies
+        self._code: Optional[Text] = None
+        self._proxy: Optional[Tuple[ProxyType, Text, Text]] = None
+        self._loaded = False
+        self._dyn_loader: Optional[DynLoader] = None
+
+    async def load(self, client: Optional[AsyncJsonRpc] = None) -> 'AsyncJsonRpcLoader':
+        """ Fetches the code at the address and resolves proxies, using *client* if given, which many loaders can share. """
+        client = client if client is not None else create_client(self._rpc, AsyncJsonRpc)
+        self._code = await client.eth_getCode(self._address)
+        if self._resolve_proxies and self._code is not None and len(self._code) > 2:
+            self._proxy = await resolve_proxy_async(self._address, self._code, client)
+            if self._proxy is not None:
+                log.info('Contract at %s is a %s proxy for %s', self._address, self._proxy[0].value, self._proxy[1])
+        self._loaded = True
+        return self
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def dyn_loader(self) -> DynLoader:
+        if self._dyn_loader is None:
+            self._dyn_loader = DynLoader(create_client(self._rpc))
+        return self._dyn_loader
+
+    @property
+    def address(self) -> Text:
+        return self._address
+
+    @property
+    def code(self) -> Optional[Text]:
+        """ The runtime code deployed at the address, None if there is none. """
+        return self._code if self._code is not None and len(self._code) > 2 else None
+
+    @property
+    def proxy_type(self) -> Optional[ProxyType]:
+        return self._proxy[0] if self._proxy else None
+
+    @property
+    def implementation_address(self) -> Optional[Text]:
+        """ The address of the code that is executed on behalf of this contract if it's a proxy, None otherwise. """
+        return self._proxy[1] if self._proxy else None
+
+    @property
+    def implementation_code(self) -> Optional[Text]:
+        return self._proxy[2] if self._proxy else None
+
+    @property
+    def runtime_code(self) -> Optional[Text]:
+        """ The code executed on behalf of this contract, i.e. the implementation's code if it's a proxy. """
+        return self.implementation_code or self.code
+
+    def disassembly(self) -> Optional[Disassembly]:
+        assert self._loaded, 'Contract has not been loaded'
+        return Disassembly(self.runtime_code) if self.runtime_code is not None else None
+
+    def __getstate__(self) -> Dict[Text, Any]:
+        # Worker processes create their own dynamic loader rather than receiving a copy of this one's HTTP session
+        state = dict(self.__dict__)
+        state['_dyn_loader'] = None
+        return state
+
+
+class CorpusLoader(ContractLoader):
+    """
+    Loads the contract of a packed corpus (see *ithildin.contract.corpus*) given by its *entry* index or address. The
+    *corpus* is either the path of a corpus file or an open corpus, which loaders of many entries can share. Storage of
+    entries with an address is read through *rpc* if given.
+    """
+
+    def __init__(self, corpus: Union[Text, Corpus], entry: Union[int, Text], rpc: Optional[Text] = None):
+        assert entry is not None, "No corpus entry provided"
+
+        self._corpus = Corpus(corpus) if isinstance(corpus, str) else corpus
+        if isinstance(entry, int):
+            self._entry = self._corpus.entry(entry)
+        else:
+            index = self._corpus.find(entry)
+            if index is None:
+                raise ValueError('No contract at address {} in corpus {}'.format(entry, self._corpus.path))
+            self._entry = self._corpus.entry(index)
+        assert self._entry.creation or self._entry.address is not None, 'Runtime code entries need an address'
+        self._dyn_loader = DynLoader(create_client(rpc)) if rpc is not None and self._entry.address is not None else None
+
+    @property
+    def entry(self) -> CorpusEntry:
+        return self._entry
+
+    @property
+    def address(self) -> Optional[Text]:
+        return self._entry.address
+
+    @property
+    def dyn_loader(self) -> Optional[DynLoader]:
+        return self._dyn_loader
+
+    @property
+    def creation(self) -> bool:
+        """ Whether the entry holds creation code, otherwise it holds the runtime code deployed at its address. """
+        return self._entry.creation
+
+    @property
+    def code(self) -> Text:
+        return self._corpus.code(self._entry.code_id).hex()
+
+    def disassembly(self) -> Disassembly:
+        return Disassembly(self.code)
@@ -2,13 +2,17 @@ from abc import ABC, abstractmethod
 from enum import Enum
 from typing import Set, Text, Union
 
-from ithildin.contract.loader import FileLoader, BinaryLoader, SolidityLoader, JsonRpcLoader
+from ithildin.contract.batch import SolidityBatchLoader
+from ithildin.contract.loader import FileLoader, BinaryLoader, CorpusLoader, RuntimeBinaryLoader, SolidityLoader, JsonRpcLoader
 
 
 class LoaderFactoryType(Enum):
     BINARY = 1
     SOLIDITY = 2
     JSON_RPC = 3
+    SOLIDITY_BATCH = 4
+    CORPUS = 5
+    RUNTIME_BINARY = 6
 
 
 class ContractLoaderFactory(ABC):
@@ -25,7 +29,7 @@ class ContractLoaderFactory(ABC):
         pass
 
     @abstractmethod
-    def create(self) -> Union[FileLoader, JsonRpcLoader]:
+    def create(self) -> Union[FileLoader, JsonRpcLoader, SolidityBatchLoader, CorpusLoader]:
         pass
 
 
@@ -39,6 +43,16 @@ class BinaryLoaderFactory(ContractLoaderFactory):
         return {'path'}
 
 
+class RuntimeBinaryLoaderFactory(ContractLoaderFactory):
+
+    def create(self) -> FileLoader:
+        return RuntimeBinaryLoader(self._options.get('path'))
+
+    @property
+    def _required_options(self) -> Set[Text]:
+        return {'path'}
+
+
 class SolidityLoaderFactory(ContractLoaderFactory):
 
     def create(self) -> FileLoader:
@@ -52,18 +66,42 @@ class SolidityLoaderFactory(ContractLoaderFactory):
 class JsonRpcLoaderFactory(ContractLoaderFactory):
 
     def create(self) -> JsonRpcLoader:
-        return JsonRpcLoader(self._options.get('address'), self._options.get('rpc'))
+        return JsonRpcLoader(self._options.get('address'), self._options.get('rpc'),
+                             resolve_proxies=self._options.get('resolve_proxies', False))
 
     @property
     def _required_options(self) -> Set[Text]:
         return {'address', 'rpc'}
 
 
+class SolidityBatchLoaderFactory(ContractLoaderFactory):
+
+    def create(self) -> SolidityBatchLoader:
+        return SolidityBatchLoader(self._options.get('paths'), self._options.get('solc_binaries'))
+
+    @property
+    def _required_options(self) -> Set[Text]:
+        return {'paths', 'solc_binaries'}
+
+
+class CorpusLoaderFactory(ContractLoaderFactory):
+
+    def create(self) -> CorpusLoader:
+        return CorpusLoader(self._options.get('corpus'), self._options.get('entry'), rpc=self._options.get('rpc'))
+
+    @property
+    def _required_options(self) -> Set[Text]:
+        return {'corpus', 'entry'}
+
+
 def get_factory(loader_type: LoaderFactoryType, **options) -> ContractLoaderFactory:
     switcher = {
         LoaderFactoryType.BINARY:   BinaryLoaderFactory,
         LoaderFactoryType.SOLIDITY: SolidityLoaderFactory,
-        LoaderFactoryType.JSON_RPC: JsonRpcLoaderFactory
+        LoaderFactoryType.JSON_RPC: JsonRpcLoaderFactory,
+        LoaderFactoryType.SOLIDITY_BATCH: SolidityBatchLoaderFactory,
+        LoaderFactoryType.CORPUS: CorpusLoaderFactory,
+        LoaderFactoryType.RUNTIME_BINARY: RuntimeBinaryLoaderFactory
     }
     if loader_type not in switcher:
         raise NotImplementedError('This factory has not been implemented yet')
@@ -0,0 +1,143 @@
+import logging
+import re
+
+from enum import Enum
+from typing import Generator, Optional, Text, Tuple, Union
+
+from ithildin.contract.async_rpc import AsyncJsonRpc
+
+from mythril.support.loader import DynLoader
+
+log = logging.getLogger(__name__)
+
+# EIP-1167 minimal proxy runtime code, with the implementation address as the only variable part
+MINIMAL_PROXY_REGEX = r'^(0x)?363d3d373d3d3d363d73([0-9a-fA-F]{40})5af43d82803e903d91602b57fd5bf3$'
+
+# bytes32(uint256(keccak256('eip1967.proxy.implementation')) - 1)
+EIP1967_IMPLEMENTATION_SLOT = 0x360894a13ba1a3210667c828492db98dca3e2076cc3735a920a3ca505d382bbc
+# bytes32(uint256(keccak256('eip1967.proxy.beacon')) - 1)
+EIP1967_BEACON_SLOT = 0xa3f0ad74e5423aebfd80d3ef4346578335a9a72aeaee59ff6cb3582b35133d50
+# keccak256('org.zeppelinos.proxy.implementation'), used by OpenZeppelin's transparent proxies before EIP-1967
+ZEPPELINOS_IMPLEMENTATION_SLOT = 0x7050c9e0f4ca769c69bd3a8ef740bc37934f8e2c036e5a723fd8ee048ed3f8c3
+
+# Function selector of implementation()
+BEACON_IMPLEMENTATION_SELECTOR = '0x5c60da1b'
+
+# Proxies pointing to proxies are followed up to this depth
+MAX_RESOLUTION_DEPTH = 3
+
+
+class ProxyType(Enum):
+    MINIMAL = 'EIP-1167'
+    EIP1967 = 'EIP-1967'
+    BEACON = 'EIP-1967 Beacon'
+    ZEPPELINOS = 'ZeppelinOS'
+
+
+def minimal_proxy_target(code: Text) -> Optional[Text]:
+    """ Returns the implementation address if *code* is an EIP-1167 minimal proxy, None otherwise. """
+    match = re.match(MINIMAL_PROXY_REGEX, code)
+    return '0x' + match.group(2).lower() if match else None
+
+
+def _word_to_address(word: Optional[Text]) -> Optional[Text]:
+    """ Extracts the address from the lower 20 bytes of a 32 byte hex word, None for the zero address. """
+    if word is None or len(word) <= 2:
+        return None
+    value = int(word, 16) & ((1 << 160) - 1)
+    return '0x{:040x}'.format(value) if value != 0 else None
+
+
+def _contains_slot(code: Text, slot: int) -> bool:
+    return '{:064x}'.format(slot) in code.lower()
+
+
+def resolve_proxy(address: Text, code: Text, dyn_loader: DynLoader) -> Optional[Tuple[ProxyType, Text, Text]]:
+    """
+    Checks whether *code* (the runtime code at *address*) forwards all calls to an implementation contract. Proxies are
+    recognized by their code (EIP-1167) or by the well-known storage slots their code reads from (EIP-1967, beacons and
+    ZeppelinOS), in which case the slot is read at *address*. Chains of proxies are followed.
+
+    Returns
+    -------
+    The proxy type of *address*, the final implementation address and the implementation's runtime code if *code*
+    is a proxy with a resolvable implementation, None otherwise.
+    """
+    resolution = _resolution(address, code)
+    try:
+        read = next(resolution)
+        while True:
+            kind, read_address, argument = read
+            if kind == READ_STORAGE:
+                result = dyn_loader.read_storage(read_address, argument)
+            elif kind == READ_CODE:
+                result = dyn_loader.eth.eth_getCode(read_address)
+            else:
+                result = dyn_loader.eth.eth_call({'to': read_address, 'data': argument})
+            read = resolution.send(result)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def resolve_proxy_async(address: Text, code: Text, client: AsyncJsonRpc) -> Optional[Tuple[ProxyType, Text, Text]]:
+    """ Like *resolve_proxy()*, but reads storage and code with the asyncio *client*. """
+    resolution = _resolution(address, code)
+    try:
+        read = next(resolution)
+        while True:
+            kind, read_address, argument = read
+            if kind == READ_STORAGE:
+                result = await client.eth_getStorageAt(read_address, argument)
+            elif kind == READ_CODE:
+                result = await client.eth_getCode(read_address)
+            else:
+                result = await client.eth_call({'to': read_address, 'data': argument})
+            read = resolution.send(result)
+    except StopIteration as stop:
+        return stop.value
+
+
+# Reads of a proxy resolution, yielded as (kind, address, argument) and answered by the synchronous or asyncio caller
+Read = Tuple[Text, Text, Optional[Union[int, Text]]]
+READ_STORAGE = 'storage'
+READ_CODE = 'code'
+READ_CALL = 'call'
+
+
+def _resolution(address: Text, code: Text) -> Generator[Read, Optional[Text], Optional[Tuple[ProxyType, Text, Text]]]:
+    """ Resolves the proxy at *address* as described by *resolve_proxy()*, yielding the reads it needs. """
+    proxy_type = None
+    for _ in range(MAX_RESOLUTION_DEPTH):
+        resolved = yield from _resolve_once(address, code)
+        if resolved is None:
+            break
+        proxy_type = proxy_type or resolved[0]
+        address = resolved[1]
+        code = yield READ_CODE, address, None
+        if code is None or len(code) <= 2:
+            log.warning('Proxy implementation at %s has no code', address)
+            return None
+    if proxy_type is None:
+        return None
+    return proxy_type, address, code
+
+
+def _resolve_once(address: Text, code: Text) -> Generator[Read, Optional[Text], Optional[Tuple[ProxyType, Text]]]:
+    target = minimal_proxy_target(code)
+    if target is not None:
+        return ProxyType.MINIMAL, target
+
+    for proxy_type, slot in [(ProxyType.EIP1967, EIP1967_IMPLEMENTATION_SLOT), (ProxyType.ZEPPELINOS, ZEPPELINOS_IMPLEMENTATION_SLOT)]:
+        if _contains_slot(code, slot):
+            target = _word_to_address((yield READ_STORAGE, address, slot))
+            if target is not None:
+                return proxy_type, target
+
+    if _contains_slot(code, EIP1967_BEACON_SLOT):
+        beacon = _word_to_address((yield READ_STORAGE, address, EIP1967_BEACON_SLOT))
+        if beacon is not None:
+            target = _word_to_address((yield READ_CALL, beacon, BEACON_IMPLEMENTATION_SELECTOR))
+            if target is not None:
+                return ProxyType.BEACON, target
+
+    return None
@@ -0,0 +1,124 @@
+import json
+import logging
+import re
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Text, Tuple, Type, TypeVar
+
+from ithildin.exception import ValidationError
+
+from mythril.ethereum.interface.rpc.client import EthJsonRpc, JSON_MEDIA_TYPE
+from mythril.ethereum.interface.rpc.constants import BLOCK_TAG_LATEST
+from mythril.ethereum.interface.rpc.exceptions import BadJsonError, BadStatusCodeError, ConnectionError
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+log = logging.getLogger(__name__)
+
+RPC_URL_REGEX = r'(http(s)?:\/\/)?([a-zA-Z0-9\.\-]+)(:([0-9]+))?(\/.+)?'
+
+# Number of calls sent in a single batch request, many providers reject larger batches
+DEFAULT_BATCH_SIZE = 100
+# Number of batch requests sent concurrently when fetching code
+DEFAULT_FETCH_JOBS = 4
+
+Client = TypeVar('Client', bound=EthJsonRpc)
+
+
+class JsonRpc(EthJsonRpc):
+    """ Mythril's JSON-RPC client, extended by the calls it has no method for. """
+
+    def eth_call(self, transaction: Dict[Text, Text], block: Text = BLOCK_TAG_LATEST) -> Optional[Text]:
+        """ Executes the message call *transaction* without creating a transaction, returns the data it returned. """
+        return self._call('eth_call', [transaction, block])
+
+
+def create_client(rpc: Optional[Text] = None, client_type: Type[Client] = JsonRpc, **kwargs) -> Client:
+    """ Creates a JSON-RPC client of *client_type* connected to the *rpc* URL, or to the local default if not given. """
+    if rpc is None:
+        return client_type(**kwargs)
+    match = re.match(RPC_URL_REGEX, rpc)
+    if not match:
+        raise ValidationError('Invalid JSON RPC URL provided: "%s"' % rpc)
+    host = match.group(3)
+    port = match.group(5) if match.group(4) else None
+    path = match.group(6) if match.group(6) else ''
+    tls = bool(match.group(2))
+    log.debug('Parsed RPC provider params: host=%s, port=%s, tls=%r, path=%s', host, port, tls, path)
+    return client_type(host=host + path, port=port, tls=tls, **kwargs)
+
+
+class BatchJsonRpc(JsonRpc):
+    """
+    JSON-RPC client that sends many calls in a single HTTP request, *batch_size* calls at a time. A call that fails
+    on its own yields None instead of failing the whole batch.
+    """
+
+    def __init__(self, host='localhost', port=None, tls=False, batch_size: int = DEFAULT_BATCH_SIZE):
+        super().__init__(host=host, port=port, tls=tls)
+        assert batch_size > 0, 'Batch size must be positive'
+        self.batch_size = batch_size
+
+    @property
+    def url(self) -> Text:
+        scheme = 'https' if self.tls else 'http'
+        if self.host and self.port:
+            return '{}://{}:{}'.format(scheme, self.host, self.port)
+        return '{}://{}'.format(scheme, self.host)
+
+    def batch_call(self, calls: Sequence[Tuple[Text, List]]) -> List[Optional[Any]]:
+        """ Sends the (method, params) *calls* in batches, returns their results in the same order. """
+        results: List[Optional[Any]] = []
+        for start in range(0, len(calls), self.batch_size):
+            results.extend(self._batch_call(calls[start:start + self.batch_size]))
+        return results
+
+    def get_storage_at_batch(self, slots: Sequence[Tuple[Text, int]]) -> List[Optional[Text]]:
+        """ Reads the storage at each (address, index) in *slots* of the latest block. """
+        return self.batch_call([('eth_getStorageAt', [address, hex(index), 'latest']) for address, index in slots])
+
+    def get_code_batch(self, addresses: Sequence[Text]) -> List[Optional[Text]]:
+        return self.batch_call([('eth_getCode', [address, 'latest']) for address in addresses])
+
+    def _batch_call(self, calls: Sequence[Tuple[Text, List]]) -> List[Optional[Any]]:
+        data = [{'jsonrpc': '2.0', 'method': method, 'params': params, 'id': i} for i, (method, params) in enumerate(calls)]
+        try:
+            response = self.session.post(self.url, headers={'Content-Type': JSON_MEDIA_TYPE}, data=json.dumps(data))
+        except RequestsConnectionError:
+            raise ConnectionError
+        if response.status_code // 100 != 2:
+            raise BadStatusCodeError(response.status_code)
+        try:
+            responses = response.json()
+        except ValueError:
+            raise BadJsonError(response.text)
+        if not isinstance(responses, list):
+            # Providers without batch support answer with a single error object
+            raise BadJsonError(response.text)
+        results: List[Optional[Any]] = [None] * len(calls)
+        for item in responses:
+            if isinstance(item.get('id'), int) and 0 <= item['id'] < len(calls):
+                if 'error' in item:
+                    log.debug('Batched call %s failed: %s', calls[item['id']][0], item['error'])
+                results[item['id']] = item.get('result')
+        return results
+
+
+def fetch_codes(rpc: Optional[Text], addresses: Sequence[Text], batch_size: int = DEFAULT_BATCH_SIZE,
+                jobs: int = DEFAULT_FETCH_JOBS) -> List[Optional[Text]]:
+    """
+    Fetches the runtime code at each of the *addresses*, sending at most *jobs* batch requests of *batch_size* calls
+    at the same time. Returns the codes in the order of the addresses, None for addresses whose code couldn't be read.
+    """
+    assert jobs > 0, 'Number of jobs must be positive'
+    batches = [addresses[start:start + batch_size] for start in range(0, len(addresses), batch_size)]
+
+    def fetch_batch(batch: Sequence[Text]) -> List[Optional[Text]]:
+        # Each request gets its own client, since the HTTP session of a client is not meant to be shared by threads
+        try:
+            return create_client(rpc, BatchJsonRpc, batch_size=batch_size).get_code_batch(batch)
+        except (BadJsonError, BadStatusCodeError, ConnectionError) as e:
+            log.warning('Unable to fetch the code of %d addresses: %s', len(batch), e)
+            return [None] * len(batch)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return [code for codes in executor.map(fetch_batch, batches) for code in codes]
@@ -1,3 +1,7 @@
 
 class ValidationError(Exception):
     pass
+
+
+class AnalysisCancelled(Exception):
+    pass
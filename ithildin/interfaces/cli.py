@@ -1,20 +1,42 @@
+import json
 import logging
 
 from argparse import ArgumentParser
-from typing import Text
+from typing import Dict, Optional, Text
 
 from ithildin import __version__
-from ithildin.analysis.loader import STRATEGIES
+from ithildin.analysis.batch import analyze_contracts
+from ithildin.analysis.budget import get_budget_planner
+from ithildin.analysis.diff import load_baseline
+from ithildin.analysis.loader import create_strategies, STRATEGIES
+from ithildin.analysis.memory import DEFAULT_SAMPLE_INTERVAL
+from ithildin.analysis.prologue import PrologueBound
+from ithildin.analysis.replay import replay_trace
+from ithildin.analysis.search import SEARCH_STRATEGIES
 from ithildin.analysis.symbolic import LaserWrapper
 from ithildin.contract.loader_factory import get_factory, LoaderFactoryType
+from ithildin.contract.rpc import DEFAULT_BATCH_SIZE, DEFAULT_FETCH_JOBS
+from ithildin.exception import ValidationError
 from ithildin.support.compiler_version import VersionParseAction
+from ithildin.support.profiler import Profiler
 from ithildin.tools import benchmark_state_path
 from ithildin.tools.benchmark import benchmark
+from ithildin.tools.corpus import corpus, parse_entry
+from ithildin.tools.history_db import history_db_path
+from ithildin.tools.perf import BASELINE_PATH, fixture_paths, perf
+from ithildin.tools.query import query, store_reports
+from ithildin.tools.results_db import results_db_path
+from ithildin.tools.scaling import SCALING_PARAMETERS, scaling
+from ithildin.tools.synthetic import GUARDS
+from ithildin.tools.watch import watch
 
 # Default analysis arguments
 DEFAULT_MAX_DEPTH = 128
+DEFAULT_MIN_DEPTH = 32
+DEFAULT_MIN_TIMEOUT = 10
 DEFAULT_RPC = 'http://127.0.0.1:8545'
 DEFAULT_SOLC = 'solc'
+DEFAULT_SEARCH_STRATEGY = 'dfs'
 DEFAULT_TIMEOUT_ANALYSIS = 60
 
 # Default benchmark arguments
@@ -26,29 +48,146 @@ DEFAULT_TIMEOUT_BENCHMARK = 90
 DEFAULT_SEED = 1
 DEFAULT_VERIFICATION_RATIO = 0.1
 
+# Default performance suite arguments
+DEFAULT_PERF_REPEAT = 5
+
+# Default scaling suite arguments
+DEFAULT_FUNCTIONS = 10
+DEFAULT_GUARDED_RATIO = 0.5
+DEFAULT_SCALING_JOBS = 1
+
+# Default watch mode arguments
+DEFAULT_WATCH_INTERVAL = 300
+DEFAULT_CODE_CHECK_EVERY = 12
+
+log = logging.getLogger(__name__)
+
 
 def populate_analysis_parser(parser: ArgumentParser) -> None:
     parser.add_argument('--json', action='store_true', dest='as_json', help='print report as JSON to standard output')
+    parser.add_argument('--store', metavar='DB', type=Text, nargs='?', const=results_db_path, dest='store_path',
+                        help='store the reports in a results warehouse (default: {})'.format(results_db_path))
 
     input_group = parser.add_mutually_exclusive_group(required=True)
     input_group.add_argument('-a', '--address', metavar='ADDRESS', type=Text, help='contract address to analyze')
     input_group.add_argument('-s', '--sol', metavar='PATH', type=Text, dest='sol_path', help='path to solidity contract')
     input_group.add_argument('-b', '--bin', metavar='PATH', type=Text, dest='bin_path',
                              help='path to file containing contract creation bytecode')
+    input_group.add_argument('--bin-runtime', metavar='PATH', type=Text, dest='bin_runtime_path',
+                             help='path to file containing contract runtime bytecode, analyzed without a constructor')
+    input_group.add_argument('--sol-batch', metavar='PATH', type=Text, nargs='+', dest='sol_batch_paths',
+                             help='solidity files or directories to compile together and analyze contract by contract')
+    input_group.add_argument('--corpus', metavar='PATH', type=Text, dest='corpus_path',
+                             help='path to a packed corpus built with "corpus import", see --entry')
+    parser.add_argument('--entry', metavar='INDEX|ADDRESS', type=Text, help='the corpus entry to analyze, by index or address')
 
     sym_exec_arguments = parser.add_argument_group('symbolic execution arguments')
     sym_exec_arguments.add_argument('--timeout', metavar='SEC', type=int, default=DEFAULT_TIMEOUT_ANALYSIS,
                                     help='symbolic execution timeout (default: {})'.format(DEFAULT_TIMEOUT_ANALYSIS))
     sym_exec_arguments.add_argument('--max-depth', metavar='DEPTH', type=int, default=DEFAULT_MAX_DEPTH,
                                     help='max graph depth (default: {})'.format(DEFAULT_MAX_DEPTH))
+    sym_exec_arguments.add_argument('--search', choices=SEARCH_STRATEGIES.keys(), default=DEFAULT_SEARCH_STRATEGY,
+                                    help='state space search strategy (default: {})'.format(DEFAULT_SEARCH_STRATEGY))
+    populate_budget_arguments(sym_exec_arguments)
+    sym_exec_arguments.add_argument('--static-fast-path', action='store_true',
+                                    help='detect patterns statically where possible, using symbolic execution only if inconclusive')
+    populate_prologue_arguments(sym_exec_arguments)
+    sym_exec_arguments.add_argument('--runtime', action='store_true',
+                                    help='deploy --bin, --sol and --sol-batch contracts concretely and only execute their runtime code')
+    populate_functions_argument(sym_exec_arguments)
+    sym_exec_arguments.add_argument('--baseline', metavar='PATH', type=Text, dest='baseline_path',
+                                    help='a JSON report or the runtime bytecode of a prior version, only changed functions are analyzed')
+    sym_exec_arguments.add_argument('--record-trace', metavar='PATH', type=Text, dest='trace_path',
+                                    help='record the states hooked by the strategies to a trace file (a directory in batch mode)')
 
     networking_group = parser.add_argument_group('networking arguments')
     networking_group.add_argument('--rpc', metavar="RPC", type=Text, default=DEFAULT_RPC,
                                   help='JSON RPC provider URL (default: \'{}\')'.format(DEFAULT_RPC))
+    networking_group.add_argument('--resolve-proxies', action='store_true',
+                                  help='analyze the implementation behind EIP-1167 and EIP-1967 proxies')
 
     compilation_group = parser.add_argument_group('compilation arguments')
     compilation_group.add_argument('--solc', metavar='SOLC', type=Text, default=DEFAULT_SOLC,
                                    help='solc binary path (default: \'{}\')'.format(DEFAULT_SOLC))
+    compilation_group.add_argument('--solc-binaries', metavar='SOLC', type=Text, nargs='+',
+                                   help='solc binaries to choose from by version pragma in batch mode (default: the --solc binary)')
+
+    populate_profiling_arguments(parser.add_argument_group('profiling arguments'))
+    populate_memory_arguments(parser.add_argument_group('memory arguments'))
+
+    batch_group = parser.add_argument_group('batch arguments')
+    batch_group.add_argument('--jobs', metavar='N', type=int,
+                             help='number of contracts analyzed in parallel in batch mode (default: CPU count)')
+    populate_supervision_arguments(batch_group)
+    batch_group.add_argument('--no-dedup', action='store_true',
+                             help='analyze every contract in batch mode instead of once per distinct runtime code (ignoring metadata)')
+    batch_group.add_argument('--batch-deadline', metavar='SEC', type=int,
+                             help='with --adaptive-budget, no contract is analyzed past this many seconds after the start')
+
+
+def populate_functions_argument(group) -> None:
+    group.add_argument('--functions', metavar='FUNCTION', type=Text, nargs='+',
+                       help='only analyze these functions, by signature (e.g. "mint(address,uint256)") or selector (e.g. 0x40c10f19)')
+
+
+def populate_supervision_arguments(group) -> None:
+    group.add_argument('--hard-timeout', metavar='SEC', type=float,
+                       help='analyze each contract in a supervised worker process that is killed after this many seconds')
+    group.add_argument('--memory-limit', metavar='MB', type=int,
+                       help='analyze each contract in a supervised worker process that is killed above this resident memory')
+    group.add_argument('--max-tasks-per-worker', metavar='N', type=int,
+                       help='analyze contracts in supervised worker processes that are replaced after N contracts')
+
+
+def populate_profiling_arguments(group) -> None:
+    group.add_argument('--profile', metavar='FILE', type=Text, dest='trace_events_path',
+                       help='time the analysis phases and write them to a Chrome trace event file')
+    group.add_argument('--profile-cprofile', metavar='DIR', type=Text, dest='cprofile_directory',
+                       help='with profiling, also write a cProfile dump per phase to this directory')
+
+
+def populate_memory_arguments(group) -> None:
+    group.add_argument('--memory-sample-interval', metavar='STATES', type=int, default=DEFAULT_SAMPLE_INTERVAL,
+                       help='sample memory usage every this many executed states (default: {})'.format(DEFAULT_SAMPLE_INTERVAL))
+    group.add_argument('--memory-soft-limit', metavar='MB', type=int,
+                       help='prune states aggressively once the analysis process uses more than this many megabytes')
+    group.add_argument('--trace-allocations', action='store_true',
+                       help='report the top allocation sites using tracemalloc (slows down execution considerably)')
+
+
+def get_memory_options(args) -> Dict:
+    return dict(memory_sample_interval=args.memory_sample_interval, trace_allocations=args.trace_allocations,
+                memory_soft_limit=args.memory_soft_limit * 1024 * 1024 if args.memory_soft_limit else None)
+
+
+def populate_budget_arguments(group) -> None:
+    group.add_argument('--adaptive-budget', action='store_true',
+                       help='derive timeout and max depth per contract from its code, using --timeout and --max-depth as upper bounds')
+    group.add_argument('--min-timeout', metavar='SEC', type=int, default=DEFAULT_MIN_TIMEOUT,
+                       help='lower bound of the adaptive timeout (default: {})'.format(DEFAULT_MIN_TIMEOUT))
+    group.add_argument('--min-depth', metavar='DEPTH', type=int, default=DEFAULT_MIN_DEPTH,
+                       help='lower bound of the adaptive max depth (default: {})'.format(DEFAULT_MIN_DEPTH))
+    group.add_argument('--plateau-seconds', metavar='SEC', type=float,
+                       help='stop symbolic execution once coverage has not grown for this many seconds')
+    group.add_argument('--plateau-states', metavar='STATES', type=int,
+                       help='stop symbolic execution once coverage has not grown for this many states')
+
+
+def populate_prologue_arguments(group) -> None:
+    group.add_argument('--prologue-jumpis', metavar='N', type=int,
+                       help='drop paths after N conditional jumps from the entry of the function they entered')
+    group.add_argument('--prologue-instructions', metavar='N', type=int,
+                       help='drop paths after N instructions from the entry of the function they entered')
+    group.add_argument('--prologue-effects', action='store_true',
+                       help='drop paths of a function at their first storage write, external call or log')
+
+
+def get_prologue_bound(args) -> Optional[PrologueBound]:
+    if (args.prologue_jumpis is not None and args.prologue_jumpis < 0) or \
+            (args.prologue_instructions is not None and args.prologue_instructions <= 0):
+        raise ValidationError('Prologue bounds must not be negative, instruction bounds must be positive')
+    bound = PrologueBound(args.prologue_jumpis, args.prologue_instructions, args.prologue_effects)
+    return bound if bound.enabled else None
 
 
 def populate_benchmark_parser(parser: ArgumentParser) -> None:
@@ -65,6 +204,25 @@ def populate_benchmark_parser(parser: ArgumentParser) -> None:
                                       help='the execution timeout for each contract (default: {})'.format(DEFAULT_TIMEOUT_BENCHMARK))
     new_benchmark_parser.add_argument('--max-depth', metavar='DEPTH', type=int, default=DEFAULT_MAX_DEPTH,
                                       help='max graph depth (default: {})'.format(DEFAULT_MAX_DEPTH))
+    new_benchmark_parser.add_argument('--search', choices=SEARCH_STRATEGIES.keys(), default=DEFAULT_SEARCH_STRATEGY,
+                                      help='state space search strategy (default: {})'.format(DEFAULT_SEARCH_STRATEGY))
+    new_benchmark_parser.add_argument('--resolve-proxies', action='store_true',
+                                      help='analyze the implementation behind EIP-1167 and EIP-1967 proxies')
+    new_benchmark_parser.add_argument('--static-fast-path', action='store_true',
+                                      help='detect patterns statically where possible, using symbolic execution only if inconclusive')
+    populate_functions_argument(new_benchmark_parser)
+    new_benchmark_parser.add_argument('--no-dedup', action='store_true',
+                                      help='analyze every sampled contract instead of once per distinct code (ignoring metadata)')
+    new_benchmark_parser.add_argument('--fetch-jobs', metavar='N', type=int, default=DEFAULT_FETCH_JOBS,
+                                      help='concurrent requests fetching the sampled code (default: {})'.format(DEFAULT_FETCH_JOBS))
+    populate_budget_arguments(new_benchmark_parser)
+    populate_prologue_arguments(new_benchmark_parser)
+    populate_supervision_arguments(new_benchmark_parser)
+    populate_profiling_arguments(new_benchmark_parser.add_argument_group('profiling arguments'))
+    populate_memory_arguments(new_benchmark_parser.add_argument_group('memory arguments'))
+    new_benchmark_parser.add_argument('--batch-deadline', metavar='SEC', type=int,
+                                      help='with --adaptive-budget, no contract is analyzed past this many seconds after the start')
+    populate_history_argument(new_benchmark_parser)
 
     sampling_group = new_benchmark_parser.add_argument_group('sampling options')
     sampling_group.add_argument('--sample-size', metavar='SIZE', type=int, default=DEFAULT_SAMPLE_SIZE,
@@ -90,6 +248,147 @@ def populate_benchmark_parser(parser: ArgumentParser) -> None:
     verify_benchmark_parser = benchmark_subparsers.add_parser('verify', help='verify previously stored benchmark state in interactive mode')
     verify_benchmark_parser.add_argument('--file', metavar='FILE', dest='benchmark_state_file', default=benchmark_state_path,
                                          help='path to benchmark state file (default: {})'.format(benchmark_state_path))
+    populate_history_argument(verify_benchmark_parser)
+
+    compare_benchmark_parser = benchmark_subparsers.add_parser('compare', help='compare two recorded benchmark runs for regressions')
+    compare_benchmark_parser.add_argument('baseline_run', metavar='BASELINE', type=int, nargs='?',
+                                          help='the ID of the baseline run (default: the second to last run)')
+    compare_benchmark_parser.add_argument('current_run', metavar='CURRENT', type=int, nargs='?',
+                                          help='the ID of the run to compare against the baseline (default: the last run)')
+    compare_benchmark_parser.add_argument('--json', action='store_true', dest='as_json', help='print the comparison as JSON')
+    compare_benchmark_parser.add_argument('--db', metavar='DB', type=Text, default=history_db_path, dest='db_path',
+                                          help='the benchmark history (default: {})'.format(history_db_path))
+
+    history_benchmark_parser = benchmark_subparsers.add_parser('history', help='list the recorded benchmark runs')
+    history_benchmark_parser.add_argument('--strategy', choices=strategies_options, help='only list runs of this strategy')
+    history_benchmark_parser.add_argument('--limit', metavar='N', type=int, help='only list the N most recent runs')
+    history_benchmark_parser.add_argument('--json', action='store_true', dest='as_json', help='print the runs as JSON')
+    history_benchmark_parser.add_argument('--db', metavar='DB', type=Text, default=history_db_path, dest='db_path',
+                                          help='the benchmark history (default: {})'.format(history_db_path))
+
+
+def populate_history_argument(parser: ArgumentParser) -> None:
+    parser.add_argument('--history-db', metavar='DB', type=Text, default=history_db_path, dest='history_db_path',
+                        help='the benchmark history the verified benchmark is appended to (default: {})'.format(history_db_path))
+
+
+def populate_replay_parser(parser: ArgumentParser) -> None:
+    parser.add_argument('trace_paths', metavar='TRACE', type=Text, nargs='+', help='trace files recorded with --record-trace')
+    strategies_options = [strategy.replace('_', '-').lower() for strategy in STRATEGIES.keys()]
+    parser.add_argument('--strategy', choices=strategies_options, nargs='+', dest='strategies',
+                        help='the strategies to evaluate (default: all)')
+    parser.add_argument('--json', action='store_true', dest='as_json', help='print reports as JSON to standard output')
+
+
+def populate_perf_parser(parser: ArgumentParser) -> None:
+    parser.add_argument('--fixture', choices=fixture_paths().keys(), nargs='+', dest='fixtures',
+                        help='the fixtures to measure (default: all)')
+    parser.add_argument('--repeat', metavar='N', type=int, default=DEFAULT_PERF_REPEAT,
+                        help='number of runs per fixture (default: {})'.format(DEFAULT_PERF_REPEAT))
+    parser.add_argument('--timeout', metavar='SEC', type=int, help='symbolic execution timeout (default: the baseline\'s)')
+    parser.add_argument('--max-depth', metavar='DEPTH', type=int, help='max graph depth (default: the baseline\'s)')
+    parser.add_argument('--baseline', metavar='FILE', type=Text, default=BASELINE_PATH,
+                        help='baseline to compare against (default: the baseline shipped with the fixtures)')
+    parser.add_argument('--update-baseline', action='store_true', help='store the measurements as the new baseline instead of comparing')
+    parser.add_argument('--json', action='store_true', dest='as_json', help='print results as JSON to standard output')
+
+
+def populate_query_parser(parser: ArgumentParser) -> None:
+    strategies_options = [strategy.replace('_', '-').lower() for strategy in STRATEGIES.keys()]
+    parser.add_argument('--db', metavar='DB', type=Text, default=results_db_path, dest='db_path',
+                        help='the results warehouse to query (default: {})'.format(results_db_path))
+    parser.add_argument('--json', action='store_true', dest='as_json', help='print hits as JSON to standard output')
+    filter_group = parser.add_argument_group('filter arguments')
+    filter_group.add_argument('--address', metavar='ADDRESS', type=Text, help='only hits in the contract at this address')
+    filter_group.add_argument('--code-hash', metavar='HASH', type=Text, help='only hits in contracts with this code hash')
+    filter_group.add_argument('--pattern', choices=strategies_options, help='only hits of this pattern')
+    filter_group.add_argument('--selector', metavar='SELECTOR', type=Text, help='only hits in the function with this selector')
+    filter_group.add_argument('--value', metavar='VALUE', type=Text,
+                              help='only hits with an attribute of this value, e.g. an owner address or a role hash')
+    filter_group.add_argument('--attribute', metavar='NAME', type=Text, help='only hits with this attribute, e.g. "Owner"')
+    filter_group.add_argument('--latest', action='store_true', help='only consider the most recent analysis of each contract')
+    filter_group.add_argument('--limit', metavar='N', type=int, help='return at most this many hits')
+
+
+def populate_watch_parser(parser: ArgumentParser) -> None:
+    parser.add_argument('--db', metavar='DB', type=Text, default=results_db_path, dest='db_path',
+                        help='the results warehouse holding the analyses to watch (default: {})'.format(results_db_path))
+    parser.add_argument('--rpc', metavar='RPC', type=Text, default=DEFAULT_RPC,
+                        help='JSON RPC provider URL (default: \'{}\')'.format(DEFAULT_RPC))
+    parser.add_argument('--interval', metavar='SEC', type=int, default=DEFAULT_WATCH_INTERVAL,
+                        help='seconds between the starts of two rounds (default: {})'.format(DEFAULT_WATCH_INTERVAL))
+    parser.add_argument('--batch-size', metavar='N', type=int, default=DEFAULT_BATCH_SIZE,
+                        help='calls per batched RPC request (default: {})'.format(DEFAULT_BATCH_SIZE))
+    parser.add_argument('--code-check-every', metavar='N', type=int, default=DEFAULT_CODE_CHECK_EVERY,
+                        help='compare the contracts\' code against the analyzed code every N rounds (default: {})'.format(
+                            DEFAULT_CODE_CHECK_EVERY))
+    parser.add_argument('--no-reanalyze', action='store_true', help='only report code changes instead of analyzing the new code')
+    parser.add_argument('--once', action='store_true', help='run a single round and exit')
+    parser.add_argument('--timeout', metavar='SEC', type=int, default=DEFAULT_TIMEOUT_ANALYSIS,
+                        help='symbolic execution timeout when reanalyzing (default: {})'.format(DEFAULT_TIMEOUT_ANALYSIS))
+    parser.add_argument('--max-depth', metavar='DEPTH', type=int, default=DEFAULT_MAX_DEPTH,
+                        help='max graph depth when reanalyzing (default: {})'.format(DEFAULT_MAX_DEPTH))
+
+
+def populate_corpus_parser(parser: ArgumentParser) -> None:
+    corpus_subparsers = parser.add_subparsers(dest='corpus_command', help='Commands')
+
+    import_parser = corpus_subparsers.add_parser('import', help='build a packed corpus')
+    import_parser.add_argument('output_path', metavar='OUTPUT', type=Text, help='the corpus file to write')
+    input_group = import_parser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument('--csv', metavar='FILE', type=Text, dest='csv_path',
+                             help='CSV file of contract addresses whose runtime code is fetched through --rpc')
+    input_group.add_argument('--bin', metavar='PATH', type=Text, nargs='+', dest='bin_paths',
+                             help='files or directories of .bin files containing creation bytecode')
+    import_parser.add_argument('--rpc', metavar='RPC', type=Text, default=DEFAULT_RPC,
+                               help='JSON RPC provider URL (default: \'{}\')'.format(DEFAULT_RPC))
+    import_parser.add_argument('--batch-size', metavar='N', type=int, default=DEFAULT_BATCH_SIZE,
+                               help='calls per batched RPC request (default: {})'.format(DEFAULT_BATCH_SIZE))
+    import_parser.add_argument('--fetch-jobs', metavar='N', type=int, default=DEFAULT_FETCH_JOBS,
+                               help='concurrent requests fetching code (default: {})'.format(DEFAULT_FETCH_JOBS))
+    csv_group = import_parser.add_argument_group('CSV arguments')
+    csv_group.add_argument('--no-header', action='store_true', help='the CSV file has no header row')
+    csv_group.add_argument('--csv-delimiter', metavar='DELIMITER', type=str, default=DEFAULT_DELIMITER,
+                           help='the CSV delimiter (default: \'{}\')'.format(DEFAULT_DELIMITER))
+    csv_group.add_argument('--address-column', metavar='COL', type=int, default=DEFAULT_ADDRESS_COLUMN,
+                           help='column index that contains the contract addresses (default: {})'.format(DEFAULT_ADDRESS_COLUMN))
+    csv_group.add_argument('--version-column', metavar='COL', type=int,
+                           help='column index that contains the compiler version used')
+
+    info_parser = corpus_subparsers.add_parser('info', help='print the size of a corpus or one of its entries')
+    info_parser.add_argument('corpus_path', metavar='CORPUS', type=Text, help='the corpus file')
+    info_parser.add_argument('--entry', metavar='INDEX|ADDRESS', type=Text, help='print this entry and its code')
+
+
+def populate_scaling_parser(parser: ArgumentParser) -> None:
+    parser.add_argument('parameter', choices=SCALING_PARAMETERS.keys(), help='the contract parameter to vary')
+    parser.add_argument('values', metavar='VALUE', type=int, nargs='+', help='the values of the varied parameter')
+    parser.add_argument('--json', action='store_true', dest='as_json', help='print results as JSON to standard output')
+    parser.add_argument('--csv', metavar='FILE', type=Text, help='write the scaling curves to a CSV file')
+    parser.add_argument('--export', metavar='DIR', type=Text, help='write the generated bytecode and its ground truth to a directory')
+
+    generator_group = parser.add_argument_group('generator arguments')
+    generator_group.add_argument('--functions', metavar='N', type=int, default=DEFAULT_FUNCTIONS,
+                                 help='number of functions per contract (default: {})'.format(DEFAULT_FUNCTIONS))
+    generator_group.add_argument('--guards', choices=GUARDS, nargs='+', help='the guards to protect functions with (default: all)')
+    generator_group.add_argument('--guarded-ratio', metavar='RATIO', type=float, default=DEFAULT_GUARDED_RATIO,
+                                 help='the ratio of guarded functions (default: {})'.format(DEFAULT_GUARDED_RATIO))
+    generator_group.add_argument('--depth', metavar='N', type=int, default=0, help='internal calls before the guard check (default: 0)')
+    generator_group.add_argument('--loops', metavar='N', type=int, default=0, help='nested loops before the guard check (default: 0)')
+    generator_group.add_argument('--storage-offset', metavar='SLOT', type=int, default=0,
+                                 help='first storage slot of the guard variables (default: 0)')
+    generator_group.add_argument('--seeds', metavar='SEED', type=int, nargs='+', default=[DEFAULT_SEED],
+                                 help='one contract is generated per seed and value (default: {})'.format(DEFAULT_SEED))
+
+    sym_exec_arguments = parser.add_argument_group('symbolic execution arguments')
+    sym_exec_arguments.add_argument('--timeout', metavar='SEC', type=int, default=DEFAULT_TIMEOUT_ANALYSIS,
+                                    help='symbolic execution timeout (default: {})'.format(DEFAULT_TIMEOUT_ANALYSIS))
+    sym_exec_arguments.add_argument('--max-depth', metavar='DEPTH', type=int, default=DEFAULT_MAX_DEPTH,
+                                    help='max graph depth (default: {})'.format(DEFAULT_MAX_DEPTH))
+    sym_exec_arguments.add_argument('--jobs', metavar='N', type=int, default=DEFAULT_SCALING_JOBS,
+                                    help='number of contracts analyzed in parallel (default: {})'.format(DEFAULT_SCALING_JOBS))
+    sym_exec_arguments.add_argument('--hard-timeout', metavar='SEC', type=float,
+                                    help='kill an analysis after this many seconds (default: the timeout plus a grace period)')
 
 
 def get_parser() -> ArgumentParser:
@@ -104,27 +403,117 @@ def get_parser() -> ArgumentParser:
     # Add benchmark parser
     benchmark_parser = subparsers.add_parser('benchmark', help='execute benchmarking tool')
     populate_benchmark_parser(benchmark_parser)
+    # Add replay parser
+    replay_parser = subparsers.add_parser('replay', help='evaluate strategies on recorded traces without symbolic execution')
+    populate_replay_parser(replay_parser)
+    # Add performance suite parser
+    perf_parser = subparsers.add_parser('perf', help='measure analysis performance on fixtures and detect regressions')
+    populate_perf_parser(perf_parser)
+    # Add scaling suite parser
+    scaling_parser = subparsers.add_parser('scaling', help='measure runtime and recall on generated contracts of varying shape')
+    populate_scaling_parser(scaling_parser)
+    # Add results warehouse query parser
+    query_parser = subparsers.add_parser('query', help='query the analysis results stored with --store')
+    populate_query_parser(query_parser)
+    # Add watch mode parser
+    watch_parser = subparsers.add_parser('watch', help='report changes of authorization storage slots found by stored analyses')
+    populate_watch_parser(watch_parser)
+    # Add corpus parser
+    corpus_parser = subparsers.add_parser('corpus', help='build and inspect packed bytecode corpora')
+    populate_corpus_parser(corpus_parser)
 
     return parser
 
 
+def analyze_batch(args) -> None:
+    solc_binaries = args.solc_binaries or [args.solc]
+    batch_loader = get_factory(LoaderFactoryType.SOLIDITY_BATCH, paths=args.sol_batch_paths, solc_binaries=solc_binaries).create()
+    memory_limit = args.memory_limit * 1024 * 1024 if args.memory_limit else None
+    reports = analyze_contracts(batch_loader.contracts(), jobs=args.jobs, hard_timeout=args.hard_timeout, memory_limit=memory_limit,
+                                max_tasks_per_worker=args.max_tasks_per_worker, timeout=args.timeout, max_depth=args.max_depth,
+                                search_strategy=SEARCH_STRATEGIES[args.search], budget_planner=get_budget_planner(args),
+                                plateau_seconds=args.plateau_seconds, plateau_states=args.plateau_states,
+                                static_fast_path=args.static_fast_path, trace_directory=args.trace_path, deduplicate=not args.no_dedup,
+                                functions=args.functions, runtime_mode=args.runtime, prologue_bound=get_prologue_bound(args),
+                                **get_memory_options(args))
+    if args.store_path is not None:
+        store_reports(args.store_path, *reports)
+    if args.as_json:
+        print(json.dumps([report.to_dict() for report in reports], indent=2))
+    else:
+        for report in reports:
+            print(report.to_text())
+
+
 def analyze(args) -> None:
+    if args.sol_batch_paths:
+        if args.baseline_path:
+            raise ValidationError('A baseline can only be given when analyzing a single contract')
+        analyze_batch(args)
+        return
+
     # Get the contract loader factory based on the specified options
     if args.bin_path:
         contract_loader_factory = get_factory(LoaderFactoryType.BINARY, path=args.bin_path)
+    elif args.bin_runtime_path:
+        contract_loader_factory = get_factory(LoaderFactoryType.RUNTIME_BINARY, path=args.bin_runtime_path)
     elif args.sol_path:
         contract_loader_factory = get_factory(LoaderFactoryType.SOLIDITY, path=args.sol_path, solc=args.solc)
     elif args.address:
-        contract_loader_factory = get_factory(LoaderFactoryType.JSON_RPC, address=args.address, rpc=args.rpc)
+        contract_loader_factory = get_factory(LoaderFactoryType.JSON_RPC, address=args.address, rpc=args.rpc,
+                                              resolve_proxies=args.resolve_proxies)
+    elif args.corpus_path:
+        if args.entry is None:
+            raise ValidationError('A corpus entry has to be given with --entry')
+        contract_loader_factory = get_factory(LoaderFactoryType.CORPUS, corpus=args.corpus_path, entry=parse_entry(args.entry),
+                                              rpc=args.rpc)
     else:
         raise NotImplementedError('This feature hasn\'t been implemented yet')
 
     contract_loader = contract_loader_factory.create()
+    try:
+        baseline = load_baseline(args.baseline_path) if args.baseline_path else None
+    except ValueError as error:
+        raise ValidationError(str(error))
     symbolic_analysis = LaserWrapper()
-    report = symbolic_analysis.execute(contract_loader=contract_loader, timeout=args.timeout, max_depth=args.max_depth)
+    report = symbolic_analysis.execute(contract_loader=contract_loader, timeout=args.timeout, max_depth=args.max_depth,
+                                       search_strategy=SEARCH_STRATEGIES[args.search], budget_planner=get_budget_planner(args),
+                                       plateau_seconds=args.plateau_seconds, plateau_states=args.plateau_states,
+                                       static_fast_path=args.static_fast_path, trace_path=args.trace_path, functions=args.functions,
+                                       baseline=baseline, runtime_mode=args.runtime, prologue_bound=get_prologue_bound(args),
+                                       **get_memory_options(args))
+    if args.store_path is not None:
+        store_reports(args.store_path, report)
     print(report.to_json(pretty=True) if args.as_json else report.to_text())
 
 
+def start_profiling(args) -> None:
+    if getattr(args, 'trace_events_path', None) or getattr(args, 'cprofile_directory', None):
+        Profiler().start(args.cprofile_directory)
+
+
+def stop_profiling(args) -> None:
+    profiler = Profiler()
+    if not profiler.enabled:
+        return
+    profiler.stop()
+    for name, seconds in sorted(profiler.summary().items(), key=lambda item: item[1], reverse=True):
+        log.info('Phase %s took %.3f seconds', name, seconds)
+    if args.trace_events_path:
+        profiler.write_trace(args.trace_events_path)
+
+
+def replay(args) -> None:
+    strategy_names = [strategy.replace('-', '_').upper() for strategy in args.strategies] if args.strategies else STRATEGIES.keys()
+    reports = [replay_trace(trace_path, create_strategies(strategy_names))
+               for trace_path in args.trace_paths]
+    if args.as_json:
+        print(json.dumps([report.to_dict() for report in reports], indent=2))
+    else:
+        for report in reports:
+            print(report.to_text())
+
+
 def main():
     parser = get_parser()
     args = parser.parse_args()
@@ -135,9 +524,29 @@ def main():
                 logger.setLevel(logging.DEBUG)
 
     if args.command == 'analyze':
-        analyze(args)
+        start_profiling(args)
+        try:
+            analyze(args)
+        finally:
+            stop_profiling(args)
     elif args.command == 'benchmark' and args.benchmark_command is not None:
-        benchmark(args)
+        start_profiling(args)
+        try:
+            benchmark(args)
+        finally:
+            stop_profiling(args)
+    elif args.command == 'replay':
+        replay(args)
+    elif args.command == 'perf':
+        perf(args)
+    elif args.command == 'scaling':
+        scaling(args)
+    elif args.command == 'query':
+        query(args)
+    elif args.command == 'watch':
+        watch(args)
+    elif args.command == 'corpus' and args.corpus_command is not None:
+        corpus(args)
     else:
         parser.print_help()
         exit(1)
@@ -1,12 +1,18 @@
 import json
+from enum import Enum
 from jinja2 import Environment, PackageLoader
 from typing import Dict, List, Optional, Text
 
+from ithildin.support.profiler import CATEGORY_REPORT, Profiler
+
+from mythril.support.loader import DynLoader
+
 
 class Result:
 
     def __init__(self, function_name: Text, **attributes) -> None:
         self.function_name = function_name
+        self.carried_over = False
         self.attributes = {}
         for attr_key, attr_value in attributes.items():
             self.attributes[attr_key] = attr_value
@@ -20,10 +26,19 @@ class Result:
             del self.attributes[name]
 
     def to_dict(self) -> Dict:
-        return {
+        as_dict = {
             'functionName': self.function_name,
             'attributes': self.attributes
         }
+        if self.carried_over:
+            as_dict['carriedOver'] = True
+        return as_dict
+
+    @staticmethod
+    def from_dict(as_dict: Dict) -> 'Result':
+        result = Result(as_dict['functionName'], **as_dict.get('attributes', {}))
+        result.carried_over = as_dict.get('carriedOver', False)
+        return result
 
     def __repr__(self):
         return (
@@ -53,6 +68,13 @@ class ReportItem:
             'results': [result.to_dict() for result in self.results]
         }
 
+    @staticmethod
+    def from_dict(as_dict: Dict) -> 'ReportItem':
+        report_item = ReportItem(as_dict['title'], as_dict['description'], as_dict['patternName'])
+        for result in as_dict.get('results', []):
+            report_item.add_result(Result.from_dict(result))
+        return report_item
+
     def __repr__(self):
         return (
             '<ReportItem '
@@ -64,13 +86,38 @@ class ReportItem:
         ).format(self)
 
 
+class Outcome(Enum):
+    COMPLETED = 'COMPLETED'
+    TIMEOUT = 'TIMEOUT'
+    OOM = 'OOM'
+    ERROR = 'ERROR'
+
+
 class Report:
 
     def __init__(self, start_time: Optional[float] = None, end_time: Optional[float] = None) -> None:
         self.start_time = start_time
         self.end_time = end_time
         self.contract_address = None
+        self.contract_name = None
         self.contract_code = None
+        self.code_hash = None
+        self.normalized_code_hash = None
+        self.analyzed_as = None
+        self.runtime_mode = False
+        self.functions = None
+        self.function_hashes = None
+        self.unchanged_functions = None
+        self.implementation_address = None
+        self.proxy_type = None
+        self.proxy_functions = None
+        self.budget = None
+        self.coverage = None
+        self.memory = None
+        self.prologue_bound = None
+        self.timed_out = False
+        self.outcome = Outcome.COMPLETED
+        self.static_patterns: List[Text] = []
         self.reports = []
 
     def add_report(self, report: ReportItem) -> None:
@@ -80,25 +127,96 @@ class Report:
     def add_all(self, items: List[ReportItem]) -> None:
         self.reports.extend(items)
 
+    def merge_results(self, other: 'Report') -> None:
+        """ Adds the results of *other* to the items of the same patterns, skipping functions this report has results for. """
+        for other_item in other.reports:
+            report_item = next((item for item in self.reports if item.pattern_name == other_item.pattern_name), None)
+            if report_item is None:
+                report_item = ReportItem(other_item.title, other_item.description, other_item.pattern_name)
+                self.reports.append(report_item)
+            function_names = {result.function_name for result in report_item.results}
+            for result in other_item.results:
+                if result.function_name not in function_names:
+                    report_item.add_result(result)
+
     def to_dict(self) -> Dict:
         as_dict = {
             'startTime': self.start_time,
-            'endTime': self.end_time
+            'endTime': self.end_time,
+            'outcome': self.outcome.value
         }
+        if self.timed_out:
+            as_dict['timedOut'] = True
         if self.contract_address is not None:
             as_dict['contractAddress'] = self.contract_address
+        if self.contract_name is not None:
+            as_dict['contractName'] = self.contract_name
+        if self.code_hash is not None:
+            as_dict['codeHash'] = self.code_hash
+        if self.normalized_code_hash is not None:
+            as_dict['normalizedCodeHash'] = self.normalized_code_hash
+        if self.analyzed_as is not None:
+            as_dict['analyzedAs'] = self.analyzed_as
+        if self.runtime_mode:
+            as_dict['runtimeMode'] = True
+        if self.implementation_address is not None:
+            as_dict['implementationAddress'] = self.implementation_address
+            as_dict['proxyType'] = self.proxy_type
+        if self.proxy_functions is not None:
+            as_dict['proxyFunctions'] = self.proxy_functions
+        if self.functions is not None:
+            as_dict['functions'] = self.functions
+        if self.function_hashes is not None:
+            as_dict['functionHashes'] = self.function_hashes
+        if self.unchanged_functions is not None:
+            as_dict['unchangedFunctions'] = self.unchanged_functions
+        if self.budget is not None:
+            as_dict['budget'] = self.budget.to_dict()
+        if self.coverage is not None:
+            as_dict['coverage'] = self.coverage.to_dict()
+        if self.memory is not None:
+            as_dict['memory'] = self.memory.to_dict()
+        if self.prologue_bound is not None:
+            as_dict['prologueBound'] = self.prologue_bound.to_dict()
+        if len(self.static_patterns) > 0:
+            as_dict['staticPatterns'] = self.static_patterns
         if self.contract_code is not None:
             as_dict['contractCode'] = self.contract_code
         as_dict['reports'] = [report.to_dict() for report in self.reports if len(report.results) > 0]
         return as_dict
 
+    @staticmethod
+    def from_dict(as_dict: Dict) -> 'Report':
+        """ Restores a report from its dictionary, except for the budget, coverage, memory usage and prologue bound. """
+        report = Report(as_dict.get('startTime'), as_dict.get('endTime'))
+        report.outcome = Outcome(as_dict.get('outcome', Outcome.COMPLETED.value))
+        report.timed_out = as_dict.get('timedOut', False)
+        report.contract_address = as_dict.get('contractAddress')
+        report.contract_name = as_dict.get('contractName')
+        report.code_hash = as_dict.get('codeHash')
+        report.normalized_code_hash = as_dict.get('normalizedCodeHash')
+        report.analyzed_as = as_dict.get('analyzedAs')
+        report.runtime_mode = as_dict.get('runtimeMode', False)
+        report.implementation_address = as_dict.get('implementationAddress')
+        report.proxy_type = as_dict.get('proxyType')
+        report.proxy_functions = as_dict.get('proxyFunctions')
+        report.functions = as_dict.get('functions')
+        report.function_hashes = as_dict.get('functionHashes')
+        report.unchanged_functions = as_dict.get('unchangedFunctions')
+        report.static_patterns = as_dict.get('staticPatterns', [])
+        report.contract_code = as_dict.get('contractCode')
+        report.add_all([ReportItem.from_dict(report_item) for report_item in as_dict.get('reports', [])])
+        return report
+
     def to_text(self) -> Text:
-        environment = Environment(loader=PackageLoader('ithildin.report'), trim_blocks=True)
-        template = environment.get_template('analysis_report.txt.jinja2')
-        return template.render(report=self)
+        with Profiler().phase('report rendering', CATEGORY_REPORT):
+            environment = Environment(loader=PackageLoader('ithildin.report'), trim_blocks=True)
+            template = environment.get_template('analysis_report.txt.jinja2')
+            return template.render(report=self)
 
     def to_json(self, pretty: bool = False) -> Text:
-        return json.dumps(self.to_dict(), indent=2 if pretty else None)
+        with Profiler().phase('report rendering', CATEGORY_REPORT):
+            return json.dumps(self.to_dict(), indent=2 if pretty else None)
 
     def __repr__(self):
         return (
@@ -108,3 +226,14 @@ class Report:
             'reports={0.reports}'
             '>'
         ).format(self)
+
+
+def post_process_report(report: Report, target_address: Optional[Text], dyn_loader: Optional[DynLoader]) -> None:
+    """ Replaces the storage index attributes of results by readable ones, reading their values if *dyn_loader* is given. """
+    for result in [result for report_item in report.reports for result in report_item.results]:
+        for attr_name, attr_value in [(k, v) for k, v in result.attributes.items() if k.startswith('_index')]:
+            attr_name_pretty = ' '.join(map(lambda s: s.capitalize(), attr_name.split('_')[2:]))
+            result.add_attribute(f'{attr_name_pretty} Storage Index', attr_value)
+            if dyn_loader:
+                result.add_attribute(attr_name_pretty, dyn_loader.read_storage(target_address, attr_value))
+            result.remove_attribute(attr_name)
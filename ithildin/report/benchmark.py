@@ -1,9 +1,10 @@
 import json
 
 from jinja2 import Environment, PackageLoader
-from typing import List, Optional, Text
+from typing import Dict, List, Optional, Text
 
 from ithildin import __version__
+from ithildin.support.profiler import CATEGORY_REPORT, Profiler
 
 
 class Result:
@@ -13,12 +14,30 @@ class Result:
                  contract_address: Text,
                  contract_index: int,
                  detected_functions: List[Text],
-                 compiler_version: Optional[Text] = None) -> None:
+                 compiler_version: Optional[Text] = None,
+                 budget: Optional[Dict] = None,
+                 coverage: Optional[Dict] = None,
+                 outcome: Optional[Text] = None,
+                 memory: Optional[Dict] = None,
+                 code_hash: Optional[Text] = None,
+                 analyzed_as: Optional[Text] = None,
+                 execution_time: Optional[float] = None,
+                 states_explored: Optional[int] = None,
+                 timeout_hit: bool = False) -> None:
         self.function_hashes = function_hashes
         self.contract_address = contract_address
         self.contract_index = contract_index
         self.detected_functions = detected_functions
         self.compiler_version = compiler_version
+        self.budget = budget
+        self.coverage = coverage
+        self.outcome = outcome
+        self.memory = memory
+        self.code_hash = code_hash
+        self.analyzed_as = analyzed_as
+        self.execution_time = execution_time
+        self.states_explored = states_explored
+        self.timeout_hit = timeout_hit
         self.verified = False
         self.true_positives = 0
         self.false_positives = 0
@@ -30,6 +49,11 @@ class Result:
     def total_hits(self) -> int:
         return len(self.detected_functions)
 
+    @property
+    def skipped(self) -> bool:
+        """ Whether the contract hasn't been analyzed since the batch deadline had passed. """
+        return self.budget is not None and self.budget.get('deadlineExceeded', False)
+
     @property
     def total_functions_count(self):
         return self.true_positives + self.false_positives + self.true_negatives + self.false_negatives + self.unknown
@@ -40,7 +64,16 @@ class Result:
             'contractAddress': self.contract_address,
             'contractIndex': self.contract_index,
             'detectedFunctions': self.detected_functions,
-            'compilerVersion': self.compiler_version
+            'compilerVersion': self.compiler_version,
+            'budget': self.budget,
+            'coverage': self.coverage,
+            'outcome': self.outcome,
+            'memory': self.memory,
+            'codeHash': self.code_hash,
+            'analyzedAs': self.analyzed_as,
+            'executionTime': self.execution_time,
+            'statesExplored': self.states_explored,
+            'timeoutHit': self.timeout_hit
         }
 
     def to_json(self, pretty=False):
@@ -51,7 +84,8 @@ class Report:
 
     def __init__(self, strategy_name: Text, random_seed: int, exec_timeout: int, max_depth: int,
                  verification_ratio: float, target_version=None, contracts_filename=None,
-                 file_sha256sum=None, start_time=None, end_time=None) -> None:
+                 file_sha256sum=None, start_time=None, end_time=None, search_strategy=None,
+                 adaptive_budget=False, functions=None, prologue_bound=None) -> None:
         self.strategy_name = strategy_name
         self.random_seed = random_seed
         self.exec_timeout = exec_timeout
@@ -62,6 +96,10 @@ class Report:
         self.file_sha256sum = file_sha256sum
         self.start_time = start_time
         self.end_time = end_time
+        self.search_strategy = search_strategy
+        self.adaptive_budget = adaptive_budget
+        self.functions = functions
+        self.prologue_bound = prologue_bound
         self._results: List[Result] = []
 
     @property
@@ -76,10 +114,27 @@ class Report:
     def sample_size(self) -> int:
         return len(self.results)
 
+    @property
+    def distinct_codes(self) -> int:
+        """ The number of distinct codes among the results, results without a code hash are counted individually. """
+        return len({result.code_hash or id(result) for result in self.results})
+
     @property
     def total_detections(self) -> int:
         return sum(result.total_hits for result in self.results)
 
+    @property
+    def timeouts_hit(self) -> int:
+        return sum(1 for result in self.results if result.timeout_hit)
+
+    @property
+    def skipped(self) -> int:
+        return sum(1 for result in self.results if result.skipped)
+
+    @property
+    def total_execution_time(self) -> float:
+        return sum(result.execution_time or 0.0 for result in self.results)
+
     @property
     def true_positives(self) -> int:
         return sum(result.true_positives for result in self.results if result.verified)
@@ -126,16 +181,22 @@ class Report:
             'fileSha256Sum': self.file_sha256sum,
             'startTime': self.start_time,
             'endTime': self.end_time,
+            'searchStrategy': self.search_strategy,
+            'adaptiveBudget': self.adaptive_budget,
+            'functions': self.functions,
+            'prologueBound': self.prologue_bound,
             'results': [result.to_dict() for result in self.results]
         }
 
     def to_json(self, pretty=False):
-        return json.dumps(self.to_dict(), indent=2 if pretty else None)
+        with Profiler().phase('report rendering', CATEGORY_REPORT):
+            return json.dumps(self.to_dict(), indent=2 if pretty else None)
 
     def to_markdown(self):
-        environment = Environment(loader=PackageLoader('ithildin.report'), trim_blocks=True)
-        template = environment.get_template('benchmark_report.md.jinja2')
-        return template.render(report=self, program_version=__version__)
+        with Profiler().phase('report rendering', CATEGORY_REPORT):
+            environment = Environment(loader=PackageLoader('ithildin.report'), trim_blocks=True)
+            template = environment.get_template('benchmark_report.md.jinja2')
+            return template.render(report=self, program_version=__version__)
 
     def __repr__(self) -> Text:
         return (
@@ -150,6 +211,86 @@ class Report:
             'file_sha256sum={0.file_sha256sum} '
             'start_time={0.start_time} '
             'end_time={0.end_time} '
+            'search_strategy={0.search_strategy} '
+            'adaptive_budget={0.adaptive_budget} '
+            'functions={0.functions} '
+            'prologue_bound={0.prologue_bound} '
             'results={0.results}'
             '>'
         ).format(self)
+
+
+class Comparison:
+    """ A metric of a benchmark run compared against a baseline run, regressed if *current* is beyond *limit*. """
+
+    def __init__(self, metric: Text, baseline, current, limit, regressed: bool) -> None:
+        self.metric = metric
+        self.baseline = baseline
+        self.current = current
+        self.limit = limit
+        self.regressed = regressed
+
+    def to_dict(self) -> Dict:
+        return {
+            'metric': self.metric,
+            'baseline': self.baseline,
+            'current': self.current,
+            'limit': self.limit,
+            'regressed': self.regressed
+        }
+
+    def __repr__(self) -> Text:
+        return (
+            '<Comparison '
+            'metric={0.metric} '
+            'baseline={0.baseline} '
+            'current={0.current} '
+            'limit={0.limit} '
+            'regressed={0.regressed}'
+            '>'
+        ).format(self)
+
+
+class ComparisonReport:
+    """
+    Two benchmark runs from the history compared metric by metric. *runs* holds the configuration of both runs as
+    dictionaries, *common_contracts* the number of contracts analyzed in both, which throughput is compared on.
+    """
+
+    def __init__(self, baseline_run: Dict, current_run: Dict, common_contracts: int, warnings: Optional[List[Text]] = None) -> None:
+        self.baseline_run = baseline_run
+        self.current_run = current_run
+        self.common_contracts = common_contracts
+        self.warnings = warnings or []
+        self.comparisons: List[Comparison] = []
+
+    @property
+    def regressions(self) -> List[Comparison]:
+        return [comparison for comparison in self.comparisons if comparison.regressed]
+
+    def to_dict(self) -> Dict:
+        return {
+            'baselineRun': self.baseline_run,
+            'currentRun': self.current_run,
+            'commonContracts': self.common_contracts,
+            'warnings': self.warnings,
+            'comparisons': [comparison.to_dict() for comparison in self.comparisons]
+        }
+
+    def to_json(self, pretty=False) -> Text:
+        return json.dumps(self.to_dict(), indent=2 if pretty else None)
+
+    def to_markdown(self) -> Text:
+        environment = Environment(loader=PackageLoader('ithildin.report'), trim_blocks=True)
+        template = environment.get_template('benchmark_comparison.md.jinja2')
+        return template.render(report=self, program_version=__version__)
+
+    def __repr__(self) -> Text:
+        return (
+            '<ComparisonReport '
+            'baseline_run={0.baseline_run} '
+            'current_run={0.current_run} '
+            'common_contracts={0.common_contracts} '
+            'comparisons={0.comparisons}'
+            '>'
+        ).format(self)
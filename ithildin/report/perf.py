@@ -0,0 +1,159 @@
+import json
+import statistics
+
+from jinja2 import Environment, PackageLoader
+from typing import Dict, List, Optional, Text
+
+from ithildin import __version__
+
+
+class Measurement:
+    """ Performance of analyzing a fixture, measured over repeated runs in fresh worker processes. """
+
+    def __init__(self,
+                 fixture: Text,
+                 wall_times: List[float],
+                 states_explored: int,
+                 hook_calls: int,
+                 peak_rss: int,
+                 detections: int,
+                 outcome: Text = 'COMPLETED') -> None:
+        self.fixture = fixture
+        self.wall_times = wall_times
+        self.states_explored = states_explored
+        self.hook_calls = hook_calls
+        self.peak_rss = peak_rss
+        self.detections = detections
+        self.outcome = outcome
+
+    @property
+    def completed(self) -> bool:
+        return self.outcome == 'COMPLETED'
+
+    @property
+    def wall_time(self) -> Optional[float]:
+        return statistics.median(self.wall_times) if len(self.wall_times) > 0 else None
+
+    @property
+    def wall_time_noise(self) -> float:
+        """ The median absolute deviation of the wall times, a measure of noise robust to outliers. """
+        if len(self.wall_times) < 2:
+            return 0.0
+        median = self.wall_time
+        return statistics.median(abs(wall_time - median) for wall_time in self.wall_times)
+
+    @property
+    def hooks_per_second(self) -> Optional[float]:
+        return self.hook_calls / self.wall_time if self.wall_time else None
+
+    def to_dict(self) -> Dict:
+        return {
+            'fixture': self.fixture,
+            'wallTimes': self.wall_times,
+            'statesExplored': self.states_explored,
+            'hookCalls': self.hook_calls,
+            'peakRss': self.peak_rss,
+            'detections': self.detections,
+            'outcome': self.outcome
+        }
+
+    @staticmethod
+    def from_dict(as_dict: Dict) -> 'Measurement':
+        return Measurement(as_dict['fixture'], as_dict['wallTimes'], as_dict['statesExplored'], as_dict['hookCalls'],
+                           as_dict['peakRss'], as_dict['detections'], as_dict.get('outcome', 'COMPLETED'))
+
+    def __repr__(self) -> Text:
+        return (
+            '<Measurement '
+            'fixture={0.fixture} '
+            'wall_time={0.wall_time} '
+            'states_explored={0.states_explored} '
+            'hook_calls={0.hook_calls} '
+            'peak_rss={0.peak_rss} '
+            'detections={0.detections} '
+            'outcome={0.outcome}'
+            '>'
+        ).format(self)
+
+
+class Comparison:
+    """ A metric of a fixture compared against the baseline, regressed if *current* is beyond *limit*. """
+
+    def __init__(self, fixture: Text, metric: Text, baseline, current, limit, regressed: bool) -> None:
+        self.fixture = fixture
+        self.metric = metric
+        self.baseline = baseline
+        self.current = current
+        self.limit = limit
+        self.regressed = regressed
+
+    def to_dict(self) -> Dict:
+        return {
+            'fixture': self.fixture,
+            'metric': self.metric,
+            'baseline': self.baseline,
+            'current': self.current,
+            'limit': self.limit,
+            'regressed': self.regressed
+        }
+
+    def __repr__(self) -> Text:
+        return (
+            '<Comparison '
+            'fixture={0.fixture} '
+            'metric={0.metric} '
+            'baseline={0.baseline} '
+            'current={0.current} '
+            'limit={0.limit} '
+            'regressed={0.regressed}'
+            '>'
+        ).format(self)
+
+
+class Report:
+
+    def __init__(self, repeat: int, exec_timeout: int, max_depth: int, baseline_path: Optional[Text] = None,
+                 start_time: Optional[Text] = None) -> None:
+        self.repeat = repeat
+        self.exec_timeout = exec_timeout
+        self.max_depth = max_depth
+        self.baseline_path = baseline_path
+        self.start_time = start_time
+        self.measurements: List[Measurement] = []
+        self.comparisons: List[Comparison] = []
+
+    @property
+    def regressions(self) -> List[Comparison]:
+        return [comparison for comparison in self.comparisons if comparison.regressed]
+
+    def to_dict(self) -> Dict:
+        return {
+            'repeat': self.repeat,
+            'execTimeout': self.exec_timeout,
+            'maxDepth': self.max_depth,
+            'baselinePath': self.baseline_path,
+            'startTime': self.start_time,
+            'measurements': [measurement.to_dict() for measurement in self.measurements],
+            'comparisons': [comparison.to_dict() for comparison in self.comparisons]
+        }
+
+    def to_json(self, pretty=False) -> Text:
+        return json.dumps(self.to_dict(), indent=2 if pretty else None)
+
+    def to_markdown(self) -> Text:
+        environment = Environment(loader=PackageLoader('ithildin.report'), trim_blocks=True)
+        template = environment.get_template('perf_report.md.jinja2')
+        return template.render(report=self, program_version=__version__)
+
+    def __repr__(self) -> Text:
+        return (
+            '<Report '
+            'repeat={0.repeat} '
+            'exec_timeout={0.exec_timeout} '
+            'max_depth={0.max_depth} '
+            'baseline_path={0.baseline_path} '
+            'start_time={0.start_time} '
+            'measurements={0.measurements} '
+            'comparisons={0.comparisons}'
+            '>'
+        ).format(self)
@@ -0,0 +1,136 @@
+import csv
+import io
+import json
+
+from jinja2 import Environment, PackageLoader
+from typing import Dict, List, Optional, Text
+
+from ithildin import __version__
+
+
+class ScalingPoint:
+    """ Aggregated results of analyzing the synthetic contracts generated for one value of the varied parameter. """
+
+    def __init__(self, value: int, runs: int) -> None:
+        self.value = value
+        self.runs = runs
+        self.wall_times: List[float] = []
+        self.states_explored: List[int] = []
+        self.expected_hits: Dict[Text, int] = {}
+        self.true_positives: Dict[Text, int] = {}
+        self.false_positives: Dict[Text, int] = {}
+
+    @property
+    def completed_runs(self) -> int:
+        return len(self.wall_times)
+
+    @property
+    def mean_wall_time(self) -> Optional[float]:
+        return sum(self.wall_times) / len(self.wall_times) if len(self.wall_times) > 0 else None
+
+    @property
+    def mean_states_explored(self) -> Optional[float]:
+        return sum(self.states_explored) / len(self.states_explored) if len(self.states_explored) > 0 else None
+
+    @property
+    def recall(self) -> Optional[float]:
+        try:
+            return sum(self.true_positives.values()) / sum(self.expected_hits.values())
+        except ZeroDivisionError:
+            return None
+
+    @property
+    def precision(self) -> Optional[float]:
+        try:
+            return sum(self.true_positives.values()) / (sum(self.true_positives.values()) + sum(self.false_positives.values()))
+        except ZeroDivisionError:
+            return None
+
+    def pattern_recall(self, pattern_name: Text) -> Optional[float]:
+        try:
+            return self.true_positives.get(pattern_name, 0) / self.expected_hits[pattern_name]
+        except (KeyError, ZeroDivisionError):
+            return None
+
+    def to_dict(self) -> Dict:
+        return {
+            'value': self.value,
+            'runs': self.runs,
+            'completedRuns': self.completed_runs,
+            'wallTimes': self.wall_times,
+            'statesExplored': self.states_explored,
+            'expectedHits': self.expected_hits,
+            'truePositives': self.true_positives,
+            'falsePositives': self.false_positives,
+            'recall': self.recall,
+            'precision': self.precision
+        }
+
+    def __repr__(self) -> Text:
+        return (
+            '<ScalingPoint '
+            'value={0.value} '
+            'runs={0.runs} '
+            'completed_runs={0.completed_runs} '
+            'mean_wall_time={0.mean_wall_time} '
+            'recall={0.recall} '
+            'precision={0.precision}'
+            '>'
+        ).format(self)
+
+
+class Report:
+
+    def __init__(self, parameter: Text, configuration: Dict, exec_timeout: int, max_depth: int, start_time: Optional[Text] = None) -> None:
+        self.parameter = parameter
+        self.configuration = configuration
+        self.exec_timeout = exec_timeout
+        self.max_depth = max_depth
+        self.start_time = start_time
+        self.points: List[ScalingPoint] = []
+
+    @property
+    def pattern_names(self) -> List[Text]:
+        return sorted({pattern_name for point in self.points for pattern_name, hits in point.expected_hits.items() if hits > 0})
+
+    def to_dict(self) -> Dict:
+        return {
+            'parameter': self.parameter,
+            'configuration': self.configuration,
+            'execTimeout': self.exec_timeout,
+            'maxDepth': self.max_depth,
+            'startTime': self.start_time,
+            'points': [point.to_dict() for point in self.points]
+        }
+
+    def to_json(self, pretty=False) -> Text:
+        return json.dumps(self.to_dict(), indent=2 if pretty else None)
+
+    def to_csv(self) -> Text:
+        """ Returns one row per parameter value, ready to be plotted as scaling curves. """
+        output = io.StringIO()
+        writer = csv.writer(output)
+        pattern_names = self.pattern_names
+        writer.writerow([self.parameter, 'runs', 'completed_runs', 'mean_wall_time', 'mean_states_explored', 'recall', 'precision'] +
+                        ['recall_{}'.format(pattern_name.lower()) for pattern_name in pattern_names])
+        for point in self.points:
+            writer.writerow([point.value, point.runs, point.completed_runs, point.mean_wall_time, point.mean_states_explored,
+                             point.recall, point.precision] + [point.pattern_recall(pattern_name) for pattern_name in pattern_names])
+        return output.getvalue()
+
+    def to_markdown(self) -> Text:
+        environment = Environment(loader=PackageLoader('ithildin.report'), trim_blocks=True)
+        template = environment.get_template('scaling_report.md.jinja2')
+        return template.render(report=self, program_version=__version__)
+
+    def __repr__(self) -> Text:
+        return (
+            '<Report '
+            'parameter={0.parameter} '
+            'configuration={0.configuration} '
+            'exec_timeout={0.exec_timeout} '
+            'max_depth={0.max_depth} '
+            'start_time={0.start_time} '
+            'points={0.points}'
+            '>'
+        ).format(self)
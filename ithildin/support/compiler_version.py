@@ -1,10 +1,12 @@
 import re
 
 from argparse import Action
-from typing import Optional, Text
+from typing import List, Optional, Text
 
 VERSION_REXEG = r'v?(\d)\.(\d{1,2})\.(\d{1,2})'
 VERSION_MATCHER_REGEX = r'(\^|>|>=|==)?\s*(\d)\.(\d{1,2})\.(\d{1,2})(\,\s*(<|<=)\s*(\d)\.(\d{1,2})\.(\d{1,2}))?'
+PRAGMA_REGEX = r'pragma\s+solidity\s+([^;]+);'
+PRAGMA_CONSTRAINT_REGEX = r'(\^|~|>=|<=|>|<|=)?\s*v?(\d+\.\d+\.\d+)'
 
 COMPARE_PREDICATES = {
     '^': lambda x, y: x.major == y.major and x.minor == y.minor and x.hotfix >= y.hotfix,
@@ -69,9 +71,24 @@ class VersionMatcher:
         self.compare_hi = None
         self.version_lo = None
         self.version_hi = None
+        self.alternatives: List['VersionMatcher'] = []
         self._parse_raw(raw)
 
+    @classmethod
+    def from_pragma(cls, source: Text) -> Optional['VersionMatcher']:
+        """
+        Creates a matcher from the first solidity version pragma found in *source*, including alternatives joined with
+        '||'. Returns None if no pragma is present, and raises a ValueError if the pragma can't be expressed as a
+        matcher (e.g. more than two constraints in one alternative).
+        """
+        match = re.search(PRAGMA_REGEX, source)
+        if match is None:
+            return None
+        return cls(' || '.join(_pragma_range(alternative) for alternative in match.group(1).split('||')))
+
     def matches(self, version: Version) -> bool:
+        if len(self.alternatives) > 0:
+            return any(alternative.matches(version) for alternative in self.alternatives)
         matches_lo = self.compare_lo(version, self.version_lo)
         matches_hi = True
         if self.version_hi is not None:
@@ -79,7 +96,10 @@ class VersionMatcher:
         return matches_lo and matches_hi
 
     def _parse_raw(self, raw: Text) -> None:
-        match = re.match(VERSION_MATCHER_REGEX, raw)
+        if '||' in raw:
+            self.alternatives = [VersionMatcher(alternative.strip()) for alternative in raw.split('||')]
+            return
+        match = re.match(VERSION_MATCHER_REGEX, raw.strip())
         if match:
             self.compare_lo = COMPARE_PREDICATES[match.group(1)] if match.group(1) else COMPARE_PREDICATES['==']
             self.version_lo = Version(int(match.group(2), base=10), int(match.group(3), base=10), int(match.group(4), base=10))
@@ -90,6 +110,22 @@ class VersionMatcher:
             raise ValueError('Invalid version match pattern: %s' % raw)
 
 
+def _pragma_range(pragma: Text) -> Text:
+    """ Translates the constraints of a version pragma without alternatives into a matcher pattern. """
+    constraints = re.findall(PRAGMA_CONSTRAINT_REGEX, pragma)
+    if len(constraints) == 1:
+        operator, version = constraints[0]
+        if operator in {'<', '<='}:
+            # Matchers always have a lower bound
+            return '>=0.0.0, {}{}'.format(operator, version)
+        return '{}{}'.format({'': '==', '=': '==', '~': '^'}.get(operator, operator), version)
+    lower = [constraint for constraint in constraints if constraint[0] in {'>', '>='}]
+    upper = [constraint for constraint in constraints if constraint[0] in {'<', '<='}]
+    if len(constraints) == 2 and len(lower) == 1 and len(upper) == 1:
+        return '{}{}, {}{}'.format(lower[0][0], lower[0][1], upper[0][0], upper[0][1])
+    raise ValueError('Unsupported version pragma: %s' % pragma.strip())
+
+
 class VersionParseAction(Action):
 
     def __init__(self, option_strings, dest, nargs=None, **kwargs):
@@ -0,0 +1,215 @@
+import cProfile
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Text, Tuple
+
+from ithildin.support.singleton import Singleton
+
+from mythril.ethereum.interface.rpc.client import EthJsonRpc
+from mythril.laser.ethereum.svm import LaserEVM
+from mythril.laser.smt.solver.independence_solver import IndependenceSolver
+from mythril.laser.smt.solver.solver import BaseSolver
+
+log = logging.getLogger(__name__)
+
+# Categories of the phases, shown as the 'cat' field of the trace events
+CATEGORY_LOADING = 'loading'
+CATEGORY_ANALYSIS = 'analysis'
+CATEGORY_SOLVER = 'solver'
+CATEGORY_HOOKS = 'hooks'
+CATEGORY_REPORT = 'report'
+
+
+class Profiler(metaclass=Singleton):
+    """
+    Times the phases of an analysis and exports them as Chrome trace events, which can be loaded into chrome://tracing
+    or https://ui.perfetto.dev. Phases nest, e.g. z3 queries and strategy hooks show up inside the transaction during
+    which they ran. If a cProfile directory is given, each phase name gets its own profile, which only measures the
+    time spent in the phase itself and not in nested phases, and is dumped to '<directory>/<phase name>.prof'.
+
+    While disabled, *phase()* and *wrap()* cost next to nothing, so the instrumented code paths are left in place.
+    Solver queries and JSON-RPC calls are timed by patching Mythril's solver and RPC client classes while enabled.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.cprofile_directory: Optional[Text] = None
+        self._events: List[Dict] = []
+        self._stack: List[Tuple[Text, Text, Optional[Dict], float]] = []
+        self._profiles: Dict[Text, cProfile.Profile] = {}
+        self._patches: List[Tuple[type, Text, Callable]] = []
+
+    def start(self, cprofile_directory: Optional[Text] = None) -> None:
+        assert not self.enabled, 'Profiler has already been started'
+        self.enabled = True
+        self.cprofile_directory = cprofile_directory
+        self._events = []
+        self._stack = []
+        self._profiles = {}
+        self._patch(BaseSolver, 'check', 'z3 check', CATEGORY_SOLVER)
+        self._patch(IndependenceSolver, 'check', 'z3 check', CATEGORY_SOLVER)
+        self._patch(EthJsonRpc, '_call', 'rpc call', CATEGORY_LOADING)
+
+    def stop(self) -> None:
+        """ Closes all open phases, restores the patched classes and dumps the cProfile profiles. """
+        if not self.enabled:
+            return
+        while len(self._stack) > 0:
+            self.end()
+        for cls, attr_name, original in reversed(self._patches):
+            setattr(cls, attr_name, original)
+        self._patches = []
+        self.enabled = False
+        if self.cprofile_directory is not None:
+            os.makedirs(self.cprofile_directory, exist_ok=True)
+            for name, profile in self._profiles.items():
+                profile.dump_stats(os.path.join(self.cprofile_directory, re.sub(r'[^\w\-]+', '_', name) + '.prof'))
+            log.info('Wrote %d cProfile dumps to %s', len(self._profiles), self.cprofile_directory)
+
+    def begin(self, name: Text, category: Text = CATEGORY_ANALYSIS, args: Optional[Dict] = None) -> None:
+        """ Opens phase *name* nested in the current phase, *args* are shown with the phase's trace event. """
+        if not self.enabled:
+            return
+        if len(self._stack) > 0:
+            self._profile(self._stack[-1][0], False)
+        self._stack.append((name, category, args, time.perf_counter()))
+        self._profile(name, True)
+
+    def end(self) -> None:
+        """ Closes the innermost open phase. """
+        if not self.enabled or len(self._stack) == 0:
+            return
+        name, category, args, start_time = self._stack.pop()
+        self._profile(name, False)
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': start_time * 1e6,
+            'dur': (time.perf_counter() - start_time) * 1e6,
+            'pid': os.getpid(),
+            'tid': threading.get_ident()
+        }
+        if args is not None:
+            event['args'] = args
+        self._events.append(event)
+        if len(self._stack) > 0:
+            self._profile(self._stack[-1][0], True)
+
+    @property
+    def current_phase(self) -> Optional[Text]:
+        return self._stack[-1][0] if len(self._stack) > 0 else None
+
+    @contextmanager
+    def phase(self, name: Text, category: Text = CATEGORY_ANALYSIS, args: Optional[Dict] = None):
+        """ Times the enclosed block as phase *name*, closing phases left open inside the block when it exits. """
+        if not self.enabled:
+            yield
+            return
+        depth = len(self._stack)
+        self.begin(name, category, args)
+        try:
+            yield
+        finally:
+            while len(self._stack) > depth:
+                self.end()
+
+    def wrap(self, function: Callable, name: Text, category: Text = CATEGORY_ANALYSIS) -> Callable:
+        """ Returns *function* timed as phase *name* if the profiler is enabled, *function* itself otherwise. """
+        if not self.enabled:
+            return function
+
+        @wraps(function)
+        def profiled(*args, **kwargs):
+            with self.phase(name, category):
+                return function(*args, **kwargs)
+        return profiled
+
+    def instrument(self, laser: LaserEVM, creation_mode: Callable[[], bool]) -> None:
+        """
+        Splits symbolic execution into constructor execution and a runtime execution phase per message call. Laser runs
+        the contract creation transaction right after the 'start_sym_exec' hooks without firing the transaction hooks,
+        *creation_mode* tells whether the current execution starts with one. The hooks are registered even while the
+        profiler is disabled, since a Laser EVM may be reused after the profiler has been started.
+        """
+        transaction_count = [0]
+
+        @laser.laser_hook('start_sym_exec')
+        def start_sym_exec_hook():
+            transaction_count[0] = 0
+            if creation_mode():
+                self.begin('constructor execution')
+
+        @laser.laser_hook('start_sym_trans')
+        def start_sym_trans_hook():
+            if not self.enabled:
+                return
+            if self.current_phase == 'constructor execution':
+                self.end()
+            transaction_count[0] += 1
+            self.begin('runtime execution', args={'transaction': transaction_count[0]})
+
+        @laser.laser_hook('stop_sym_trans')
+        def stop_sym_trans_hook():
+            if self.current_phase == 'runtime execution':
+                self.end()
+
+        @laser.laser_hook('stop_sym_exec')
+        def stop_sym_exec_hook():
+            if self.current_phase == 'constructor execution':
+                self.end()
+
+    def summary(self) -> Dict[Text, float]:
+        """ Returns the total seconds spent per phase name, including nested phases. """
+        totals: Dict[Text, float] = {}
+        for event in self._events:
+            totals[event['name']] = totals.get(event['name'], 0.0) + event['dur'] / 1e6
+        return totals
+
+    def to_dict(self) -> Dict:
+        return {
+            'traceEvents': sorted(self._events, key=lambda event: event['ts']),
+            'displayTimeUnit': 'ms'
+        }
+
+    def write_trace(self, path: Text) -> None:
+        with open(path, 'w') as trace_file:
+            json.dump(self.to_dict(), trace_file)
+        log.info('Wrote %d trace events to %s', len(self._events), path)
+
+    def _profile(self, name: Text, enable: bool) -> None:
+        if self.cprofile_directory is None:
+            return
+        if name not in self._profiles:
+            self._profiles[name] = cProfile.Profile()
+        profile = self._profiles[name]
+        if enable:
+            profile.enable()
+        else:
+            profile.disable()
+
+    def _patch(self, cls: type, attr_name: Text, name: Text, category: Text) -> None:
+        original = cls.__dict__[attr_name]
+        self._patches.append((cls, attr_name, original))
+
+        @wraps(original)
+        def profiled(*args, **kwargs):
+            with self.phase(name, category):
+                return original(*args, **kwargs)
+        setattr(cls, attr_name, profiled)
+
+    def __repr__(self) -> Text:
+        return (
+            '<Profiler '
+            'enabled={0.enabled} '
+            'cprofile_directory={0.cprofile_directory} '
+            'events={1}'
+            '>'
+        ).format(self, len(self._events))
@@ -1,31 +1,49 @@
-import csv
 import json
-import hashlib
 import logging
 import os
 import random
 import time
 
 from functools import lru_cache
-from typing import Optional, Set, Text, Tuple
+from typing import Dict, List, Optional, Set, Text, Tuple
 
 from mythril.support.signatures import SignatureDB
 from mythril.mythril import MythrilDisassembler
+from mythril.support.support_utils import get_code_hash
 
 from . import benchmark_state_path
+from .history_db import history_db_path
+from .csv_index import get_csv_index, sha256sum
+from .history_db.history_db import BenchmarkContract, BenchmarkRun, HistoryDB
+from .history_db.run_repository import RunRepository
 from .verification_db.verification_db import Contract, Flag
 from .verification_db.contract_repository import ContractRepository
 from .verification_db.function_repository import FunctionRepository
 from .verification_db.flagged_function_repository import FlaggedFunctionRepository
-from ithildin.analysis.loader import StrategyLoader
+from ithildin.analysis.batch import failed_report
+from ithildin.analysis.budget import get_budget_planner
+from ithildin.analysis.dedup import fan_out_report, normalized_code_hash
+from ithildin.analysis.functions import parse_selector
+from ithildin.analysis.loader import create_strategies, StrategyLoader
+from ithildin.analysis.prologue import PrologueBound
+from ithildin.analysis.supervisor import SupervisedExecutor
 from ithildin.analysis.symbolic import LaserWrapper
-from ithildin.analysis.loader import STRATEGIES
+from ithildin.analysis.search import SEARCH_STRATEGIES
 from ithildin.contract.loader_factory import get_factory, LoaderFactoryType
-from ithildin.report.benchmark import Report, Result
-from ithildin.support.compiler_version import Version, VersionMatcher
+from ithildin.contract.rpc import fetch_codes
+from ithildin.report.analysis import Outcome, Report as AnalysisReport
+from ithildin.report.benchmark import Comparison, ComparisonReport, Report, Result
+from ithildin.support.profiler import CATEGORY_LOADING, Profiler
 
 TIME_FORMAT = '%Y-%m-%d %H:%M:%S (%z)'
 
+# Relative change of the throughput tolerated before it counts as a regression
+EXECUTION_TIME_TOLERANCE = 0.15
+STATES_RATE_TOLERANCE = 0.15
+# Absolute change of the timeout rate, precision and recall tolerated before it counts as a regression
+TIMEOUT_RATE_TOLERANCE = 0.02
+ACCURACY_TOLERANCE = 0.02
+
 log = logging.getLogger(__name__)
 contract_repository = ContractRepository()
 function_repository = FunctionRepository()
@@ -33,13 +51,6 @@ flagged_function_repository = FlaggedFunctionRepository()
 signature_db = SignatureDB(enable_online_lookup=True)
 
 
-@lru_cache(maxsize=1)
-def count_rows(file: Text, delimiter=',') -> int:
-    with open(file, 'r') as csv_file:
-        csv_reader = csv.reader(csv_file, delimiter=delimiter)
-        return sum(1 for _ in csv_reader)
-
-
 @lru_cache(maxsize=2048)
 def signature_hash(signature: Text) -> Text:
     if signature.startswith('_function'):
@@ -80,6 +91,10 @@ def load_benchmark_state(path=benchmark_state_path) -> Tuple[Report, Set[int], S
                         target_version=benchmark_state['report'].get('targetVersion', None),
                         contracts_filename=benchmark_state['report'].get('contractsFilename', None),
                         file_sha256sum=benchmark_state['report'].get('fileSha256Sum', None),
+                        search_strategy=benchmark_state['report'].get('searchStrategy', None),
+                        adaptive_budget=benchmark_state['report'].get('adaptiveBudget', False),
+                        functions=benchmark_state['report'].get('functions', None),
+                        prologue_bound=benchmark_state['report'].get('prologueBound', None),
                         start_time=benchmark_state['report'].get('startTime', None),
                         end_time=benchmark_state['report'].get('endTime', None))
         for result in benchmark_state['report']['results']:
@@ -89,7 +104,16 @@ def load_benchmark_state(path=benchmark_state_path) -> Tuple[Report, Set[int], S
                                      result['contractAddress'],
                                      result['contractIndex'],
                                      result['detectedFunctions'],
-                                     result['compilerVersion']))
+                                     result['compilerVersion'],
+                                     result.get('budget', None),
+                                     result.get('coverage', None),
+                                     result.get('outcome', None),
+                                     result.get('memory', None),
+                                     result.get('codeHash', None),
+                                     result.get('analyzedAs', None),
+                                     result.get('executionTime', None),
+                                     result.get('statesExplored', None),
+                                     result.get('timeoutHit', False)))
         return report, positive_sample, negative_sample
 
 
@@ -206,85 +230,268 @@ def start_verification(report: Report, verification_sample: Set[int]) -> None:
     print(report.to_markdown())
 
 
-def generate_contract_sample(file: Text,
-                             sample_size: int,
-                             address_column: int,
-                             compiler_name_column: Optional[int] = None,
-                             compiler_version_column: Optional[int] = None,
-                             has_header: Optional[bool] = True,
-                             delimiter: Optional[Text] = ',',
-                             version_matcher: Optional[VersionMatcher] = None) -> Set[int]:
-    if version_matcher is not None:
-        assert compiler_version_column is not None, 'Compiler version column not provided'
-        matched_version_indices = set()
-        with open(file, 'r') as csv_file:
-            csv_reader = csv.reader(csv_file, delimiter=delimiter)
-            for i, row in enumerate(csv_reader):
-                if compiler_name_column is None or row[compiler_name_column].strip() == 'Solidity':
-                    try:
-                        version = Version(raw=row[compiler_version_column])
-                    except ValueError:
-                        continue
-                    if version_matcher.matches(version):
-                        matched_version_indices.add(i)
-        return set(random.sample(matched_version_indices, sample_size))
+def record_benchmark(report: Report, path: Text = history_db_path) -> None:
+    """ Appends the verified benchmark *report* to the benchmark history at *path*. """
+    db = HistoryDB(path)
+    try:
+        run = RunRepository(db).save(report)
+        log.info('Recorded benchmark as run %d in %s', run.id, path)
+    finally:
+        db.close()
+
+
+def run_to_dict(run: BenchmarkRun) -> Dict:
+    return {
+        'id': run.id,
+        'programVersion': run.program_version,
+        'strategyName': run.strategy_name,
+        'searchStrategy': run.search_strategy,
+        'execTimeout': run.exec_timeout,
+        'maxDepth': run.max_depth,
+        'adaptiveBudget': run.adaptive_budget,
+        'functions': run.functions,
+        'contractsFilename': run.contracts_filename,
+        'randomSeed': run.random_seed,
+        'sampleSize': run.sample_size,
+        'startTime': run.start_time,
+        'timeoutsHit': run.timeouts_hit,
+        'precision': run.precision,
+        'recall': run.recall
+    }
+
+
+def _throughput(contracts: List[BenchmarkContract]) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    """
+    Returns the mean execution time, the states explored per second and the timeout rate of *contracts*. Contracts whose
+    analysis has been reused from another contract with the same code haven't explored any states and are left out.
+    """
+    timed_contracts = [contract for contract in contracts if contract.execution_time is not None and contract.states_explored != 0]
+    if len(timed_contracts) == 0:
+        return None, None, None
+    execution_time = sum(contract.execution_time for contract in timed_contracts)
+    states_explored = sum(contract.states_explored or 0 for contract in timed_contracts)
+    return (execution_time / len(timed_contracts), states_explored / execution_time if execution_time > 0 else None,
+            sum(1 for contract in timed_contracts if contract.timeout_hit) / len(timed_contracts))
+
+
+def compare_runs(baseline: BenchmarkRun, current: BenchmarkRun) -> ComparisonReport:
+    """
+    Compares the throughput and accuracy of the *current* benchmark run against the *baseline* run. Throughput is
+    compared on the contracts analyzed in both runs only, since the time spent per contract varies a lot between
+    contracts, and skipped if there are none. Runs of the same sample and settings give the most meaningful comparison.
+    """
+    warnings = []
+    if baseline.strategy_name != current.strategy_name:
+        warnings.append('The runs benchmark different strategies')
+    if (baseline.exec_timeout, baseline.max_depth, baseline.search_strategy, baseline.adaptive_budget) != \
+            (current.exec_timeout, current.max_depth, current.search_strategy, current.adaptive_budget):
+        warnings.append('The runs use different budgets or search strategies')
+    current_addresses = {contract.contract_address for contract in current.contracts}
+    common_addresses = {contract.contract_address for contract in baseline.contracts} & current_addresses
+    baseline_time, baseline_rate, baseline_timeouts = _throughput([c for c in baseline.contracts if c.contract_address in common_addresses])
+    current_time, current_rate, current_timeouts = _throughput([c for c in current.contracts if c.contract_address in common_addresses])
+
+    report = ComparisonReport(run_to_dict(baseline), run_to_dict(current), len(common_addresses), warnings)
+    if len(common_addresses) == 0:
+        report.warnings.append('The runs have no contracts in common, throughput is not compared')
+    elif baseline_time is not None and current_time is not None:
+        time_limit = baseline_time * (1 + EXECUTION_TIME_TOLERANCE)
+        report.comparisons.append(Comparison('Mean Execution Time (sec)', baseline_time, current_time, time_limit,
+                                             current_time > time_limit))
+        rate_limit = baseline_rate * (1 - STATES_RATE_TOLERANCE) if baseline_rate is not None else None
+        report.comparisons.append(Comparison('States/sec', baseline_rate, current_rate, rate_limit,
+                                             rate_limit is not None and (current_rate or 0.0) < rate_limit))
+        timeout_limit = baseline_timeouts + TIMEOUT_RATE_TOLERANCE
+        report.comparisons.append(Comparison('Timeout Rate', baseline_timeouts, current_timeouts, timeout_limit,
+                                             current_timeouts > timeout_limit))
     else:
-        row_count = count_rows(file, delimiter=delimiter)
-        return set(random.sample(range(1 if has_header else 0, row_count), sample_size))
+        report.warnings.append('Execution times have not been recorded for both runs')
+    for metric, baseline_value, current_value in [('Precision', baseline.precision, current.precision),
+                                                  ('Recall', baseline.recall, current.recall)]:
+        limit = baseline_value - ACCURACY_TOLERANCE if baseline_value is not None else None
+        report.comparisons.append(Comparison(metric, baseline_value, current_value, limit,
+                                             limit is not None and current_value is not None and current_value < limit))
+    return report
+
+
+# Wrapper of the current worker process, reused while the worker analyzes contracts for the same strategy
+_laser_wrapper: Optional[LaserWrapper] = None
+
+
+def _analyze_address(task: Tuple[Text, Text, bool, Text, Dict]) -> AnalysisReport:
+    """ Worker function analyzing the contract at a single address in supervised mode. """
+    global _laser_wrapper
+    target_address, rpc, resolve_proxies, strategy_name, execute_options = task
+    if _laser_wrapper is None or [strategy.pattern_name for strategy in _laser_wrapper.strategy_loader.get_strategies()] != [strategy_name]:
+        _laser_wrapper = LaserWrapper(StrategyLoader(create_strategies([strategy_name])))
+    contract_loader = get_factory(LoaderFactoryType.JSON_RPC, address=target_address, rpc=rpc, resolve_proxies=resolve_proxies).create()
+    return _laser_wrapper.execute(contract_loader=contract_loader, **execute_options)
 
 
 def new_benchmark(args) -> None:
     random.seed(args.random_seed)
-    instance_count = count_rows(args.filename, delimiter=args.csv_delimiter) - 1 if args.has_header else 0
-    file_sha256sum = hashlib.sha256(open(args.filename, 'rb').read()).hexdigest()
-    contract_sample = generate_contract_sample(args.filename, args.sample_size, args.address_column,
-                                               compiler_name_column=args.compiler_column, compiler_version_column=args.version_column,
-                                               has_header=args.has_header, delimiter=args.csv_delimiter, version_matcher=args.compiler_target)
+    file_sha256sum = sha256sum(args.filename)
+    csv_index = get_csv_index(args.filename, file_sha256sum, delimiter=args.csv_delimiter, compiler_name_column=args.compiler_column,
+                              compiler_version_column=args.version_column, has_header=args.has_header)
+    instance_count = csv_index.row_count - 1 if args.has_header else 0
+    if args.compiler_target is not None:
+        assert args.version_column is not None, 'Compiler version column not provided'
+    contract_sample = csv_index.sample(args.sample_size, args.compiler_target)
     benchmark_report = Report(args.strategy.capitalize(), args.random_seed, args.timeout, args.max_depth, args.verification_ratio,
                               contracts_filename=os.path.basename(args.filename), file_sha256sum=file_sha256sum,
-                              start_time=time.strftime(TIME_FORMAT), target_version=args.compiler_target.raw if args.compiler_target else None)
+                              search_strategy=args.search, adaptive_budget=args.adaptive_budget, start_time=time.strftime(TIME_FORMAT),
+                              target_version=args.compiler_target.raw if args.compiler_target else None,
+                              functions=args.functions)
     rpc = 'https://mainnet.infura.io/v3/' + args.infura_project_id
     strategy_name = args.strategy.replace('-', '_').upper()
-    strategy_loader = StrategyLoader()
-    strategy_loader.set_strategies([STRATEGIES[strategy_name]()])
+    strategy_loader = StrategyLoader(create_strategies([strategy_name]))
+    laser_wrapper = LaserWrapper(strategy_loader)
+    budget_planner = get_budget_planner(args)
+    prologue_bound = PrologueBound(args.prologue_jumpis, args.prologue_instructions, args.prologue_effects)
+    benchmark_report.prologue_bound = prologue_bound.description or None
+    execute_options = dict(timeout=args.timeout, max_depth=args.max_depth, search_strategy=SEARCH_STRATEGIES[args.search],
+                           budget_planner=budget_planner, plateau_seconds=args.plateau_seconds, plateau_states=args.plateau_states,
+                           static_fast_path=args.static_fast_path, memory_sample_interval=args.memory_sample_interval,
+                           memory_soft_limit=args.memory_soft_limit * 1024 * 1024 if args.memory_soft_limit else None,
+                           trace_allocations=args.trace_allocations, functions=args.functions,
+                           prologue_bound=prologue_bound if prologue_bound.enabled else None)
+    selectors = {parse_selector(function) for function in args.functions} if args.functions else None
+    executor = None
+    if args.hard_timeout is not None or args.memory_limit is not None or args.max_tasks_per_worker is not None:
+        executor = SupervisedExecutor(_analyze_address, hard_timeout=args.hard_timeout,
+                                      memory_limit=args.memory_limit * 1024 * 1024 if args.memory_limit else None,
+                                      max_tasks_per_worker=args.max_tasks_per_worker)
+    if executor is not None and Profiler().enabled:
+        log.warning('Analyses run in supervised workers are not profiled, only loading and report rendering are')
     positive_instances = set()
-    with open(args.filename, 'r') as csv_file:
-        csv_reader = csv.reader(csv_file, delimiter=args.csv_delimiter)
-        for i, row in enumerate(csv_reader):
-            if i not in contract_sample:
-                continue
-            target_address = row[args.address_column]
-            log.info('Analyzing contract %d/%d at address %s', i + 1, instance_count, target_address)
-            loader_factory = get_factory(LoaderFactoryType.JSON_RPC, address=target_address, rpc=rpc)
-            contract_loader = loader_factory.create()
-            analysis_report = LaserWrapper().execute(contract_loader=contract_loader, timeout=args.timeout, max_depth=args.max_depth)
-            if sum(len(report_item.results) for report_item in analysis_report.reports) > 0:
-                positive_instances.add(i)
-            else:
-                log.info('Nothing found for contract %d/%d at address %s', i + 1, instance_count, target_address)
-            detected_functions = [result.function_name
-                                  for report_item in analysis_report.reports if len(report_item.results) > 0
-                                  for result in report_item.results]
-            compiler_version = row[args.version_column] if args.version_column is not None else None
-            function_hashes = contract_loader.disassembly().func_hashes if contract_loader.disassembly() else []
-            benchmark_report.add_result(Result(function_hashes, target_address, i, detected_functions, compiler_version=compiler_version))
-            strategy_loader.reset_strategies()
+    skipped_instances = set()
+    sampled_rows = list(csv_index.read_rows(args.filename, sorted(contract_sample), delimiter=args.csv_delimiter))
+    codes: Dict[Text, Optional[Text]] = {}
+    code_hashes: Dict[Text, Optional[Text]] = {}
+    if not args.no_dedup:
+        addresses = [row[args.address_column] for _, row in sampled_rows]
+        with Profiler().phase('code prefetch', CATEGORY_LOADING):
+            codes = dict(zip(addresses, fetch_codes(rpc, addresses, jobs=args.fetch_jobs)))
+        code_hashes = {address: normalized_code_hash(code) for address, code in codes.items()}
+        log.info('Sampled %d contracts with %d distinct codes', len(addresses), len(set(code_hashes.values()) - {None}))
+    # Reports of the first analyzed contract per normalized code hash, copied for contracts with the same code
+    group_reports: Dict[Text, AnalysisReport] = {}
+    for i, row in sampled_rows:
+        target_address = row[args.address_column]
+        log.info('Analyzing contract %d/%d at address %s', i + 1, instance_count, target_address)
+        loader_factory = get_factory(LoaderFactoryType.JSON_RPC, address=target_address, rpc=rpc, resolve_proxies=args.resolve_proxies)
+        contract_loader = loader_factory.create()
+        # Proxies sharing their code may still delegate to different implementations, those are deduplicated by LaserWrapper
+        code_hash = code_hashes.get(target_address) if contract_loader.implementation_address is None else None
+        if code_hash in group_reports:
+            log.info('Reusing the analysis of %s with the same code', group_reports[code_hash].contract_address)
+            analysis_report = fan_out_report(group_reports[code_hash], target_address, contract_loader.dyn_loader,
+                                             get_code_hash(codes[target_address]))
+        elif executor is not None:
+            task = (target_address, rpc, args.resolve_proxies, strategy_name, execute_options)
+            outcome, analysis_report = executor.map([task])[0]
+            if outcome != Outcome.COMPLETED:
+                log.warning('Analysis of contract %d/%d at address %s aborted: %s',
+                            i + 1, instance_count, target_address, outcome.value)
+                analysis_report = failed_report(outcome, contract_address=target_address)
+        else:
+            with Profiler().phase('contract analysis', args={'address': target_address}):
+                analysis_report = laser_wrapper.execute(contract_loader=contract_loader, **execute_options)
+        if code_hash is not None and analysis_report.outcome == Outcome.COMPLETED and \
+                not (analysis_report.budget is not None and analysis_report.budget.deadline_exceeded):
+            group_reports.setdefault(code_hash, analysis_report)
+        skipped = analysis_report.budget is not None and analysis_report.budget.deadline_exceeded
+        if skipped:
+            # Contracts that haven't been analyzed are neither positives nor negatives
+            log.info('Skipped contract %d/%d at address %s after the batch deadline', i + 1, instance_count, target_address)
+            skipped_instances.add(i)
+        elif sum(len(report_item.results) for report_item in analysis_report.reports) > 0:
+            positive_instances.add(i)
+        else:
+            log.info('Nothing found for contract %d/%d at address %s', i + 1, instance_count, target_address)
+        detected_functions = [result.function_name
+                              for report_item in analysis_report.reports if len(report_item.results) > 0
+                              for result in report_item.results]
+        compiler_version = row[args.version_column] if args.version_column is not None else None
+        execution_time = analysis_report.end_time - analysis_report.start_time \
+            if analysis_report.start_time is not None and analysis_report.end_time is not None and not skipped else None
+        # Reused analyses didn't explore any states themselves
+        states_explored = analysis_report.coverage.executed_states \
+            if analysis_report.coverage is not None and analysis_report.analyzed_as is None else 0
+        if skipped:
+            states_explored = None
+        timeout_hit = analysis_report.outcome == Outcome.TIMEOUT or analysis_report.timed_out
+        function_hashes = contract_loader.disassembly().func_hashes if contract_loader.disassembly() else []
+        if selectors is not None:
+            # Only the selected functions have been analyzed, and are thus up for verification
+            function_hashes = [function_hash for function_hash in function_hashes if function_hash in selectors]
+        benchmark_report.add_result(Result(function_hashes, target_address, i, detected_functions, compiler_version=compiler_version,
+                                           budget=analysis_report.budget.to_dict() if analysis_report.budget else None,
+                                           coverage=analysis_report.coverage.to_dict() if analysis_report.coverage else None,
+                                           outcome=analysis_report.outcome.value,
+                                           memory=analysis_report.memory.to_dict() if analysis_report.memory else None,
+                                           code_hash=analysis_report.normalized_code_hash or code_hash,
+                                           analyzed_as=analysis_report.analyzed_as, execution_time=execution_time,
+                                           states_explored=states_explored, timeout_hit=timeout_hit))
+        strategy_loader.reset_strategies()
+    if executor is not None:
+        executor.close()
     benchmark_report.end_time = time.strftime(TIME_FORMAT)
-    negative_instances = contract_sample - positive_instances
-    positive_sample = set(random.sample(positive_instances, round(len(positive_instances) * args.verification_ratio)))
-    negative_sample = set(random.sample(negative_instances, round(len(negative_instances) * args.verification_ratio)))
+    negative_instances = contract_sample - positive_instances - skipped_instances
+    positive_sample = set(random.sample(sorted(positive_instances), round(len(positive_instances) * args.verification_ratio)))
+    negative_sample = set(random.sample(sorted(negative_instances), round(len(negative_instances) * args.verification_ratio)))
     save_benchmark_state(benchmark_report, positive_sample, negative_sample)
     if args.interactive:
         start_verification(benchmark_report, positive_sample | negative_sample)
+        record_benchmark(benchmark_report, args.history_db_path)
         os.remove(benchmark_state_path)
 
 
-def verify_benchmark(benchmark_state_file: Text) -> None:
+def verify_benchmark(benchmark_state_file: Text, history_path: Text = history_db_path) -> None:
     report, positive_sample, negative_sample = load_benchmark_state(benchmark_state_file)
     start_verification(report, positive_sample | negative_sample)
+    record_benchmark(report, history_path)
     os.remove(benchmark_state_file)
 
 
+def compare_benchmarks(args) -> None:
+    db = HistoryDB(args.db_path)
+    try:
+        repository = RunRepository(db)
+        if args.current_run is not None:
+            runs = [repository.get(args.baseline_run), repository.get(args.current_run)]
+        elif args.baseline_run is not None:
+            runs = [repository.get(args.baseline_run), (repository.latest(1) or [None])[0]]
+        else:
+            runs = list(reversed(repository.latest(2)))
+        if len(runs) < 2 or None in runs:
+            print('! Two recorded benchmark runs are needed for a comparison, see \'ithil benchmark history\'')
+            exit(1)
+        report = compare_runs(runs[0], runs[1])
+    finally:
+        db.close()
+    print(report.to_json(pretty=True) if args.as_json else report.to_markdown())
+    if len(report.regressions) > 0:
+        exit(1)
+
+
+def benchmark_history(args) -> None:
+    db = HistoryDB(args.db_path)
+    try:
+        runs = RunRepository(db).latest(args.limit, args.strategy.capitalize() if args.strategy else None)
+        if args.as_json:
+            print(json.dumps([run_to_dict(run) for run in runs], indent=2))
+            return
+        for run in runs:
+            precision = '{:.4f}'.format(run.precision) if run.precision is not None else 'n/a'
+            recall = '{:.4f}'.format(run.recall) if run.recall is not None else 'n/a'
+            print('{}\t{}\t{}\t{}\ttimeout={} depth={}\tcontracts={} timeouts={}\tprecision={} recall={}'.format(
+                run.id, run.start_time or 'n/a', run.program_version, run.strategy_name, run.exec_timeout, run.max_depth,
+                run.sample_size, run.timeouts_hit, precision, recall))
+    finally:
+        db.close()
+
+
 def benchmark(args) -> None:
     if args.benchmark_command == 'new':
         if os.path.exists(benchmark_state_path):
@@ -295,4 +502,8 @@ def benchmark(args) -> None:
                 return
         new_benchmark(args)
     elif args.benchmark_command == 'verify':
-        verify_benchmark(args.benchmark_state_file)
+        verify_benchmark(args.benchmark_state_file, args.history_db_path)
+    elif args.benchmark_command == 'compare':
+        compare_benchmarks(args)
+    elif args.benchmark_command == 'history':
+        benchmark_history(args)
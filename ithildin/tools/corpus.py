@@ -0,0 +1,127 @@
+import csv
+import json
+import logging
+import os
+
+from typing import Iterable, List, Optional, Text, Tuple, Union
+
+from ithildin.contract.corpus import Corpus, CorpusWriter
+from ithildin.contract.rpc import DEFAULT_BATCH_SIZE, DEFAULT_FETCH_JOBS, fetch_codes
+from ithildin.support.compiler_version import Version
+
+log = logging.getLogger(__name__)
+
+BINARY_EXTENSION = '.bin'
+# Number of CSV rows whose code is fetched before it's written to the corpus
+CSV_CHUNK_SIZE = 10000
+
+
+def import_csv(output_path: Text,
+               csv_path: Text,
+               rpc: Optional[Text],
+               delimiter: Text = ',',
+               address_column: int = 0,
+               compiler_version_column: Optional[int] = None,
+               has_header: bool = True,
+               batch_size: int = DEFAULT_BATCH_SIZE,
+               jobs: int = DEFAULT_FETCH_JOBS) -> Tuple[int, int]:
+    """
+    Builds a corpus of the runtime code deployed at the addresses listed in a CSV file, fetched through *rpc*, see
+    *fetch_codes()*. Addresses without code are left out. Returns the number of entries and distinct codes.
+    """
+    with open(csv_path, 'r', newline='', encoding='utf-8') as csv_file, CorpusWriter(output_path) as writer:
+        csv_reader = csv.reader(csv_file, delimiter=delimiter)
+        if has_header:
+            next(csv_reader, None)
+        chunk: List[Tuple[Text, Optional[Version]]] = []
+        for row in csv_reader:
+            if address_column >= len(row):
+                continue
+            chunk.append((row[address_column].strip().lower(), _parse_version(row, compiler_version_column)))
+            if len(chunk) == CSV_CHUNK_SIZE:
+                _write_chunk(writer, chunk, rpc, batch_size, jobs)
+                chunk = []
+        _write_chunk(writer, chunk, rpc, batch_size, jobs)
+        return writer.entry_count, writer.code_count
+
+
+def import_binaries(output_path: Text, paths: Iterable[Text]) -> Tuple[int, int]:
+    """
+    Builds a corpus of the creation bytecode in the given *.bin* files, or all *.bin* files found inside the given
+    directories, see *BinaryLoader*. Returns the number of entries and distinct codes.
+    """
+    with CorpusWriter(output_path) as writer:
+        for path in _find_binaries(paths):
+            with open(path, 'r') as contract_bin:
+                bytecode = contract_bin.read().strip()
+            try:
+                code = bytes.fromhex(bytecode[2:] if bytecode.startswith('0x') else bytecode)
+            except ValueError:
+                log.warning('Skipping file without hex encoded bytecode: %s', path)
+                continue
+            writer.add(code, creation=True)
+        return writer.entry_count, writer.code_count
+
+
+def _write_chunk(writer: CorpusWriter, chunk: List[Tuple[Text, Optional[Version]]], rpc: Optional[Text], batch_size: int,
+                 jobs: int) -> None:
+    codes = fetch_codes(rpc, [address for address, _ in chunk], batch_size, jobs)
+    for (address, compiler_version), code in zip(chunk, codes):
+        if code is None or len(code) <= 2:
+            log.debug('Skipping address without code: %s', address)
+            continue
+        writer.add(bytes.fromhex(code[2:]), address=address, compiler_version=compiler_version)
+    log.info('Imported %d contracts with %d distinct codes', writer.entry_count, writer.code_count)
+
+
+def _parse_version(row: List[Text], column: Optional[int]) -> Optional[Version]:
+    if column is None or column >= len(row):
+        return None
+    try:
+        return Version(raw=row[column].strip())
+    except ValueError:
+        return None
+
+
+def _find_binaries(paths: Iterable[Text]) -> List[Text]:
+    binary_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, filenames in os.walk(path):
+                binary_paths.extend(os.path.join(directory, filename) for filename in filenames if filename.endswith(BINARY_EXTENSION))
+        else:
+            binary_paths.append(path)
+    return sorted(binary_paths)
+
+
+def parse_entry(entry: Text) -> Union[int, Text]:
+    """ Parses a corpus entry given on the command line, either an address or an index. """
+    return entry if entry.startswith('0x') else int(entry)
+
+
+def corpus(args) -> None:
+    if args.corpus_command == 'import':
+        if args.csv_path is not None:
+            entry_count, code_count = import_csv(args.output_path, args.csv_path, args.rpc, delimiter=args.csv_delimiter,
+                                                 address_column=args.address_column, compiler_version_column=args.version_column,
+                                                 has_header=not args.no_header, batch_size=args.batch_size, jobs=args.fetch_jobs)
+        else:
+            entry_count, code_count = import_binaries(args.output_path, args.bin_paths)
+        print('Wrote {} contracts with {} distinct codes to {}'.format(entry_count, code_count, args.output_path))
+    elif args.corpus_command == 'info':
+        with Corpus(args.corpus_path) as packed_corpus:
+            if args.entry is None:
+                print(json.dumps({'entryCount': packed_corpus.entry_count, 'codeCount': packed_corpus.code_count}, indent=2))
+                return
+            entry = parse_entry(args.entry)
+            index = packed_corpus.find(entry) if isinstance(entry, str) else entry
+            if index is None:
+                raise ValueError('No contract at address {} in corpus {}'.format(entry, args.corpus_path))
+            corpus_entry = packed_corpus.entry(index)
+            print(json.dumps({
+                'index': corpus_entry.index,
+                'address': corpus_entry.address,
+                'compilerVersion': corpus_entry.compiler_version.raw if corpus_entry.compiler_version else None,
+                'creation': corpus_entry.creation,
+                'code': '0x' + packed_corpus.code(corpus_entry.code_id).hex()
+            }, indent=2))
@@ -0,0 +1,241 @@
+import csv
+import hashlib
+import json
+import logging
+import os
+import random
+import struct
+
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Text, Tuple
+
+from . import csv_index_dir
+from ithildin.support.compiler_version import Version, VersionMatcher
+
+log = logging.getLogger(__name__)
+
+MAGIC = b'ITHCSVIX'
+FORMAT_VERSION = 1
+
+# Name of the compiler whose rows are matched against compiler versions
+SOLIDITY = 'Solidity'
+
+SHA256_CACHE_FILE = 'sha256sums.json'
+HASH_CHUNK_SIZE = 1 << 20
+
+_HEADER = struct.Struct('<8sBIII')
+_GROUP = struct.Struct('<HBBBBII')
+
+
+class VersionGroup:
+    """ The rows sharing a compiler name and version, which are *rows[start:start + count]* of the index. """
+
+    def __init__(self, name_id: int, version: Optional[Tuple[int, int, int]], start: int, count: int) -> None:
+        self.name_id = name_id
+        self.version = version
+        self.start = start
+        self.count = count
+
+
+class CsvIndex:
+    """
+    Sidecar index of a contracts CSV file, holding the byte offset of each row, so that sampled rows can be read by
+    seeking to them, and the rows grouped by their parsed compiler name and version, so that compiler versions only
+    need to be matched once per distinct version instead of once per row.
+
+    An index file starts with a header holding the magic bytes, the format version, the counts of rows and groups and
+    the length of the JSON metadata holding the compiler names, followed by the metadata, the groups, the row offsets
+    ordered by row number and the row numbers ordered by group.
+    """
+
+    def __init__(self, names: List[Text], groups: List[VersionGroup], offsets: array, rows: array,
+                 has_header: bool = True, filter_names: bool = True) -> None:
+        self.names = names
+        self.groups = groups
+        self.offsets = offsets
+        self.rows = rows
+        self.has_header = has_header
+        self.filter_names = filter_names
+
+    @property
+    def row_count(self) -> int:
+        return len(self.offsets)
+
+    @classmethod
+    def build(cls,
+              csv_path: Text,
+              delimiter: Text = ',',
+              compiler_name_column: Optional[int] = None,
+              compiler_version_column: Optional[int] = None,
+              has_header: bool = True) -> 'CsvIndex':
+        """ Reads the whole CSV file once, parsing the compiler name and version of every row but the header. """
+        log.info('Building row index of %s', csv_path)
+        offsets = array('Q')
+        name_ids: Dict[Text, int] = {}
+        group_rows: Dict[Tuple[int, Optional[Tuple[int, int, int]]], array] = {}
+        with open(csv_path, 'rb') as csv_file:
+            position = [0]
+
+            def lines() -> Iterator[Text]:
+                for line in csv_file:
+                    position[0] += len(line)
+                    yield line.decode('utf-8')
+
+            csv_reader = csv.reader(lines(), delimiter=delimiter)
+            while True:
+                offset = position[0]
+                try:
+                    row = next(csv_reader)
+                except StopIteration:
+                    break
+                row_number = len(offsets)
+                offsets.append(offset)
+                if has_header and row_number == 0:
+                    continue
+                name = cls._column(row, compiler_name_column) or ''
+                version = None
+                raw_version = cls._column(row, compiler_version_column)
+                if raw_version is not None:
+                    try:
+                        parsed = Version(raw=raw_version)
+                        version = (parsed.major, parsed.minor, parsed.hotfix)
+                    except ValueError:
+                        pass
+                name_id = name_ids.setdefault(name, len(name_ids))
+                group_rows.setdefault((name_id, version), array('I')).append(row_number)
+        groups = []
+        rows = array('I')
+        for (name_id, version), row_numbers in sorted(group_rows.items(), key=lambda item: (item[0][0], item[0][1] or (-1, -1, -1))):
+            groups.append(VersionGroup(name_id, version, len(rows), len(row_numbers)))
+            rows.extend(row_numbers)
+        names = sorted(name_ids, key=name_ids.get)
+        log.info('Indexed %d rows with %d distinct compiler versions', len(offsets), len(groups))
+        return cls(names, groups, offsets, rows, has_header, compiler_name_column is not None)
+
+    @classmethod
+    def load(cls, path: Text) -> 'CsvIndex':
+        with open(path, 'rb') as index_file:
+            data = index_file.read()
+        magic, version, row_count, group_count, metadata_length = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError('Not a CSV index file: {}'.format(path))
+        if version != FORMAT_VERSION:
+            raise ValueError('Unsupported CSV index format version {} in {}'.format(version, path))
+        offset = _HEADER.size
+        metadata = json.loads(data[offset:offset + metadata_length].decode('utf-8'))
+        offset += metadata_length
+        groups = []
+        for _ in range(group_count):
+            name_id, has_version, major, minor, hotfix, start, count = _GROUP.unpack_from(data, offset)
+            groups.append(VersionGroup(name_id, (major, minor, hotfix) if has_version else None, start, count))
+            offset += _GROUP.size
+        offsets = array('Q')
+        offsets.frombytes(data[offset:offset + row_count * offsets.itemsize])
+        offset += row_count * offsets.itemsize
+        rows = array('I')
+        rows.frombytes(data[offset:offset + sum(group.count for group in groups) * rows.itemsize])
+        return cls(metadata['names'], groups, offsets, rows, metadata['hasHeader'], metadata['filterNames'])
+
+    def save(self, path: Text) -> None:
+        """ Writes the index to a temporary file first, so that concurrent runs never read a partially written index. """
+        encoded_metadata = json.dumps({'names': self.names, 'hasHeader': self.has_header, 'filterNames': self.filter_names}).encode('utf-8')
+        temporary_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(temporary_path, 'wb') as index_file:
+            index_file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, self.row_count, len(self.groups), len(encoded_metadata)))
+            index_file.write(encoded_metadata)
+            for group in self.groups:
+                major, minor, hotfix = group.version or (0, 0, 0)
+                index_file.write(_GROUP.pack(group.name_id, group.version is not None, major, minor, hotfix, group.start, group.count))
+            index_file.write(self.offsets.tobytes())
+            index_file.write(self.rows.tobytes())
+        os.replace(temporary_path, path)
+
+    def matching_groups(self, version_matcher: VersionMatcher) -> List[VersionGroup]:
+        """ Returns the groups of Solidity rows whose version matches, Solidity meaning any compiler without a name column. """
+        solidity_id = self.names.index(SOLIDITY) if SOLIDITY in self.names else None
+        return [group for group in self.groups
+                if group.version is not None and (not self.filter_names or group.name_id == solidity_id)
+                and version_matcher.matches(Version(*group.version))]
+
+    def sample(self, sample_size: int, version_matcher: Optional[VersionMatcher] = None) -> Set[int]:
+        """ Samples *sample_size* row numbers, excluding the header, only of rows matching *version_matcher* if given. """
+        if version_matcher is None:
+            return set(random.sample(range(1 if self.has_header else 0, self.row_count), sample_size))
+        groups = self.matching_groups(version_matcher)
+        ends = list(accumulate(group.count for group in groups))
+        picks = random.sample(range(ends[-1] if len(ends) > 0 else 0), sample_size)
+        sample = set()
+        for pick in picks:
+            group_index = bisect_right(ends, pick)
+            group = groups[group_index]
+            sample.add(self.rows[group.start + pick - (ends[group_index] - group.count)])
+        return sample
+
+    def read_rows(self, csv_path: Text, row_numbers: Sequence[int], delimiter: Text = ',') -> Iterator[Tuple[int, List[Text]]]:
+        """ Reads the rows with the given numbers by seeking to their offsets, in the given order. """
+        with open(csv_path, 'r', newline='', encoding='utf-8') as csv_file:
+            for row_number in row_numbers:
+                # Offsets of line starts are valid positions for text files decoded without state, such as UTF-8
+                csv_file.seek(self.offsets[row_number])
+                yield row_number, next(csv.reader(csv_file, delimiter=delimiter))
+
+    @staticmethod
+    def _column(row: List[Text], column: Optional[int]) -> Optional[Text]:
+        if column is None or column >= len(row):
+            return None
+        return row[column].strip()
+
+
+def sha256sum(path: Text) -> Text:
+    """
+    Returns the SHA-256 hash of the file at *path*. Hashes are cached by path, size and modification time, so that
+    large files are only hashed again after they changed.
+    """
+    stat = os.stat(path)
+    cache_path = os.path.join(csv_index_dir, SHA256_CACHE_FILE)
+    cache_key = os.path.realpath(path)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as cache_file:
+            cache = json.load(cache_file)
+    except (IOError, ValueError):
+        cache = {}
+    cached = cache.get(cache_key)
+    if cached is not None and cached['size'] == stat.st_size and cached['mtime'] == stat.st_mtime_ns:
+        return cached['sha256']
+    file_hash = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            file_hash.update(chunk)
+    cache[cache_key] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'sha256': file_hash.hexdigest()}
+    os.makedirs(csv_index_dir, exist_ok=True)
+    with open(cache_path, 'w', encoding='utf-8') as cache_file:
+        json.dump(cache, cache_file)
+    return file_hash.hexdigest()
+
+
+def get_csv_index(csv_path: Text,
+                  file_sha256sum: Optional[Text] = None,
+                  delimiter: Text = ',',
+                  compiler_name_column: Optional[int] = None,
+                  compiler_version_column: Optional[int] = None,
+                  has_header: bool = True) -> CsvIndex:
+    """
+    Returns the index of the CSV file at *csv_path* for the given columns, which is loaded from the index directory
+    if it has been built before for a file with the same SHA-256 hash, and built and saved otherwise.
+    """
+    file_sha256sum = file_sha256sum or sha256sum(csv_path)
+    index_name = '{}_{}_{}_{}_{:d}.idx'.format(file_sha256sum, ord(delimiter),
+                                               'n' if compiler_name_column is None else compiler_name_column,
+                                               'n' if compiler_version_column is None else compiler_version_column, has_header)
+    index_path = os.path.join(csv_index_dir, index_name)
+    if os.path.exists(index_path):
+        try:
+            return CsvIndex.load(index_path)
+        except (ValueError, KeyError, struct.error) as e:
+            log.warning('Rebuilding unreadable CSV index %s: %s', index_path, e)
+    index = CsvIndex.build(csv_path, delimiter, compiler_name_column, compiler_version_column, has_header)
+    os.makedirs(csv_index_dir, exist_ok=True)
+    index.save(index_path)
+    return index
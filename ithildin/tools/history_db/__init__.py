@@ -0,0 +1,6 @@
+import os
+
+from ithildin.tools import ithildin_home
+
+history_db_file = 'history.db'
+history_db_path = os.path.join(ithildin_home, history_db_file)
@@ -0,0 +1,108 @@
+# pylint: disable=maybe-no-member
+
+from sqlalchemy import create_engine, Boolean, Column, Float, ForeignKey, Integer, String
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship, sessionmaker
+from typing import Text
+
+from . import history_db_path
+
+Base = declarative_base()
+
+
+class BenchmarkRun(Base):
+    """ A completed benchmark with its settings and final metrics, one per benchmark report. """
+    __tablename__ = 'benchmark_runs'
+
+    id = Column(Integer, primary_key=True)
+    program_version = Column(String(32), nullable=False, index=True)
+    strategy_name = Column(String(64), nullable=False, index=True)
+    search_strategy = Column(String(64))
+    exec_timeout = Column(Integer)
+    max_depth = Column(Integer)
+    adaptive_budget = Column(Boolean, default=False)
+    functions = Column(String(255))
+    random_seed = Column(Integer)
+    verification_ratio = Column(Float)
+    target_version = Column(String(32))
+    contracts_filename = Column(String(255))
+    file_sha256sum = Column(String(64))
+    start_time = Column(String(32))
+    end_time = Column(String(32))
+    recorded_at = Column(Float, index=True)
+    sample_size = Column(Integer)
+    total_detections = Column(Integer)
+    true_positives = Column(Integer)
+    false_positives = Column(Integer)
+    true_negatives = Column(Integer)
+    false_negatives = Column(Integer)
+    unknown = Column(Integer)
+    precision = Column(Float)
+    recall = Column(Float)
+    contracts = relationship('BenchmarkContract', back_populates='run', order_by='BenchmarkContract.contract_index')
+
+    @property
+    def timeouts_hit(self) -> int:
+        return sum(1 for contract in self.contracts if contract.timeout_hit)
+
+    def __repr__(self):
+        return (
+            '<BenchmarkRun '
+            'id={0.id} '
+            'program_version={0.program_version} '
+            'strategy_name={0.strategy_name} '
+            'exec_timeout={0.exec_timeout} '
+            'max_depth={0.max_depth} '
+            'sample_size={0.sample_size} '
+            'precision={0.precision} '
+            'recall={0.recall}'
+            '>'
+        ).format(self)
+
+
+class BenchmarkContract(Base):
+    """ A contract analyzed during a benchmark run, with the wall time and the states explored by its analysis. """
+    __tablename__ = 'benchmark_contracts'
+
+    id = Column(Integer, primary_key=True)
+    run_id = Column(Integer, ForeignKey('benchmark_runs.id'), nullable=False, index=True)
+    contract_address = Column(String(42), nullable=False, index=True)
+    contract_index = Column(Integer)
+    code_hash = Column(String(66))
+    outcome = Column(String(20))
+    execution_time = Column(Float)
+    states_explored = Column(Integer)
+    timeout_hit = Column(Boolean, default=False)
+    detections = Column(Integer)
+    verified = Column(Boolean, default=False)
+    run = relationship('BenchmarkRun', back_populates='contracts')
+
+    def __repr__(self):
+        return (
+            '<BenchmarkContract '
+            'id={0.id} '
+            'run_id={0.run_id} '
+            'contract_address={0.contract_address} '
+            'execution_time={0.execution_time} '
+            'states_explored={0.states_explored} '
+            'timeout_hit={0.timeout_hit}'
+            '>'
+        ).format(self)
+
+
+class HistoryDB:
+    """ Connection to a benchmark history at *path*, the tables are created if they don't exist yet. """
+
+    def __init__(self, path: Text = history_db_path) -> None:
+        self.path = path
+        self._engine = create_engine(f'sqlite:///{path}')
+        Base.metadata.create_all(self._engine)
+        self._session = sessionmaker(bind=self._engine)()
+
+    @property
+    def session(self):
+        return self._session
+
+    def close(self) -> None:
+        self._session.close()
+        self._engine.dispose()
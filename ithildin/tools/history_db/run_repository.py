@@ -0,0 +1,47 @@
+import time
+
+from typing import List, Optional, Text
+
+from .history_db import BenchmarkContract, BenchmarkRun, HistoryDB
+from ithildin import __version__
+from ithildin.report.benchmark import Report
+
+
+class RunRepository:
+
+    def __init__(self, db: Optional[HistoryDB] = None):
+        self.db = db or HistoryDB()
+
+    def save(self, report: Report, program_version: Text = __version__) -> BenchmarkRun:
+        """ Appends the benchmark *report* to the history, together with the program version that produced it. """
+        entity = BenchmarkRun(program_version=program_version, strategy_name=report.strategy_name, search_strategy=report.search_strategy,
+                              exec_timeout=report.exec_timeout, max_depth=report.max_depth, adaptive_budget=report.adaptive_budget,
+                              functions=','.join(report.functions) if report.functions else None, random_seed=report.random_seed,
+                              verification_ratio=report.verification_ratio, target_version=report.target_version,
+                              contracts_filename=report.contracts_filename, file_sha256sum=report.file_sha256sum,
+                              start_time=report.start_time, end_time=report.end_time, recorded_at=time.time(),
+                              sample_size=report.sample_size, total_detections=report.total_detections,
+                              true_positives=report.true_positives, false_positives=report.false_positives,
+                              true_negatives=report.true_negatives, false_negatives=report.false_negatives, unknown=report.unknown,
+                              precision=report.precision, recall=report.recall)
+        entity.contracts = [BenchmarkContract(contract_address=result.contract_address.lower(), contract_index=result.contract_index,
+                                              code_hash=result.code_hash, outcome=result.outcome, execution_time=result.execution_time,
+                                              states_explored=result.states_explored, timeout_hit=result.timeout_hit,
+                                              detections=result.total_hits, verified=result.verified)
+                            for result in report.results]
+        self.db.session.add(entity)
+        self.db.session.commit()
+        return entity
+
+    def get(self, run_id: int) -> Optional[BenchmarkRun]:
+        return self.db.session.query(BenchmarkRun).get(run_id)
+
+    def latest(self, limit: Optional[int] = None, strategy_name: Optional[Text] = None) -> List[BenchmarkRun]:
+        """ Retrieve the most recently recorded runs first, optionally only those of the strategy named *strategy_name*. """
+        query = self.db.session.query(BenchmarkRun)
+        if strategy_name is not None:
+            query = query.filter(BenchmarkRun.strategy_name == strategy_name)
+        query = query.order_by(BenchmarkRun.id.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
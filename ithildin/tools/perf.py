@@ -0,0 +1,180 @@
+import glob
+import json
+import logging
+import os
+import resource
+import time
+
+from typing import Callable, Dict, List, Optional, Text, Tuple
+
+from ithildin.analysis.loader import StrategyLoader
+from ithildin.analysis.supervisor import SupervisedExecutor
+from ithildin.analysis.symbolic import LaserWrapper
+from ithildin.contract.loader_factory import get_factory, LoaderFactoryType
+from ithildin.report.analysis import Outcome
+from ithildin.report.perf import Comparison, Measurement, Report
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S (%z)'
+
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), 'perf_fixtures')
+BASELINE_PATH = os.path.join(FIXTURES_PATH, 'baseline.json')
+
+# Relative change of a metric tolerated before it counts as a regression
+WALL_TIME_TOLERANCE = 0.15
+HOOK_RATE_TOLERANCE = 0.15
+PEAK_RSS_TOLERANCE = 0.10
+STATES_TOLERANCE = 0.05
+# Wall time limits are widened by this many median absolute deviations of the baseline or current runs
+NOISE_FACTOR = 3
+# Seconds a measurement may take beyond the execution timeout before its worker is killed
+HARD_TIMEOUT_GRACE = 120
+
+log = logging.getLogger(__name__)
+
+
+def fixture_paths(names: Optional[List[Text]] = None) -> Dict[Text, Text]:
+    """ Returns the paths of the fixture bytecode files by fixture name, restricted to *names* if given. """
+    paths = {os.path.splitext(os.path.basename(path))[0]: path for path in sorted(glob.glob(os.path.join(FIXTURES_PATH, '*.bin')))}
+    if names is not None:
+        unknown_names = set(names) - set(paths)
+        if len(unknown_names) > 0:
+            raise ValueError('Unknown fixture(s): {}'.format(', '.join(sorted(unknown_names))))
+        paths = {name: path for name, path in paths.items() if name in names}
+    return paths
+
+
+def _counting(function: Callable, counter: List[int]) -> Callable:
+    def counted(*args, **kwargs):
+        counter[0] += 1
+        return function(*args, **kwargs)
+    return counted
+
+
+def _measure(task: Tuple[Text, Dict]) -> Dict:
+    """ Worker function analyzing a fixture once, expected to run in a fresh process so that the peak RSS is its own. """
+    path, execute_options = task
+    strategy_loader = StrategyLoader()
+    hook_calls = [0]
+    for strategy in strategy_loader.get_strategies():
+        strategy.execute = _counting(strategy.execute, hook_calls)
+    contract_loader = get_factory(LoaderFactoryType.BINARY, path=path).create()
+    start_time = time.perf_counter()
+    report = LaserWrapper(strategy_loader).execute(contract_loader=contract_loader, **execute_options)
+    wall_time = time.perf_counter() - start_time
+    return {
+        'wallTime': wall_time,
+        'statesExplored': report.coverage.executed_states if report.coverage else 0,
+        'hookCalls': hook_calls[0],
+        'peakRss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        'detections': sum(len(report_item.results) for report_item in report.reports),
+        'timedOut': report.timed_out
+    }
+
+
+def measure(fixtures: Dict[Text, Text], repeat: int, timeout: int, max_depth: int) -> List[Measurement]:
+    """
+    Analyzes each fixture *repeat* times, one run at a time and each in a fresh worker process, and returns the
+    measurements. All runs are expected to do the same work, so states, hook calls and detections are taken from the
+    first run, while wall times are kept per run. A fixture is measured no further once a run fails or reaches the
+    execution timeout, since the metrics of a run cut off by the timeout only depend on the speed of the machine.
+    """
+    execute_options = dict(timeout=timeout, max_depth=max_depth)
+    measurements = []
+    with SupervisedExecutor(_measure, jobs=1, hard_timeout=timeout + HARD_TIMEOUT_GRACE, max_tasks_per_worker=1) as executor:
+        for name, path in fixtures.items():
+            log.info('Measuring fixture %s', name)
+            runs = []
+            outcome = Outcome.COMPLETED
+            for _ in range(repeat):
+                outcome, run = executor.map([(path, execute_options)])[0]
+                if outcome != Outcome.COMPLETED:
+                    log.warning('Measuring fixture %s failed with outcome %s', name, outcome.value)
+                    break
+                runs.append(run)
+                if run['timedOut']:
+                    log.warning('Measuring fixture %s reached the execution timeout', name)
+                    outcome = Outcome.TIMEOUT
+                    break
+            if len(runs) == 0:
+                measurements.append(Measurement(name, [], 0, 0, 0, 0, outcome.value))
+                continue
+            measurements.append(Measurement(name, [run['wallTime'] for run in runs], runs[0]['statesExplored'], runs[0]['hookCalls'],
+                                            max(run['peakRss'] for run in runs), runs[0]['detections'], outcome.value))
+    return measurements
+
+
+def compare(measurement: Measurement, baseline: Measurement) -> List[Comparison]:
+    """
+    Compares *measurement* against *baseline*. Wall time and hook rate limits are widened by the measured noise, so
+    that slow-downs are only reported when they exceed both the relative tolerance and the run-to-run variance. If
+    either did not complete, e.g. because it reached the execution timeout, only the outcomes are compared.
+    """
+    fixture = measurement.fixture
+    if not measurement.completed or not baseline.completed:
+        return [Comparison(fixture, 'Outcome', baseline.outcome, measurement.outcome, baseline.outcome,
+                           measurement.outcome != baseline.outcome)]
+    noise = NOISE_FACTOR * max(baseline.wall_time_noise, measurement.wall_time_noise)
+    wall_time_limit = baseline.wall_time * (1 + WALL_TIME_TOLERANCE) + noise
+    hook_rate_limit = 0.0
+    if baseline.hooks_per_second:
+        hook_rate_limit = baseline.hooks_per_second * (1 - HOOK_RATE_TOLERANCE - noise / baseline.wall_time)
+    states_limit = baseline.states_explored * (1 + STATES_TOLERANCE)
+    peak_rss_limit = baseline.peak_rss * (1 + PEAK_RSS_TOLERANCE)
+    return [
+        Comparison(fixture, 'Wall Time (sec)', baseline.wall_time, measurement.wall_time, wall_time_limit,
+                   measurement.wall_time > wall_time_limit),
+        Comparison(fixture, 'Hooks/sec', baseline.hooks_per_second, measurement.hooks_per_second, hook_rate_limit,
+                   (measurement.hooks_per_second or 0) < hook_rate_limit),
+        Comparison(fixture, 'States Explored', baseline.states_explored, measurement.states_explored, states_limit,
+                   measurement.states_explored > states_limit),
+        Comparison(fixture, 'Peak RSS (MB)', baseline.peak_rss / 1048576, measurement.peak_rss / 1048576, peak_rss_limit / 1048576,
+                   measurement.peak_rss > peak_rss_limit),
+        # Detections should not change at all, otherwise the fixture doesn't measure the same work anymore
+        Comparison(fixture, 'Detections', baseline.detections, measurement.detections, baseline.detections,
+                   measurement.detections != baseline.detections)
+    ]
+
+
+def load_baseline(path: Text) -> Dict:
+    with open(path, 'r') as baseline_file:
+        baseline = json.load(baseline_file)
+    baseline['fixtures'] = {name: Measurement.from_dict(measurement) for name, measurement in baseline.get('fixtures', {}).items()}
+    return baseline
+
+
+def save_baseline(path: Text, report: Report, baseline: Optional[Dict] = None) -> None:
+    """ Writes the measurements of *report* to the baseline at *path*, keeping the fixtures of *baseline* that weren't measured. """
+    fixtures = dict(baseline['fixtures']) if baseline is not None else {}
+    fixtures.update({measurement.fixture: measurement for measurement in report.measurements if measurement.completed})
+    with open(path, 'w') as baseline_file:
+        json.dump({
+            'repeat': report.repeat,
+            'execTimeout': report.exec_timeout,
+            'maxDepth': report.max_depth,
+            'fixtures': {name: fixtures[name].to_dict() for name in sorted(fixtures)}
+        }, baseline_file, indent=2)
+        baseline_file.write('\n')
+
+
+def perf(args) -> None:
+    baseline = load_baseline(args.baseline) if os.path.exists(args.baseline) else None
+    timeout = args.timeout if args.timeout is not None else (baseline or {}).get('execTimeout', 300)
+    max_depth = args.max_depth if args.max_depth is not None else (baseline or {}).get('maxDepth', 128)
+    if baseline is not None and (timeout, max_depth) != (baseline.get('execTimeout'), baseline.get('maxDepth')):
+        log.warning('Measuring with a different timeout or max depth than the baseline, comparisons are not meaningful')
+
+    report = Report(args.repeat, timeout, max_depth, baseline_path=args.baseline, start_time=time.strftime(TIME_FORMAT))
+    report.measurements = measure(fixture_paths(args.fixtures), args.repeat, timeout, max_depth)
+    if baseline is not None and not args.update_baseline:
+        for measurement in report.measurements:
+            if measurement.fixture in baseline['fixtures']:
+                report.comparisons.extend(compare(measurement, baseline['fixtures'][measurement.fixture]))
+            else:
+                log.warning('No baseline for fixture %s', measurement.fixture)
+    if args.update_baseline:
+        save_baseline(args.baseline, report, baseline)
+        log.info('Updated baseline %s', args.baseline)
+
+    print(report.to_json(pretty=True) if args.as_json else report.to_markdown())
+    if len(report.regressions) > 0:
+        exit(1)
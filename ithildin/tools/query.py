@@ -0,0 +1,56 @@
+import json
+import time
+
+from typing import Dict, Optional, Text
+
+from ithildin.report.analysis import Report
+from ithildin.tools.results_db.result_repository import ResultRepository
+from ithildin.tools.results_db.results_db import Hit, ResultsDB
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S (%z)'
+
+
+def store_reports(path: Text, *reports: Report) -> None:
+    """ Stores the analysis *reports* in the results warehouse at *path*. """
+    db = ResultsDB(path)
+    try:
+        ResultRepository(db).save_all(reports)
+    finally:
+        db.close()
+
+
+def hit_to_dict(hit: Hit) -> Dict:
+    return {
+        'contractAddress': hit.analysis.contract_address,
+        'contractName': hit.analysis.contract_name,
+        'codeHash': hit.analysis.code_hash,
+        'implementationAddress': hit.analysis.implementation_address,
+        'analysisTime': hit.analysis.start_time,
+        'patternName': hit.pattern_name,
+        'functionName': hit.function_name,
+        'functionSelector': hit.function_selector,
+        'attributes': {attribute.name: attribute.value for attribute in hit.attributes}
+    }
+
+
+def _format_hit(hit: Hit) -> Text:
+    analysis_time = time.strftime(TIME_FORMAT, time.localtime(hit.analysis.start_time)) if hit.analysis.start_time else 'n/a'
+    attributes = ', '.join('{}={}'.format(attribute.name, attribute.value) for attribute in hit.attributes)
+    return '{}\t{}\t{}\t{}\t{}\t{}'.format(hit.analysis.contract_address or hit.analysis.contract_name, hit.pattern_name, hit.function_name,
+                                           hit.function_selector or 'n/a', attributes or '-', analysis_time)
+
+
+def query(args) -> None:
+    pattern_name: Optional[Text] = args.pattern.replace('-', '_').upper() if args.pattern else None
+    db = ResultsDB(args.db_path)
+    try:
+        hits = ResultRepository(db).query(contract_address=args.address, code_hash=args.code_hash, pattern_name=pattern_name,
+                                          function_selector=args.selector, attribute_name=args.attribute, value=args.value,
+                                          latest=args.latest, limit=args.limit)
+        if args.as_json:
+            print(json.dumps([hit_to_dict(hit) for hit in hits], indent=2))
+        else:
+            for hit in hits:
+                print(_format_hit(hit))
+    finally:
+        db.close()
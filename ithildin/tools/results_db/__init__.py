@@ -0,0 +1,6 @@
+import os
+
+from ithildin.tools import ithildin_home
+
+results_db_file = 'results.db'
+results_db_path = os.path.join(ithildin_home, results_db_file)
@@ -0,0 +1,112 @@
+import re
+
+from sqlalchemy import func
+from sqlalchemy.orm import contains_eager, selectinload
+from typing import Iterable, List, Optional, Text, Union
+
+from .results_db import Analysis, Hit, HitAttribute, ResultsDB
+from ithildin.analysis.functions import function_selector
+from ithildin.report.analysis import Report
+
+HEX_REGEX = r'0x[0-9a-f]+'
+
+
+def normalize_value(value: Union[int, Text, None]) -> Optional[Text]:
+    """
+    Normalizes hex values to lower case without leading zeros, so that an address matches the 32 byte storage word
+    holding it. Other values are only converted to lower case.
+    """
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return hex(value)
+    text = str(value).strip().lower()
+    if re.fullmatch(HEX_REGEX, text):
+        return hex(int(text, 16))
+    return text
+
+
+class ResultRepository:
+
+    def __init__(self, db: Optional[ResultsDB] = None):
+        self.db = db or ResultsDB()
+
+    def save(self, report: Report) -> Analysis:
+        """ Stores *report* with all of its hits, see *save_all()*. """
+        return self.save_all([report])[0]
+
+    def save_all(self, reports: Iterable[Report]) -> List[Analysis]:
+        """
+        Stores the analysis *reports* in a single transaction. Each report is stored as a new analysis, so earlier
+        analyses of the same contract are kept.
+
+        Returns
+        -------
+        The stored Analysis entities.
+        """
+        entities = []
+        for report in reports:
+            entity = Analysis(contract_address=report.contract_address.lower() if report.contract_address else None,
+                              contract_name=report.contract_name, code_hash=report.code_hash,
+                              implementation_address=report.implementation_address.lower() if report.implementation_address else None,
+                              outcome=report.outcome.value, start_time=report.start_time, end_time=report.end_time)
+            for report_item in report.reports:
+                for result in report_item.results:
+                    hit = Hit(pattern_name=report_item.pattern_name, function_name=result.function_name,
+                              function_selector=function_selector(result.function_name))
+                    hit.attributes = [HitAttribute(name=name, value=str(value), normalized_value=normalize_value(value))
+                                      for name, value in result.attributes.items()]
+                    entity.hits.append(hit)
+            entities.append(entity)
+        self.db.session.add_all(entities)
+        self.db.session.commit()
+        return entities
+
+    def query(self,
+              contract_address: Optional[Text] = None,
+              code_hash: Optional[Text] = None,
+              pattern_name: Optional[Text] = None,
+              function_selector: Optional[Text] = None,
+              attribute_name: Optional[Text] = None,
+              value: Optional[Text] = None,
+              latest: bool = False,
+              limit: Optional[int] = None) -> List[Hit]:
+        """
+        Retrieve the hits matching all given filters. A *value* matches any attribute of a hit, e.g. an address matches
+        hits whose owner storage slot holds that address, unless *attribute_name* restricts it to one attribute.
+
+        Parameters
+        ----------
+        latest: bool
+            Only consider the most recent analysis of each contract.
+        limit: Optional[int]
+            The maximum number of hits to return.
+
+        Returns
+        -------
+        The matching Hit entities, most recent analyses first.
+        """
+        # Analyses and attributes are loaded with the hits rather than once per hit when they're accessed
+        query = self.db.session.query(Hit).join(Analysis).options(contains_eager(Hit.analysis), selectinload(Hit.attributes))
+        if contract_address is not None:
+            query = query.filter(Analysis.contract_address == contract_address.lower())
+        if code_hash is not None:
+            query = query.filter(Analysis.code_hash == code_hash.lower())
+        if pattern_name is not None:
+            query = query.filter(Hit.pattern_name == pattern_name)
+        if function_selector is not None:
+            query = query.filter(Hit.function_selector == function_selector.lower())
+        if value is not None or attribute_name is not None:
+            attribute_query = self.db.session.query(HitAttribute.hit_id)
+            if value is not None:
+                attribute_query = attribute_query.filter(HitAttribute.normalized_value == normalize_value(value))
+            if attribute_name is not None:
+                attribute_query = attribute_query.filter(HitAttribute.name == attribute_name)
+            query = query.filter(Hit.id.in_(attribute_query))
+        if latest:
+            latest_ids = self.db.session.query(func.max(Analysis.id)).group_by(Analysis.contract_address, Analysis.contract_name)
+            query = query.filter(Analysis.id.in_(latest_ids))
+        query = query.order_by(Analysis.id.desc(), Hit.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
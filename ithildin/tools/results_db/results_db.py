@@ -0,0 +1,130 @@
+# pylint: disable=maybe-no-member
+
+from sqlalchemy import create_engine, Column, Float, ForeignKey, Index, Integer, String, UniqueConstraint
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship, sessionmaker
+from typing import Text
+
+from . import results_db_path
+
+Base = declarative_base()
+
+
+class Analysis(Base):
+    __tablename__ = 'analyses'
+
+    id = Column(Integer, primary_key=True)
+    contract_address = Column(String(42), index=True)
+    contract_name = Column(String(255), index=True)
+    code_hash = Column(String(66), index=True)
+    implementation_address = Column(String(42), index=True)
+    outcome = Column(String(20), nullable=False)
+    start_time = Column(Float)
+    end_time = Column(Float)
+    hits = relationship('Hit', back_populates='analysis')
+
+    def __repr__(self):
+        return (
+            '<Analysis '
+            'id={0.id} '
+            'contract_address={0.contract_address} '
+            'contract_name={0.contract_name} '
+            'code_hash={0.code_hash} '
+            'outcome={0.outcome}'
+            '>'
+        ).format(self)
+
+
+class Hit(Base):
+    __tablename__ = 'hits'
+
+    id = Column(Integer, primary_key=True)
+    analysis_id = Column(Integer, ForeignKey('analyses.id'), nullable=False, index=True)
+    pattern_name = Column(String(64), nullable=False, index=True)
+    function_name = Column(String(255), nullable=False)
+    function_selector = Column(String(10), index=True)
+    analysis = relationship('Analysis', back_populates='hits')
+    attributes = relationship('HitAttribute', back_populates='hit')
+
+    def __repr__(self):
+        return (
+            '<Hit '
+            'id={0.id} '
+            'analysis_id={0.analysis_id} '
+            'pattern_name={0.pattern_name} '
+            'function_name={0.function_name} '
+            'function_selector={0.function_selector}'
+            '>'
+        ).format(self)
+
+
+class HitAttribute(Base):
+    """ An attribute of a hit, e.g. an owner's address. *normalized_value* is what queries match against. """
+    __tablename__ = 'hit_attributes'
+    __table_args__ = (Index('ix_hit_attributes_normalized_value_name', 'normalized_value', 'name'),)
+
+    id = Column(Integer, primary_key=True)
+    hit_id = Column(Integer, ForeignKey('hits.id'), nullable=False, index=True)
+    name = Column(String(64), nullable=False)
+    value = Column(String(255))
+    normalized_value = Column(String(255))
+    hit = relationship('Hit', back_populates='attributes')
+
+    def __repr__(self):
+        return (
+            '<HitAttribute '
+            'id={0.id} '
+            'hit_id={0.hit_id} '
+            'name={0.name} '
+            'value={0.value}'
+            '>'
+        ).format(self)
+
+
+class WatchedSlot(Base):
+    """
+    A storage slot holding an authorization value of a contract, e.g. its owner, taken from the contract's latest
+    analysis. *code_address* is where the analyzed code lives, which differs from the contract's address for proxies.
+    """
+    __tablename__ = 'watched_slots'
+    __table_args__ = (UniqueConstraint('contract_address', 'slot'),)
+
+    id = Column(Integer, primary_key=True)
+    analysis_id = Column(Integer, ForeignKey('analyses.id'), nullable=False, index=True)
+    contract_address = Column(String(42), nullable=False, index=True)
+    code_address = Column(String(42), nullable=False)
+    code_hash = Column(String(66))
+    pattern_name = Column(String(64), nullable=False)
+    attribute_name = Column(String(64), nullable=False)
+    slot = Column(String(66), nullable=False)
+    value = Column(String(66))
+    updated_at = Column(Float)
+
+    def __repr__(self):
+        return (
+            '<WatchedSlot '
+            'id={0.id} '
+            'contract_address={0.contract_address} '
+            'attribute_name={0.attribute_name} '
+            'slot={0.slot} '
+            'value={0.value}'
+            '>'
+        ).format(self)
+
+
+class ResultsDB:
+    """ Connection to a results warehouse at *path*, the tables are created if they don't exist yet. """
+
+    def __init__(self, path: Text = results_db_path) -> None:
+        self.path = path
+        self._engine = create_engine(f'sqlite:///{path}')
+        Base.metadata.create_all(self._engine)
+        self._session = sessionmaker(bind=self._engine)()
+
+    @property
+    def session(self):
+        return self._session
+
+    def close(self) -> None:
+        self._session.close()
+        self._engine.dispose()
@@ -0,0 +1,63 @@
+from sqlalchemy import func
+from typing import Dict, List, Optional, Text
+
+from .results_db import Analysis, ResultsDB, WatchedSlot
+
+STORAGE_INDEX_SUFFIX = ' Storage Index'
+
+
+class WatchedSlotRepository:
+
+    def __init__(self, db: Optional[ResultsDB] = None):
+        self.db = db or ResultsDB()
+
+    def all(self) -> List[WatchedSlot]:
+        return self.db.session.query(WatchedSlot).order_by(WatchedSlot.contract_address, WatchedSlot.id).all()
+
+    def sync(self, contract_address: Optional[Text] = None) -> int:
+        """
+        Takes the watched slots of each contract from its latest analysis, replacing the slots taken from an earlier
+        analysis. Only contracts analyzed at an address have slots, the values are those read during the analysis.
+
+        Parameters
+        ----------
+        contract_address: Optional[Text]
+            Only synchronize the slots of the contract at this address.
+
+        Returns
+        -------
+        The number of contracts whose slots were replaced.
+        """
+        latest_query = self.db.session.query(Analysis.contract_address, func.max(Analysis.id)).filter(Analysis.contract_address.isnot(None))
+        if contract_address is not None:
+            latest_query = latest_query.filter(Analysis.contract_address == contract_address.lower())
+        latest_ids: Dict[Text, int] = dict(latest_query.group_by(Analysis.contract_address).all())
+        synced_ids: Dict[Text, int] = dict(self.db.session.query(WatchedSlot.contract_address, WatchedSlot.analysis_id).distinct().all())
+        outdated = [address for address, analysis_id in latest_ids.items() if synced_ids.get(address) != analysis_id]
+        for address in outdated:
+            for slot in self.db.session.query(WatchedSlot).filter(WatchedSlot.contract_address == address).all():
+                self.db.session.delete(slot)
+            self.db.session.flush()
+            self.db.session.add_all(self._slots_of(self.db.session.query(Analysis).get(latest_ids[address])))
+        self.db.session.commit()
+        return len(outdated)
+
+    def commit(self) -> None:
+        self.db.session.commit()
+
+    @staticmethod
+    def _slots_of(analysis: Analysis) -> List[WatchedSlot]:
+        slots: Dict[Text, WatchedSlot] = {}
+        for hit in analysis.hits:
+            attributes = {attribute.name: attribute.value for attribute in hit.attributes}
+            for name, index in attributes.items():
+                if not name.endswith(STORAGE_INDEX_SUFFIX) or index in (None, 'None'):
+                    continue
+                slot = hex(int(index, 0))
+                attribute_name = name[:-len(STORAGE_INDEX_SUFFIX)]
+                if slot not in slots:
+                    slots[slot] = WatchedSlot(analysis_id=analysis.id, contract_address=analysis.contract_address,
+                                              code_address=analysis.implementation_address or analysis.contract_address,
+                                              code_hash=analysis.code_hash, pattern_name=hit.pattern_name, attribute_name=attribute_name,
+                                              slot=slot, value=attributes.get(attribute_name), updated_at=analysis.end_time)
+        return list(slots.values())
@@ -0,0 +1,120 @@
+import json
+import logging
+import os
+import time
+
+from typing import Dict, List, Text, Tuple
+
+from mythril.disassembler.disassembly import Disassembly
+
+from ithildin.analysis.loader import StrategyLoader
+from ithildin.analysis.supervisor import SupervisedExecutor
+from ithildin.analysis.symbolic import LaserWrapper
+from ithildin.report.analysis import Outcome
+from ithildin.report.scaling import Report, ScalingPoint
+from ithildin.tools.synthetic import GUARDS, SyntheticContract, generate_contract
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S (%z)'
+
+# Command line names of the parameters that can be varied, mapped to the arguments of *generate_contract()*
+SCALING_PARAMETERS = {
+    'functions': 'function_count',
+    'depth': 'depth',
+    'loops': 'loops',
+    'storage-offset': 'storage_offset'
+}
+
+# Seconds an analysis may take beyond the execution timeout before its worker is killed
+HARD_TIMEOUT_GRACE = 120
+
+log = logging.getLogger(__name__)
+
+
+def _analyze_synthetic(task: Tuple[SyntheticContract, Dict]) -> Dict:
+    """ Worker function analyzing a synthetic contract, returns the selectors of the detected functions by pattern name. """
+    contract, execute_options = task
+    strategy_loader = StrategyLoader()
+    start_time = time.perf_counter()
+    report = LaserWrapper(strategy_loader).execute(creation_code=contract.creation_code, **execute_options)
+    wall_time = time.perf_counter() - start_time
+    # Mythril names functions by signature lookup of their selector, map the names back through the entry points
+    function_names = Disassembly(contract.runtime_code).address_to_function_name
+    selectors = {function_names.get(function.entry): function.selector for function in contract.functions}
+    return {
+        'wallTime': wall_time,
+        'statesExplored': report.coverage.executed_states if report.coverage else 0,
+        'detected': {report_item.pattern_name: [selectors[result.function_name] for result in report_item.results
+                                                if result.function_name in selectors]
+                     for report_item in report.reports}
+    }
+
+
+def generate_contracts(parameter: Text, values: List[int], seeds: List[int],
+                       **generator_options) -> List[Tuple[int, int, SyntheticContract]]:
+    """ Generates a contract for each combination of a value of *parameter* and a seed, other options stay fixed. """
+    assert parameter in SCALING_PARAMETERS, 'Unknown scaling parameter {}'.format(parameter)
+    options = dict(generator_options)
+    contracts = []
+    for value in values:
+        options[SCALING_PARAMETERS[parameter]] = value
+        contracts.extend((value, seed, generate_contract(seed=seed, **options)) for seed in seeds)
+    return contracts
+
+
+def export_contracts(directory: Text, parameter: Text, contracts: List[Tuple[int, int, SyntheticContract]]) -> None:
+    """ Writes the creation bytecode and the ground truth of every contract to *directory*. """
+    os.makedirs(directory, exist_ok=True)
+    for value, seed, contract in contracts:
+        name = '{}-{}-seed{}'.format(parameter, value, seed)
+        with open(os.path.join(directory, name + '.bin'), 'w') as bin_file:
+            bin_file.write(contract.creation_code)
+        with open(os.path.join(directory, name + '.json'), 'w') as json_file:
+            json.dump(contract.to_dict(), json_file, indent=2)
+
+
+def run_scaling(parameter: Text, contracts: List[Tuple[int, int, SyntheticContract]], jobs: int = 1, hard_timeout=None,
+                **execute_options) -> List[ScalingPoint]:
+    """
+    Analyzes *contracts* in supervised workers and aggregates the results per parameter value. Contracts whose analysis
+    failed count as runs without detections, so that recall reflects timeouts, but don't contribute to the wall times.
+    """
+    tasks = [(contract, execute_options) for _, _, contract in contracts]
+    with SupervisedExecutor(_analyze_synthetic, jobs, hard_timeout) as executor:
+        results = executor.map(tasks)
+    points: Dict[int, ScalingPoint] = {}
+    for (value, seed, contract), (outcome, result) in zip(contracts, results):
+        point = points.setdefault(value, ScalingPoint(value, 0))
+        point.runs += 1
+        detected = {}
+        if outcome == Outcome.COMPLETED:
+            point.wall_times.append(result['wallTime'])
+            point.states_explored.append(result['statesExplored'])
+            detected = result['detected']
+        else:
+            log.warning('Analysis of contract with %s %d and seed %d failed with outcome %s', parameter, value, seed, outcome.value)
+        for pattern_name, expected_selectors in contract.expected_hits().items():
+            detected_selectors = set(detected.get(pattern_name, []))
+            point.expected_hits[pattern_name] = point.expected_hits.get(pattern_name, 0) + len(expected_selectors)
+            point.true_positives[pattern_name] = point.true_positives.get(pattern_name, 0) + len(detected_selectors & expected_selectors)
+            point.false_positives[pattern_name] = point.false_positives.get(pattern_name, 0) + len(detected_selectors - expected_selectors)
+    return [points[value] for value in sorted(points)]
+
+
+def scaling(args) -> None:
+    generator_options = dict(function_count=args.functions, guards=args.guards, guarded_ratio=args.guarded_ratio, depth=args.depth,
+                             loops=args.loops, storage_offset=args.storage_offset)
+    contracts = generate_contracts(args.parameter, args.values, args.seeds, **generator_options)
+    if args.export is not None:
+        export_contracts(args.export, args.parameter, contracts)
+
+    configuration = {name: value for name, value in generator_options.items() if name != SCALING_PARAMETERS[args.parameter]}
+    configuration['guards'] = ', '.join(args.guards or GUARDS)
+    configuration['seeds'] = ', '.join(map(str, args.seeds))
+    report = Report(args.parameter, configuration, args.timeout, args.max_depth, start_time=time.strftime(TIME_FORMAT))
+    hard_timeout = args.hard_timeout if args.hard_timeout is not None else args.timeout + HARD_TIMEOUT_GRACE
+    report.points = run_scaling(args.parameter, contracts, jobs=args.jobs, hard_timeout=hard_timeout, timeout=args.timeout,
+                                max_depth=args.max_depth)
+    if args.csv is not None:
+        with open(args.csv, 'w') as csv_file:
+            csv_file.write(report.to_csv())
+    print(report.to_json(pretty=True) if args.as_json else report.to_markdown())
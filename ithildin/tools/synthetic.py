@@ -0,0 +1,282 @@
+import logging
+import random
+import zlib
+
+from typing import Dict, List, Optional, Set, Text, Tuple, Union
+
+from mythril.support.opcodes import reverse_opcodes
+
+log = logging.getLogger(__name__)
+
+# Guards that can protect a synthetic function, named after the strategies expected to detect them
+OWNERSHIP = 'OWNERSHIP'
+ROLES = 'ROLES'
+HASH_LOCK = 'HASH_LOCK'
+MULTIPLE_AUTHORIZATION = 'MULTIPLE_AUTHORIZATION'
+X_CONFIRMATION = 'X_CONFIRMATION'
+GUARDS = [OWNERSHIP, ROLES, HASH_LOCK, MULTIPLE_AUTHORIZATION, X_CONFIRMATION]
+
+# Storage slots of the guard variables, relative to the contract's storage offset
+OWNER_SLOT = 0
+ROLES_SLOT = 1
+SECRET_HASH_SLOT = 2
+THRESHOLD_SLOT = 3
+CONFIRMATIONS_SLOT = 4
+UNLOCK_BLOCK_SLOT = 5
+DATA_SLOT = 6
+
+# keccak256('ADMIN_ROLE'), as used by OpenZeppelin's AccessControl
+ADMIN_ROLE = 0xa49807205ce4d355092ef5a8a18f56e8913cf4a201fbe287825b095693c21775
+
+Item = Tuple[Text, Union[int, Text, None]]
+
+
+class Assembler:
+    """
+    Minimal EVM assembler. Labels are placed at JUMPDEST instructions and always pushed with PUSH2, so that addresses
+    are known after a single pass over the items.
+    """
+
+    def __init__(self) -> None:
+        self.items: List[Item] = []
+        self.addresses: Dict[Text, int] = {}
+
+    def op(self, *opcodes: Text) -> 'Assembler':
+        for opcode in opcodes:
+            assert opcode in reverse_opcodes, 'Unknown opcode {}'.format(opcode)
+            self.items.append(('OP', opcode))
+        return self
+
+    def push(self, value: int, size: Optional[int] = None) -> 'Assembler':
+        size = size or max((value.bit_length() + 7) // 8, 1)
+        assert 0 < size <= 32 and value < 1 << (8 * size), 'Value {} does not fit into PUSH{}'.format(value, size)
+        self.items.append(('PUSH{}'.format(size), value))
+        return self
+
+    def push_label(self, label: Text) -> 'Assembler':
+        self.items.append(('LABEL_REF', label))
+        return self
+
+    def label(self, label: Text) -> 'Assembler':
+        self.items.append(('LABEL', label))
+        return self
+
+    def revert(self) -> 'Assembler':
+        return self.push(0).op('DUP1', 'REVERT')
+
+    def assemble(self) -> bytes:
+        """ Returns the bytecode, the addresses of the labels are available in *addresses* afterwards. """
+        addresses: Dict[Text, int] = {}
+        address = 0
+        for kind, argument in self.items:
+            if kind == 'LABEL':
+                assert argument not in addresses, 'Duplicate label {}'.format(argument)
+                addresses[argument] = address
+            address += self._size(kind)
+        code = bytearray()
+        for kind, argument in self.items:
+            if kind == 'OP':
+                code.append(reverse_opcodes[argument])
+            elif kind == 'LABEL':
+                code.append(reverse_opcodes['JUMPDEST'])
+            elif kind == 'LABEL_REF':
+                code.append(reverse_opcodes['PUSH2'])
+                code += addresses[argument].to_bytes(2, 'big')
+            else:
+                code.append(reverse_opcodes[kind])
+                code += argument.to_bytes(int(kind[4:]), 'big')
+        self.addresses = addresses
+        return bytes(code)
+
+    @staticmethod
+    def _size(kind: Text) -> int:
+        if kind == 'LABEL_REF':
+            return 3
+        if kind.startswith('PUSH'):
+            return 1 + int(kind[4:])
+        return 1
+
+
+class SyntheticFunction:
+    """
+    A function of a synthetic contract. The *guard* check is reached through *depth* nested internal calls, after
+    *loops* nested loops over a calldata argument. Noise functions aren't guarded but read and compare storage.
+    """
+
+    def __init__(self, name: Text, guard: Optional[Text] = None, depth: int = 0, loops: int = 0) -> None:
+        assert guard is None or guard in GUARDS, 'Unknown guard {}'.format(guard)
+        self.name = name
+        self.guard = guard
+        self.depth = depth
+        self.loops = loops
+        self.selector = zlib.crc32(name.encode('utf-8')) | 0x10000000
+        self.entry: Optional[int] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'selector': '0x{:08x}'.format(self.selector),
+            'guard': self.guard,
+            'depth': self.depth,
+            'loops': self.loops,
+            'entry': self.entry
+        }
+
+
+class SyntheticContract:
+    """ A generated contract together with the ground truth of which functions are guarded by which pattern. """
+
+    def __init__(self, functions: List[SyntheticFunction], storage_offset: int = 0) -> None:
+        self.functions = functions
+        self.storage_offset = storage_offset
+        runtime_assembler = _runtime_assembler(functions, storage_offset)
+        runtime_code = runtime_assembler.assemble()
+        for function in functions:
+            function.entry = runtime_assembler.addresses[function.name]
+        self.runtime_code = runtime_code.hex()
+        self.creation_code = _creation_code(runtime_code, functions, storage_offset).hex()
+
+    def expected_hits(self) -> Dict[Text, Set[int]]:
+        """
+        Returns
+        -------
+        The selectors of the guarded functions by the pattern name of the strategy expected to detect them.
+        """
+        hits: Dict[Text, Set[int]] = {guard: set() for guard in GUARDS}
+        for function in self.functions:
+            if function.guard is not None:
+                hits[function.guard].add(function.selector)
+        return hits
+
+    def to_dict(self) -> Dict:
+        return {
+            'storageOffset': self.storage_offset,
+            'functions': [function.to_dict() for function in self.functions],
+            'expectedHits': {pattern: ['0x{:08x}'.format(selector) for selector in sorted(selectors)]
+                             for pattern, selectors in self.expected_hits().items()},
+            'creationCode': self.creation_code,
+            'runtimeCode': self.runtime_code
+        }
+
+
+def generate_contract(function_count: int,
+                      guards: Optional[List[Text]] = None,
+                      guarded_ratio: float = 0.5,
+                      depth: int = 0,
+                      loops: int = 0,
+                      storage_offset: int = 0,
+                      seed: int = 1) -> SyntheticContract:
+    """
+    Generates a contract with *function_count* functions, of which a share of *guarded_ratio* is guarded by one of
+    *guards* (defaults to all guards), picked round robin. The remaining functions are unguarded noise. Guard checks
+    are placed *depth* internal calls deep and preceded by *loops* nested loops. All guard variables are stored at
+    *storage_offset* and following slots; the Ownership and MultipleAuthorization strategies only track slots up to
+    0xFF, so higher offsets model layouts they miss. The order of the functions is shuffled using *seed*.
+    """
+    assert function_count > 0, 'At least one function is required'
+    assert 0 <= guarded_ratio <= 1, 'The guarded ratio needs to be between 0 and 1'
+    guards = guards or GUARDS
+    guarded_count = round(function_count * guarded_ratio)
+    functions = [SyntheticFunction('synthetic{}'.format(index), guards[index % len(guards)] if index < guarded_count else None,
+                                   depth, loops)
+                 for index in range(function_count)]
+    random.Random(seed).shuffle(functions)
+    return SyntheticContract(functions, storage_offset)
+
+
+def _creation_code(runtime_code: bytes, functions: List[SyntheticFunction], storage_offset: int) -> bytes:
+    guards = {function.guard for function in functions}
+
+    def constructor(code_offset: int) -> Assembler:
+        assembler = Assembler()
+        if OWNERSHIP in guards:
+            assembler.op('CALLER').push(storage_offset + OWNER_SLOT).op('SSTORE')
+        if MULTIPLE_AUTHORIZATION in guards:
+            assembler.push(2).push(storage_offset + THRESHOLD_SLOT).op('SSTORE')
+        # Copy the runtime code appended to the constructor to memory and return it
+        assembler.push(len(runtime_code), 2).op('DUP1').push(code_offset, 2).push(0).op('CODECOPY').push(0).op('RETURN')
+        return assembler
+
+    constructor_size = len(constructor(0).assemble())
+    return constructor(constructor_size).assemble() + runtime_code
+
+
+def _runtime_assembler(functions: List[SyntheticFunction], storage_offset: int) -> Assembler:
+    assembler = Assembler()
+    # Dispatcher in the shape emitted by solc, which Mythril relies on to name functions
+    assembler.push(0).op('CALLDATALOAD').push(0xE0).op('SHR')
+    for function in functions:
+        assembler.op('DUP1').push(function.selector, 4).op('EQ').push_label(function.name).op('JUMPI')
+    assembler.revert()
+    for function in functions:
+        _function(assembler, function, storage_offset)
+    if any(function.guard == ROLES for function in functions):
+        _has_role(assembler, storage_offset)
+    return assembler
+
+
+def _function(assembler: Assembler, function: SyntheticFunction, storage_offset: int) -> None:
+    name = function.name
+    assembler.label(name)
+    _loops(assembler, name, function.loops, storage_offset)
+    if function.guard is None:
+        # Compare the argument with a stored value, without restricting access
+        assembler.push(4).op('CALLDATALOAD', 'DUP1').push(storage_offset + DATA_SLOT).op('SLOAD', 'LT')
+        assembler.push_label(name + '_skip').op('JUMPI')
+        assembler.push(storage_offset + DATA_SLOT).op('SSTORE', 'STOP')
+        assembler.label(name + '_skip').op('POP', 'STOP')
+        return
+    # Reach the guard through nested internal calls, each pushing its return address
+    for level in range(function.depth):
+        assembler.push_label('{}_return{}'.format(name, level)).push_label('{}_call{}'.format(name, level)).op('JUMP')
+        assembler.label('{}_call{}'.format(name, level))
+    _guard(assembler, function, storage_offset)
+    for level in reversed(range(function.depth)):
+        assembler.op('JUMP').label('{}_return{}'.format(name, level))
+    assembler.push(4).op('CALLDATALOAD').push(storage_offset + DATA_SLOT).op('SSTORE', 'STOP')
+
+
+def _loops(assembler: Assembler, name: Text, loops: int, storage_offset: int) -> None:
+    """ Emits *loops* nested loops, each iterating as many times as given by a calldata argument. """
+    for level in range(loops):
+        assembler.push(0).label('{}_loop{}'.format(name, level))
+        assembler.op('DUP1').push(4 + 32 * level).op('CALLDATALOAD', 'GT', 'ISZERO').push_label('{}_end{}'.format(name, level)).op('JUMPI')
+    if loops > 0:
+        assembler.push(storage_offset + DATA_SLOT).op('SLOAD').push(1).op('ADD').push(storage_offset + DATA_SLOT).op('SSTORE')
+    for level in reversed(range(loops)):
+        assembler.push(1).op('ADD').push_label('{}_loop{}'.format(name, level)).op('JUMP')
+        assembler.label('{}_end{}'.format(name, level)).op('POP')
+
+
+def _guard(assembler: Assembler, function: SyntheticFunction, storage_offset: int) -> None:
+    """ Emits the guard check of *function*, reverting unless it passes. """
+    passed = function.name + '_passed'
+    if function.guard == OWNERSHIP:
+        # require(msg.sender == owner)
+        assembler.op('CALLER').push(storage_offset + OWNER_SLOT).op('SLOAD', 'EQ')
+    elif function.guard == ROLES:
+        # require(hasRole(ADMIN_ROLE, msg.sender))
+        assembler.push_label(function.name + '_has_role').push(ADMIN_ROLE, 32).op('CALLER').push_label('has_role').op('JUMP')
+        assembler.label(function.name + '_has_role')
+    elif function.guard == HASH_LOCK:
+        # require(keccak256(secret) == secretHash)
+        assembler.push(4).op('CALLDATALOAD').push(0).op('MSTORE').push(0x20).push(0).op('SHA3')
+        assembler.push(storage_offset + SECRET_HASH_SLOT).op('SLOAD', 'EQ')
+    elif function.guard == MULTIPLE_AUTHORIZATION:
+        # require(confirmations >= threshold)
+        assembler.push(storage_offset + THRESHOLD_SLOT).op('SLOAD').push(storage_offset + CONFIRMATIONS_SLOT).op('SLOAD', 'LT', 'ISZERO')
+    elif function.guard == X_CONFIRMATION:
+        # require(block.number > unlockBlock)
+        assembler.push(storage_offset + UNLOCK_BLOCK_SLOT).op('SLOAD', 'NUMBER', 'GT')
+    assembler.push_label(passed).op('JUMPI').revert().label(passed)
+
+
+def _has_role(assembler: Assembler, storage_offset: int) -> None:
+    """
+    Emits the internal function hasRole(role, account) of OpenZeppelin's AccessControl, looking up the account in
+    the members of the role: _roles[role].members._indexes[account] != 0. Expects the stack [return, role, account].
+    """
+    assembler.label('has_role')
+    assembler.op('SWAP1').push(0).op('MSTORE').push(storage_offset + ROLES_SLOT).push(0x20).op('MSTORE')
+    assembler.push(0x40).push(0).op('SHA3').push(1).op('ADD').push(0x20).op('MSTORE').push(0).op('MSTORE')
+    assembler.push(0x40).push(0).op('SHA3', 'SLOAD', 'ISZERO', 'ISZERO', 'SWAP1', 'JUMP')
@@ -0,0 +1,160 @@
+import json
+import logging
+import time
+
+from typing import Dict, List, Optional, Text
+
+from mythril.support.loader import DynLoader
+from mythril.support.support_utils import get_code_hash
+
+from ithildin.analysis.loader import StrategyLoader
+from ithildin.analysis.symbolic import LaserWrapper
+from ithildin.contract.loader_factory import get_factory, LoaderFactoryType
+from ithildin.contract.proxy import resolve_proxy
+from ithildin.contract.rpc import BatchJsonRpc, create_client
+from ithildin.tools.results_db.result_repository import normalize_value, ResultRepository
+from ithildin.tools.results_db.results_db import ResultsDB, WatchedSlot
+from ithildin.tools.results_db.watched_slot_repository import WatchedSlotRepository
+
+log = logging.getLogger(__name__)
+
+SLOT_CHANGED = 'SLOT_CHANGED'
+CODE_CHANGED = 'CODE_CHANGED'
+
+
+class Watcher:
+    """
+    Re-reads the storage slots of authorization values found by earlier analyses, e.g. owners, and reports changed
+    values without symbolic execution. Every *code_check_every* rounds, the code of the watched contracts is compared
+    against the analyzed code, and contracts whose code changed are analyzed again if *reanalyze* is set. The
+    implementation of proxies is resolved again in each of these rounds, so that upgrades count as code changes.
+    """
+
+    def __init__(self, db: ResultsDB, rpc: Optional[Text], batch_size: int, code_check_every: int = 1, reanalyze: bool = True,
+                 **execute_options) -> None:
+        assert code_check_every > 0, 'Code check interval must be positive'
+        self.rpc = rpc
+        self.client = create_client(rpc, BatchJsonRpc, batch_size=batch_size)
+        self.slot_repository = WatchedSlotRepository(db)
+        self.result_repository = ResultRepository(db)
+        self.code_check_every = code_check_every
+        self.reanalyze = reanalyze
+        self.execute_options = execute_options
+        self.laser_wrapper = LaserWrapper(StrategyLoader())
+        self.rounds = 0
+
+    def watch_round(self) -> List[Dict]:
+        """ Runs a single round of checks and returns the change events. """
+        self.slot_repository.sync()
+        slots = self.slot_repository.all()
+        events = []
+        if self.rounds % self.code_check_every == 0:
+            events.extend(self._check_code(slots))
+            slots = self.slot_repository.all()
+        events.extend(self._check_slots(slots))
+        self.slot_repository.commit()
+        self.rounds += 1
+        return events
+
+    def _check_code(self, slots: List[WatchedSlot]) -> List[Dict]:
+        code_hashes = {(slot.contract_address, slot.code_address): slot.code_hash for slot in slots}
+        code_addresses = self._resolve_implementations([contract_address for contract_address, code_address in code_hashes
+                                                        if code_address != contract_address])
+        keys = [(contract_address, code_address, code_addresses.get(contract_address, code_address))
+                for contract_address, code_address in code_hashes]
+        codes = self.client.get_code_batch([new_code_address for _, _, new_code_address in keys])
+        events = []
+        for (contract_address, code_address, new_code_address), code in zip(keys, codes):
+            if code is None:
+                log.warning('Unable to read the code at %s', new_code_address)
+                continue
+            old_hash = code_hashes[(contract_address, code_address)]
+            new_hash = get_code_hash(code) if len(code) > 2 else None
+            if new_hash == old_hash and new_code_address == code_address:
+                continue
+            details = dict(codeAddress=code_address, oldCodeHash=old_hash, newCodeHash=new_hash)
+            if new_code_address != code_address:
+                details['newCodeAddress'] = new_code_address
+            events.append(self._event(CODE_CHANGED, contract_address, **details))
+            if self.reanalyze and new_hash is not None and self._analyze(contract_address, code_address != contract_address):
+                continue
+            # Without (successful) reanalysis, the slots are kept but the change is only reported once
+            for slot in slots:
+                if slot.contract_address == contract_address:
+                    slot.code_address = new_code_address
+                    slot.code_hash = new_hash
+        return events
+
+    def _resolve_implementations(self, proxy_addresses: List[Text]) -> Dict[Text, Text]:
+        """
+        Resolves the current implementation of each proxy in *proxy_addresses*. Contracts that aren't proxies anymore
+        are mapped to themselves, proxies whose implementation couldn't be read are left out.
+        """
+        if len(proxy_addresses) == 0:
+            return {}
+        # Storage reads are cached per loader, so a new one is needed for every round
+        dyn_loader = DynLoader(self.client)
+        implementations = {}
+        for proxy_address, code in zip(proxy_addresses, self.client.get_code_batch(proxy_addresses)):
+            if code is None:
+                log.warning('Unable to read the code at %s', proxy_address)
+                continue
+            try:
+                resolved = resolve_proxy(proxy_address, code, dyn_loader)
+            except Exception as e:
+                log.warning('Unable to resolve the implementation of %s: %s', proxy_address, e)
+                continue
+            implementations[proxy_address] = resolved[1] if resolved is not None else proxy_address
+        return implementations
+
+    def _check_slots(self, slots: List[WatchedSlot]) -> List[Dict]:
+        values = self.client.get_storage_at_batch([(slot.contract_address, int(slot.slot, 16)) for slot in slots])
+        events = []
+        for slot, value in zip(slots, values):
+            if value is None:
+                log.warning('Unable to read slot %s of %s', slot.slot, slot.contract_address)
+                continue
+            if slot.value is not None and normalize_value(value) != normalize_value(slot.value):
+                events.append(self._event(SLOT_CHANGED, slot.contract_address, patternName=slot.pattern_name,
+                                          attributeName=slot.attribute_name, slot=slot.slot, oldValue=slot.value, newValue=value))
+            slot.value = value
+            slot.updated_at = time.time()
+        return events
+
+    def _analyze(self, contract_address: Text, resolve_proxies: bool) -> bool:
+        """ Analyzes the contract at *contract_address* again and watches the slots found, returns False if the analysis failed. """
+        log.info('Code of %s changed, analyzing it again', contract_address)
+        contract_loader = get_factory(LoaderFactoryType.JSON_RPC, address=contract_address, rpc=self.rpc,
+                                      resolve_proxies=resolve_proxies).create()
+        try:
+            report = self.laser_wrapper.execute(contract_loader=contract_loader, **self.execute_options)
+        except Exception as e:
+            log.error('Analysis of %s failed: %s', contract_address, e)
+            return False
+        self.result_repository.save(report)
+        self.slot_repository.sync(contract_address)
+        return True
+
+    @staticmethod
+    def _event(event_type: Text, contract_address: Text, **details) -> Dict:
+        event = {'event': event_type, 'time': time.time(), 'contractAddress': contract_address}
+        event.update(details)
+        return event
+
+
+def watch(args) -> None:
+    db = ResultsDB(args.db_path)
+    watcher = Watcher(db, args.rpc, args.batch_size, code_check_every=args.code_check_every, reanalyze=not args.no_reanalyze,
+                      timeout=args.timeout, max_depth=args.max_depth)
+    try:
+        while True:
+            start_time = time.time()
+            for event in watcher.watch_round():
+                print(json.dumps(event), flush=True)
+            if args.once:
+                break
+            time.sleep(max(0.0, args.interval - (time.time() - start_time)))
+    except KeyboardInterrupt:
+        log.info('Stopped watching after %d round(s)', watcher.rounds)
+    finally:
+        db.close()
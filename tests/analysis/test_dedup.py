@@ -0,0 +1,20 @@
+from ithildin.analysis.dedup import group_by_code, normalized_code_hash, strip_metadata
+
+CODE = '0x6080604052600080fd'
+
+
+def metadata(fill: str) -> str:
+    # CBOR map of 10 bytes followed by its length
+    return 'a1' + fill * 9 + '000a'
+
+
+def test_metadata_is_stripped():
+    assert strip_metadata(CODE + metadata('00')) == CODE[2:]
+    assert strip_metadata(CODE) == CODE[2:]
+
+
+def test_codes_differing_in_metadata_share_a_group():
+    groups = group_by_code(['a', 'b', 'c', 'd'], [CODE + metadata('00'), '0x', CODE + metadata('11'), '0x6000'])
+    assert [group.members for group in groups] == [['a', 'c'], ['b'], ['d']]
+    assert groups[1].code_hash is None
+    assert groups[0].code_hash == normalized_code_hash(CODE)
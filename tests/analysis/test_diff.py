@@ -0,0 +1,18 @@
+from ithildin.analysis.diff import DISPATCHER, function_hashes
+from ithildin.tools.synthetic import generate_contract
+
+
+def test_moved_functions_keep_their_hashes():
+    hashes = function_hashes(generate_contract(4, seed=1).runtime_code)
+    moved_hashes = function_hashes(generate_contract(4, seed=2).runtime_code)
+    assert len(hashes) == 5
+    assert {selector: hashes[selector] for selector in hashes if selector != DISPATCHER} == \
+        {selector: moved_hashes[selector] for selector in moved_hashes if selector != DISPATCHER}
+
+
+def test_changed_guards_change_only_their_functions():
+    hashes = function_hashes(generate_contract(4, guards=['OWNERSHIP'], seed=1).runtime_code)
+    changed_hashes = function_hashes(generate_contract(4, guards=['ROLES'], seed=1).runtime_code)
+    changed = {selector for selector in hashes if hashes[selector] != changed_hashes[selector]}
+    assert len(changed) == 2
+    assert DISPATCHER not in changed
@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+import pytest
+
+from mythril.disassembler.disassembly import Disassembly
+from mythril.laser.ethereum.svm import LaserEVM
+from mythril.laser.plugin.signals import PluginSkipState
+
+from ithildin.analysis.functions import dispatcher_entries, FunctionSelectorPlugin, parse_selector
+
+# PUSH1 0x00 CALLDATALOAD PUSH1 0xe0 SHR DUP1 PUSH4 0xaabbccdd EQ PUSH2 0x0012 JUMPI STOP JUMPDEST STOP
+DISPATCHER_CODE = '0x60003560e01c8063aabbccdd1461001257005b00'
+FUNCTION_ENTRY = 0x12
+
+
+class FakeState:
+
+    def __init__(self, function_name: str, transaction_depth: int = 1) -> None:
+        self.environment = SimpleNamespace(active_function_name=function_name, code=Disassembly(DISPATCHER_CODE))
+        self.transaction_stack = [None] * transaction_depth
+
+    def get_current_instruction(self):
+        return {'address': FUNCTION_ENTRY, 'opcode': 'JUMPDEST'}
+
+
+def create_hook(selectors):
+    laser = LaserEVM(requires_statespace=False)
+    plugin = FunctionSelectorPlugin(selectors)
+    plugin.initialize(laser)
+    return plugin, laser.post_hooks['JUMPI'][-1]
+
+
+def test_dispatcher_entries():
+    assert dispatcher_entries(Disassembly(DISPATCHER_CODE).instruction_list) == {FUNCTION_ENTRY: '0xaabbccdd'}
+
+
+def test_parse_selector():
+    assert parse_selector('0xAABBCCDD') == '0xaabbccdd'
+    assert parse_selector('transfer(address, uint256)') == '0xa9059cbb'
+    with pytest.raises(ValueError):
+        parse_selector('transfer')
+
+
+def test_unselected_function_is_skipped():
+    plugin, jumpi_hook = create_hook(['0x11111111'])
+    with pytest.raises(PluginSkipState):
+        jumpi_hook(FakeState('fallback'))
+    assert plugin.skipped_states == 1
+
+
+def test_selected_function_is_kept():
+    _, jumpi_hook = create_hook(['0xaabbccdd'])
+    jumpi_hook(FakeState('fallback'))
+
+
+def test_nested_call_into_dispatcher_is_kept():
+    plugin, jumpi_hook = create_hook(['0x11111111'])
+    jumpi_hook(FakeState('fallback', transaction_depth=2))
+    assert plugin.skipped_states == 0
+
+
+def test_comparison_in_function_body_is_kept():
+    plugin, jumpi_hook = create_hook(['0x11111111'])
+    jumpi_hook(FakeState('_function_0xaabbccdd'))
+    assert plugin.skipped_states == 0
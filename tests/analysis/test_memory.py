@@ -0,0 +1,22 @@
+import resource
+
+from ithildin.analysis.memory import current_rss, MemorySamplingPlugin
+
+
+def test_peak_rss_excludes_earlier_peaks():
+    # Raise the lifetime peak of the process well above its current RSS
+    buffer = bytearray(256 * 1024 * 1024)
+    buffer[::4096] = b'\x01' * len(buffer[::4096])
+    del buffer
+    lifetime_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    usage = MemorySamplingPlugin([]).get_memory_usage()
+    assert usage.peak_rss is not None
+    assert usage.peak_rss <= lifetime_peak - 128 * 1024 * 1024
+
+
+def test_peak_rss_is_highest_sample():
+    plugin = MemorySamplingPlugin([])
+    plugin.usage.peak_rss = 2 * current_rss()
+    assert plugin.get_memory_usage().peak_rss == plugin.usage.peak_rss
+    plugin.reset()
+    assert plugin.usage.peak_rss is None
@@ -0,0 +1,49 @@
+import pytest
+
+from mythril.laser.ethereum.svm import LaserEVM
+from mythril.laser.plugin.signals import PluginSkipState
+
+from ithildin.analysis.prologue import PrologueAnnotation, PrologueBound, PrologueBoundPlugin
+
+
+class FakeState:
+
+    def __init__(self, opcode: str) -> None:
+        self.opcode = opcode
+        self.annotations = [PrologueAnnotation()]
+
+    def get_annotations(self, annotation_type):
+        return [annotation for annotation in self.annotations if isinstance(annotation, annotation_type)]
+
+    def get_current_instruction(self):
+        return {'address': 0, 'opcode': self.opcode}
+
+
+def create_plugin(bound=None):
+    laser = LaserEVM(requires_statespace=False)
+    plugin = PrologueBoundPlugin()
+    plugin.initialize(laser)
+    plugin.reset(bound)
+    return plugin, laser
+
+
+def test_unbounded_session_has_no_hooks():
+    _, laser = create_plugin(PrologueBound())
+    assert sum(len(hooks) for hooks in laser.pre_hooks.values()) == 0
+    assert len(laser.post_hooks['JUMPI']) == 0
+
+
+def test_hooks_are_registered_once():
+    plugin, laser = create_plugin(PrologueBound(jumpis=1))
+    plugin.reset(PrologueBound(instructions=2))
+    assert len(laser.pre_hooks['JUMPI']) == 1
+    assert len(laser.post_hooks['JUMPI']) == 1
+
+
+def test_instructions_missing_from_opcode_table_are_counted():
+    plugin, laser = create_plugin(PrologueBound(instructions=1))
+    state = FakeState('INVALID')
+    laser.pre_hooks['PUSH1'][0](state)
+    with pytest.raises(PluginSkipState):
+        laser.pre_hooks['INVALID'][0](state)
+    assert plugin.dropped_states == 1
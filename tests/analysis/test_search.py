@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+
+from ithildin.analysis.search import GuardDepthAnnotation, GuardFirstSearchStrategy
+
+from mythril.laser.ethereum.svm import LaserEVM
+
+
+class FakeState:
+
+    def __init__(self, function_name: str, depth: int = 0) -> None:
+        code = SimpleNamespace(function_name_to_address={'setOwner(address)': 10, 'transfer(address,uint256)': 20})
+        self.environment = SimpleNamespace(active_function_name=function_name, code=code)
+        self.mstate = SimpleNamespace(depth=depth)
+        self.annotations = []
+
+    def annotate(self, annotation) -> None:
+        self.annotations.append(annotation)
+
+    def get_annotations(self, annotation_type):
+        return filter(lambda annotation: isinstance(annotation, annotation_type), self.annotations)
+
+
+def create_strategy():
+    laser = LaserEVM(requires_statespace=False)
+    strategy = GuardFirstSearchStrategy(laser.work_list, 128)
+    strategy.initialize(laser)
+    return strategy, laser.pre_hooks['JUMPI'][-1]
+
+
+def test_only_jumpis_count_towards_guard_depth():
+    strategy, jumpi_hook = create_strategy()
+    # Internal calls such as _checkOwner() and _msgSender() jump unconditionally and increase the depth
+    state = FakeState('setOwner(address)', depth=40)
+    for _ in range(GuardFirstSearchStrategy.guard_depth):
+        jumpi_hook(state)
+    assert strategy._priority(state) is not None
+    jumpi_hook(state)
+    assert strategy._priority(state) is None
+
+
+def test_jumpi_count_restarts_in_new_function():
+    strategy, jumpi_hook = create_strategy()
+    state = FakeState('setOwner(address)')
+    for _ in range(5):
+        jumpi_hook(state)
+    state.environment.active_function_name = 'transfer(address,uint256)'
+    assert strategy._priority(state) is not None
+    jumpi_hook(state)
+    annotation = next(state.get_annotations(GuardDepthAnnotation))
+    assert (annotation.function_name, annotation.jumpi_count) == ('transfer(address,uint256)', 1)
+
+
+def test_dispatcher_jumpis_are_not_counted():
+    _, jumpi_hook = create_strategy()
+    state = FakeState('fallback')
+    jumpi_hook(state)
+    assert list(state.get_annotations(GuardDepthAnnotation)) == []
+
+
+def test_states_are_explored_dispatcher_first_then_guards_then_depth_first():
+    strategy, jumpi_hook = create_strategy()
+    deep_states = [FakeState('transfer(address,uint256)', depth) for depth in (5, 6)]
+    for state in deep_states:
+        for _ in range(GuardFirstSearchStrategy.guard_depth + 1):
+            jumpi_hook(state)
+    guard_state = FakeState('setOwner(address)', 3)
+    dispatcher_states = [FakeState('fallback', 2), FakeState('fallback', 1)]
+    strategy.work_list.extend(deep_states + [guard_state] + dispatcher_states)
+
+    order = [strategy.get_strategic_global_state() for _ in range(5)]
+
+    assert order == [dispatcher_states[1], dispatcher_states[0], guard_state, deep_states[1], deep_states[0]]
+    assert strategy.work_list == []
+    assert strategy.pending_states() == 0
+
+
+def test_least_explored_function_is_preferred():
+    strategy, _ = create_strategy()
+    strategy.function_visits['setOwner(address)'] = 3
+    busy_state, idle_state = FakeState('setOwner(address)'), FakeState('transfer(address,uint256)')
+    strategy.work_list.extend([busy_state, idle_state])
+    assert strategy.get_strategic_global_state() is idle_state
+
+
+def test_linear_successor_is_executed_right_away():
+    strategy, jumpi_hook = create_strategy()
+    owner_state, transfer_state = FakeState('setOwner(address)'), FakeState('transfer(address,uint256)')
+    strategy.work_list.extend([owner_state, transfer_state])
+    assert strategy.get_strategic_global_state() is owner_state
+    # The next instruction of the same path, although the other function has been explored less
+    successor = FakeState('setOwner(address)')
+    strategy.work_list.append(successor)
+    assert strategy.get_strategic_global_state() is successor
+    # Once the path branched, the least explored function is preferred again
+    jumpi_hook(successor)
+    strategy.work_list.append(successor)
+    assert strategy.get_strategic_global_state() is transfer_state
+
+
+def test_reset_drops_queued_states():
+    strategy, jumpi_hook = create_strategy()
+    state = FakeState('setOwner(address)')
+    for _ in range(GuardFirstSearchStrategy.guard_depth + 1):
+        jumpi_hook(state)
+    strategy.work_list.extend([state, FakeState('fallback')])
+    strategy.get_strategic_global_state()
+    assert strategy.pending_states() == 1
+    strategy.reset()
+    assert strategy.pending_states() == 0
+    assert strategy.drop_oldest(1) == 0
@@ -0,0 +1,56 @@
+from mythril.disassembler.disassembly import Disassembly
+
+from ithildin.analysis.loader import create_strategies, StrategyLoader
+from ithildin.analysis.static import StaticOwnershipAnalysis
+from ithildin.analysis.symbolic import LaserWrapper
+
+# CALLER PUSH1 0x00 SLOAD EQ PUSH1 0x09 JUMPI STOP JUMPDEST STOP
+GUARDED_CODE = '0x3360005414600957005b00'
+# Same as GUARDED_CODE, but the caller is stored in memory and loaded again before the comparison
+MEMORY_GUARDED_CODE = '0x3360005260005160005414600f57005b00'
+# CALLVALUE PUSH1 0x00 MSTORE PUSH1 0x00 MLOAD POP STOP
+UNTAGGED_MEMORY_CODE = '0x34600052600051500000'
+
+
+def analyze(code):
+    return StaticOwnershipAnalysis(Disassembly(code)).analyze()
+
+
+def test_guarded_function():
+    result = analyze(GUARDED_CODE)
+    assert result.conclusive
+    assert result.guarded_functions == {'fallback': 0}
+
+
+def test_tagged_memory_load_is_inconclusive():
+    result = analyze(MEMORY_GUARDED_CODE)
+    assert not result.conclusive
+    assert 'memory' in result.reason
+
+
+def test_untagged_memory_load_is_conclusive():
+    assert analyze(UNTAGGED_MEMORY_CODE).conclusive
+
+
+def test_unknown_opcode_is_inconclusive():
+    # PUSH0 STOP, unknown to Mythril
+    assert not analyze('0x5f00').conclusive
+
+
+def test_extcodehash_is_inconclusive():
+    # ADDRESS EXTCODEHASH STOP
+    result = analyze('0x303f00')
+    assert not result.conclusive
+    assert 'EXTCODEHASH' in result.reason
+
+
+def test_assert_fail_halts():
+    assert analyze('0xfe').conclusive
+
+
+def test_static_results_are_reset_per_contract():
+    laser_wrapper = LaserWrapper(StrategyLoader(create_strategies(['OWNERSHIP'])))
+    static_strategies = laser_wrapper._analyze_statically(None, GUARDED_CODE, None)
+    assert [len(strategy.results) for strategy in static_strategies] == [1]
+    static_strategies = laser_wrapper._analyze_statically(None, '0x00', None)
+    assert [len(strategy.results) for strategy in static_strategies] == [0]
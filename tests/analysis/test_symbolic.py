@@ -0,0 +1,67 @@
+from mythril.disassembler.disassembly import Disassembly
+
+from ithildin.analysis.symbolic import LaserWrapper
+from ithildin.contract.loader import JsonRpcLoader
+from ithildin.contract.proxy import ProxyType
+from ithildin.report.analysis import Report
+
+IMPLEMENTATION = '0x' + '33' * 20
+# PUSH1 0x00 CALLDATALOAD PUSH1 0xe0 SHR DUP1 PUSH4 0xaabbccdd EQ PUSH2 0x0012 JUMPI STOP JUMPDEST STOP
+IMPLEMENTATION_CODE = '0x60003560e01c8063aabbccdd1461001257005b00'
+MINIMAL_PROXY_CODE = '0x363d3d373d3d3d363d73' + IMPLEMENTATION[2:] + '5af43d82803e903d91602b57fd5bf3'
+
+
+class FakeDynLoader:
+
+    def dynld(self, address):
+        return Disassembly(MINIMAL_PROXY_CODE)
+
+    def read_storage(self, contract_address, index):
+        return '0x' + '00' * 32
+
+
+def proxy_loader(address: str) -> JsonRpcLoader:
+    loader = JsonRpcLoader.__new__(JsonRpcLoader)
+    loader._dyn_loader = FakeDynLoader()
+    loader._address = address
+    loader._resolve_proxies = True
+    loader._proxy = (ProxyType.MINIMAL, IMPLEMENTATION, IMPLEMENTATION_CODE)
+    loader._proxy_resolved = True
+    return loader
+
+
+def create_wrapper(timed_out: bool = False):
+    wrapper = LaserWrapper()
+    executions = []
+
+    def execute(*args, **kwargs):
+        executions.append(args)
+        report = Report()
+        report.timed_out = timed_out
+        return report
+
+    wrapper._execute = execute
+    return wrapper, executions
+
+
+def test_implementation_report_is_reused_with_the_same_options():
+    wrapper, executions = create_wrapper()
+    wrapper.execute(contract_loader=proxy_loader('0x' + '11' * 20), timeout=10)
+    report = wrapper.execute(contract_loader=proxy_loader('0x' + '22' * 20), timeout=10)
+    assert len(executions) == 1
+    assert report.contract_address == '0x' + '22' * 20
+
+
+def test_implementation_report_is_not_reused_with_other_options():
+    wrapper, executions = create_wrapper()
+    wrapper.execute(contract_loader=proxy_loader('0x' + '11' * 20), timeout=10)
+    wrapper.execute(contract_loader=proxy_loader('0x' + '22' * 20), timeout=20)
+    wrapper.execute(contract_loader=proxy_loader('0x' + '22' * 20), timeout=10, static_fast_path=True)
+    assert len(executions) == 3
+
+
+def test_timed_out_implementation_report_is_not_reused():
+    wrapper, executions = create_wrapper(timed_out=True)
+    wrapper.execute(contract_loader=proxy_loader('0x' + '11' * 20), timeout=10)
+    wrapper.execute(contract_loader=proxy_loader('0x' + '22' * 20), timeout=10)
+    assert len(executions) == 2
@@ -0,0 +1,71 @@
+import os
+import stat
+import sys
+import textwrap
+
+from ithildin.contract.batch import SolidityBatchLoader
+
+# Compiles every contract to fixed bytecode, and fails the whole invocation if any source is named Broken.sol
+FAKE_SOLC = textwrap.dedent('''\
+    #!{executable}
+    import json
+    import sys
+
+    if '--version' in sys.argv:
+        print('solc, the solidity compiler commandline interface')
+        print('Version: 0.7.6+commit.7338295f.Linux.g++')
+        sys.exit(0)
+    sources = json.load(sys.stdin)['sources']
+    with open({log_path!r}, 'a') as log_file:
+        log_file.write(json.dumps(sorted(sources)) + '\\n')
+    if any(path.endswith('Broken.sol') for path in sources):
+        print(json.dumps({{'errors': [{{'severity': 'error', 'message': 'ParserError'}}]}}))
+    else:
+        evm = {{'bytecode': {{'object': '6080'}}, 'deployedBytecode': {{'object': '6080'}}}}
+        print(json.dumps({{'contracts': {{path: {{'C': {{'evm': evm}}}} for path in sources}}}}))
+''')
+
+
+def create_solc(tmp_path):
+    log_path = str(tmp_path / 'invocations.log')
+    solc_path = tmp_path / 'solc'
+    solc_path.write_text(FAKE_SOLC.format(executable=sys.executable, log_path=log_path))
+    solc_path.chmod(solc_path.stat().st_mode | stat.S_IEXEC)
+    return str(solc_path), log_path
+
+
+def write_sources(tmp_path, sources):
+    source_dir = tmp_path / 'contracts'
+    source_dir.mkdir()
+    for name, pragma in sources.items():
+        (source_dir / name).write_text('pragma solidity {};\ncontract C {{}}\n'.format(pragma))
+    return str(source_dir)
+
+
+def test_group_is_compiled_in_one_invocation(tmp_path):
+    solc_path, log_path = create_solc(tmp_path)
+    source_dir = write_sources(tmp_path, {'A.sol': '^0.7.0', 'B.sol': '>=0.6.0 <0.8.0'})
+
+    contracts = SolidityBatchLoader([source_dir], [solc_path]).contracts()
+
+    assert sorted(os.path.basename(contract.source_path) for contract in contracts) == ['A.sol', 'B.sol']
+    with open(log_path) as log_file:
+        assert len(log_file.readlines()) == 1
+
+
+def test_broken_file_does_not_drop_its_group(tmp_path):
+    solc_path, _ = create_solc(tmp_path)
+    source_dir = write_sources(tmp_path, {'A.sol': '^0.7.0', 'Broken.sol': '^0.7.0', 'C.sol': '^0.7.0'})
+
+    contracts = SolidityBatchLoader([source_dir], [solc_path]).contracts()
+
+    assert sorted(os.path.basename(contract.source_path) for contract in contracts) == ['A.sol', 'C.sol']
+
+
+def test_files_without_matching_compiler_are_skipped(tmp_path):
+    solc_path, _ = create_solc(tmp_path)
+    source_dir = write_sources(tmp_path, {'A.sol': '^0.7.0', 'Old.sol': '^0.4.24', 'Odd.sol': '>=0.5.0 >=0.6.0 <0.8.0'})
+
+    contracts = SolidityBatchLoader([source_dir], [solc_path]).contracts()
+
+    assert [os.path.basename(contract.source_path) for contract in contracts] == ['A.sol']
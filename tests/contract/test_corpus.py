@@ -0,0 +1,33 @@
+import pytest
+
+from ithildin.contract.corpus import Corpus, CorpusWriter
+from ithildin.support.compiler_version import Version
+
+ADDRESS_A = '0x' + 'aa' * 20
+ADDRESS_B = '0x' + 'bb' * 20
+
+
+def test_corpus_round_trip(tmp_path):
+    path = str(tmp_path / 'contracts.corpus')
+    with CorpusWriter(path) as writer:
+        writer.add(b'\x60\x00', address=ADDRESS_B, compiler_version=Version(0, 5, 17))
+        writer.add(b'\x60\x01', creation=True)
+        writer.add(b'\x60\x00', address=ADDRESS_A)
+    with Corpus(path) as corpus:
+        entries = list(corpus)
+        assert len(corpus) == 3
+        assert corpus.code_count == 2
+        assert entries[0].code_id == entries[2].code_id
+        assert bytes(corpus.code(entries[1].code_id)) == b'\x60\x01'
+        assert entries[0].compiler_version.minor == 5 and entries[2].compiler_version is None
+        assert entries[1].address is None and entries[1].creation
+        assert corpus.find(ADDRESS_A) == 2
+        assert corpus.find(ADDRESS_B) == 0
+        assert corpus.find('0x' + 'cc' * 20) is None
+
+
+def test_unknown_file_is_rejected(tmp_path):
+    path = tmp_path / 'contracts.csv'
+    path.write_bytes(b'address,code\n')
+    with pytest.raises(ValueError):
+        Corpus(str(path))
@@ -0,0 +1,95 @@
+import asyncio
+
+from ithildin.contract.proxy import (
+    BEACON_IMPLEMENTATION_SELECTOR,
+    EIP1967_BEACON_SLOT,
+    EIP1967_IMPLEMENTATION_SLOT,
+    ProxyType,
+    resolve_proxy,
+    resolve_proxy_async
+)
+
+PROXY = '0x' + '11' * 20
+BEACON = '0x' + '22' * 20
+IMPLEMENTATION = '0x' + '33' * 20
+IMPLEMENTATION_CODE = '0x6080604052'
+
+
+def word(address: str) -> str:
+    return '0x' + address[2:].rjust(64, '0')
+
+
+class FakeClient:
+
+    def __init__(self, codes, calls) -> None:
+        self.codes = codes
+        self.calls = calls
+
+    def eth_getCode(self, address):
+        return self.codes.get(address, '0x')
+
+    def eth_call(self, transaction, block='latest'):
+        return self.calls.get((transaction['to'], transaction['data']))
+
+
+class FakeDynLoader:
+
+    def __init__(self, storage, codes=None, calls=None) -> None:
+        self.storage = storage
+        self.eth = FakeClient(codes or {}, calls or {})
+
+    def read_storage(self, contract_address, index):
+        return self.storage.get((contract_address, index), '0x' + '00' * 32)
+
+
+class FakeAsyncClient:
+
+    def __init__(self, dyn_loader: FakeDynLoader) -> None:
+        self.dyn_loader = dyn_loader
+
+    async def eth_getStorageAt(self, address, position):
+        return self.dyn_loader.read_storage(address, position)
+
+    async def eth_getCode(self, address):
+        return self.dyn_loader.eth.eth_getCode(address)
+
+    async def eth_call(self, transaction):
+        return self.dyn_loader.eth.eth_call(transaction)
+
+
+def test_minimal_proxy():
+    code = '0x363d3d373d3d3d363d73' + IMPLEMENTATION[2:] + '5af43d82803e903d91602b57fd5bf3'
+    dyn_loader = FakeDynLoader({}, codes={IMPLEMENTATION: IMPLEMENTATION_CODE})
+    assert resolve_proxy(PROXY, code, dyn_loader) == (ProxyType.MINIMAL, IMPLEMENTATION, IMPLEMENTATION_CODE)
+
+
+def test_eip1967_proxy():
+    code = '0x7f{:064x}54'.format(EIP1967_IMPLEMENTATION_SLOT)
+    dyn_loader = FakeDynLoader({(PROXY, EIP1967_IMPLEMENTATION_SLOT): word(IMPLEMENTATION)},
+                               codes={IMPLEMENTATION: IMPLEMENTATION_CODE})
+    assert resolve_proxy(PROXY, code, dyn_loader) == (ProxyType.EIP1967, IMPLEMENTATION, IMPLEMENTATION_CODE)
+
+
+def test_beacon_proxy_is_resolved_with_eth_call():
+    code = '0x7f{:064x}54'.format(EIP1967_BEACON_SLOT)
+    dyn_loader = FakeDynLoader({(PROXY, EIP1967_BEACON_SLOT): word(BEACON)},
+                               codes={IMPLEMENTATION: IMPLEMENTATION_CODE},
+                               calls={(BEACON, BEACON_IMPLEMENTATION_SELECTOR): word(IMPLEMENTATION)})
+    assert resolve_proxy(PROXY, code, dyn_loader) == (ProxyType.BEACON, IMPLEMENTATION, IMPLEMENTATION_CODE)
+
+
+def test_unset_implementation_slot_is_no_proxy():
+    code = '0x7f{:064x}54'.format(EIP1967_IMPLEMENTATION_SLOT)
+    assert resolve_proxy(PROXY, code, FakeDynLoader({})) is None
+
+
+def test_async_resolution_follows_proxy_chains():
+    proxy_code = '0x7f{:064x}54'.format(EIP1967_BEACON_SLOT)
+    minimal_proxy_code = '0x363d3d373d3d3d363d73' + IMPLEMENTATION[2:] + '5af43d82803e903d91602b57fd5bf3'
+    middle = '0x' + '44' * 20
+    dyn_loader = FakeDynLoader({(PROXY, EIP1967_BEACON_SLOT): word(BEACON)},
+                               codes={middle: minimal_proxy_code, IMPLEMENTATION: IMPLEMENTATION_CODE},
+                               calls={(BEACON, BEACON_IMPLEMENTATION_SELECTOR): word(middle)})
+    expected = (ProxyType.BEACON, IMPLEMENTATION, IMPLEMENTATION_CODE)
+    assert asyncio.run(resolve_proxy_async(PROXY, proxy_code, FakeAsyncClient(dyn_loader))) == expected
+    assert resolve_proxy(PROXY, proxy_code, dyn_loader) == expected
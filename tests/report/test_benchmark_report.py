@@ -0,0 +1,14 @@
+from ithildin.report.benchmark import Report, Result
+
+
+def test_skipped_results_are_counted_and_rendered():
+    report = Report('Ownership', 1, 60, 128, 0.5, adaptive_budget=True)
+    report.add_result(Result(['0x8da5cb5b'], '0x' + '11' * 20, 0, ['owner()'],
+                             budget={'executionTimeout': 12.0, 'maxDepth': 64, 'adaptive': True}, execution_time=3.5))
+    report.add_result(Result(['0x8da5cb5b'], '0x' + '22' * 20, 1, [],
+                             budget={'executionTimeout': 0, 'maxDepth': 64, 'adaptive': True, 'deadlineExceeded': True}))
+    assert [result.skipped for result in report.results] == [False, True]
+    assert report.skipped == 1
+    markdown = report.to_markdown()
+    assert '- Skipped After Deadline: 1' in markdown
+    assert '| 0x{} | 2 | n/a | skipped |'.format('22' * 20) in markdown
@@ -0,0 +1,31 @@
+from ithildin.report.analysis import Report, ReportItem, Result
+
+
+def report_with(pattern_name, *function_names):
+    report = Report()
+    report_item = ReportItem(pattern_name, 'description', pattern_name)
+    for function_name in function_names:
+        report_item.add_result(Result(function_name, _index_owner=0))
+    report.add_report(report_item)
+    return report
+
+
+def test_merge_results_adds_functions_of_other_report():
+    report = report_with('Ownership', 'mint(address,uint256)')
+    report.merge_results(report_with('Ownership', 'upgradeTo(address)', 'mint(address,uint256)'))
+    assert [result.function_name for result in report.reports[0].results] == ['mint(address,uint256)', 'upgradeTo(address)']
+
+
+def test_merge_results_adds_missing_patterns():
+    report = report_with('Ownership', 'mint(address,uint256)')
+    report.merge_results(report_with('Roles', 'changeAdmin(address)'))
+    assert [item.pattern_name for item in report.reports] == ['Ownership', 'Roles']
+
+
+def test_report_round_trip():
+    report = report_with('Ownership', 'upgradeTo(address)')
+    report.contract_address = '0x' + '11' * 20
+    report.implementation_address = '0x' + '22' * 20
+    report.proxy_type = 'EIP-1967'
+    report.proxy_functions = ['0x3659cfe6']
+    assert Report.from_dict(report.to_dict()).to_dict() == report.to_dict()
@@ -0,0 +1,46 @@
+import pytest
+
+from ithildin.support.compiler_version import Version, VersionMatcher
+
+
+def matching_versions(matcher, versions=('0.4.24', '0.5.0', '0.5.17', '0.6.12', '0.7.6', '0.8.4')):
+    return [version for version in versions if matcher.matches(Version(raw=version))]
+
+
+@pytest.mark.parametrize('pragma, expected', [
+    ('pragma solidity 0.5.17;', ['0.5.17']),
+    ('pragma solidity ^0.5.0;', ['0.5.0', '0.5.17']),
+    ('pragma solidity ~0.6.0;', ['0.6.12']),
+    ('pragma solidity >=0.5.0 <0.7.0;', ['0.5.0', '0.5.17', '0.6.12']),
+    ('pragma solidity <0.7.0 >=0.5.0;', ['0.5.0', '0.5.17', '0.6.12']),
+    ('pragma solidity >0.6.12;', ['0.7.6', '0.8.4']),
+])
+def test_pragma_ranges(pragma, expected):
+    assert matching_versions(VersionMatcher.from_pragma(pragma)) == expected
+
+
+@pytest.mark.parametrize('pragma, expected', [
+    ('pragma solidity <0.5.0;', ['0.4.24']),
+    ('pragma solidity <=0.5.0;', ['0.4.24', '0.5.0']),
+])
+def test_upper_bound_only_pragma_has_lower_bound(pragma, expected):
+    assert matching_versions(VersionMatcher.from_pragma(pragma)) == expected
+
+
+def test_pragma_alternatives():
+    matcher = VersionMatcher.from_pragma('pragma solidity ^0.4.24 || >=0.7.0 <0.8.0;')
+    assert matching_versions(matcher) == ['0.4.24', '0.7.6']
+
+
+def test_missing_pragma_matches_any_compiler():
+    assert VersionMatcher.from_pragma('contract C {}') is None
+
+
+def test_unsupported_pragma_is_rejected():
+    with pytest.raises(ValueError):
+        VersionMatcher.from_pragma('pragma solidity >=0.5.0 >=0.6.0 <0.8.0;')
+
+
+def test_matcher_pattern_with_alternatives():
+    matcher = VersionMatcher('^0.5.0 || ==0.8.4')
+    assert matching_versions(matcher) == ['0.5.0', '0.5.17', '0.8.4']
@@ -0,0 +1,33 @@
+from ithildin.tools.benchmark import _throughput, compare_runs
+from ithildin.tools.history_db.history_db import BenchmarkContract, BenchmarkRun
+
+
+def create_run(*contracts, precision=0.9, recall=0.8):
+    run = BenchmarkRun(id=1, program_version='0.0.0', strategy_name='Ownership', exec_timeout=60, max_depth=128,
+                       adaptive_budget=False, precision=precision, recall=recall)
+    run.contracts = [BenchmarkContract(contract_address=address, contract_index=index, execution_time=execution_time,
+                                       states_explored=states_explored, timeout_hit=timeout_hit)
+                     for index, (address, execution_time, states_explored, timeout_hit) in enumerate(contracts)]
+    return run
+
+
+def test_throughput_leaves_out_reused_analyses():
+    run = create_run(('0x1', 10.0, 1000, False), ('0x2', 30.0, 2000, True), ('0x3', 0.01, 0, False), ('0x4', None, None, False))
+    assert _throughput(run.contracts) == (20.0, 75.0, 0.5)
+
+
+def test_throughput_is_compared_on_common_contracts():
+    baseline = create_run(('0x1', 10.0, 1000, False), ('0x2', 100.0, 1000, True))
+    current = create_run(('0x1', 20.0, 1000, False), ('0x3', 1.0, 1000, False))
+    report = compare_runs(baseline, current)
+    comparisons = {comparison.metric: comparison for comparison in report.comparisons}
+    assert comparisons['Mean Execution Time (sec)'].baseline == 10.0
+    assert comparisons['Mean Execution Time (sec)'].regressed
+    assert not comparisons['Precision'].regressed
+
+
+def test_throughput_is_not_compared_without_common_contracts():
+    report = compare_runs(create_run(('0x1', 10.0, 1000, False)), create_run(('0x2', 20.0, 1000, False), recall=0.5))
+    assert [comparison.metric for comparison in report.comparisons] == ['Precision', 'Recall']
+    assert report.comparisons[1].regressed
+    assert any('no contracts in common' in warning for warning in report.warnings)
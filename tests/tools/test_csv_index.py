@@ -0,0 +1,35 @@
+from ithildin.support.compiler_version import VersionMatcher
+from ithildin.tools.csv_index import CsvIndex
+
+ROWS = [
+    ['address', 'compiler', 'version'],
+    ['0x01', 'Solidity', 'v0.5.17+commit.d19bba13'],
+    ['0x02', 'Vyper', '0.5.1'],
+    ['0x03', 'Solidity', 'v0.6.12+commit.27d51765'],
+    ['0x04', 'Solidity', 'v0.5.0+commit.1d4f565a'],
+    ['0x05', 'Solidity', 'unknown']
+]
+
+
+def write_csv(tmp_path):
+    csv_path = tmp_path / 'contracts.csv'
+    csv_path.write_text(''.join(','.join(row) + '\n' for row in ROWS), encoding='utf-8')
+    return str(csv_path)
+
+
+def test_rows_are_grouped_by_compiler_version(tmp_path):
+    csv_path = write_csv(tmp_path)
+    index = CsvIndex.build(csv_path, compiler_name_column=1, compiler_version_column=2)
+    groups = index.matching_groups(VersionMatcher.from_pragma('pragma solidity ^0.5.0;'))
+    assert sorted(index.rows[group.start + offset] for group in groups for offset in range(group.count)) == [1, 4]
+    assert index.sample(2, VersionMatcher.from_pragma('pragma solidity ^0.5.0;')) == {1, 4}
+
+
+def test_saved_index_reads_the_same_rows(tmp_path):
+    csv_path = write_csv(tmp_path)
+    index_path = str(tmp_path / 'contracts.idx')
+    CsvIndex.build(csv_path, compiler_name_column=1, compiler_version_column=2).save(index_path)
+    index = CsvIndex.load(index_path)
+    assert index.row_count == len(ROWS)
+    assert list(index.read_rows(csv_path, [5, 2])) == [(5, ROWS[5]), (2, ROWS[2])]
+    assert index.sample(len(ROWS) - 1) == set(range(1, len(ROWS)))
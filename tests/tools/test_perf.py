@@ -0,0 +1,16 @@
+from ithildin.report.perf import Measurement
+from ithildin.tools.perf import compare
+
+
+def test_timed_out_fixture_is_an_outcome_mismatch():
+    baseline = Measurement('large_mixed', [50.0, 51.0], 3000, 3400, 1 << 27, 5)
+    measurement = Measurement('large_mixed', [300.5], 20000, 21000, 1 << 28, 9, 'TIMEOUT')
+    comparisons = compare(measurement, baseline)
+    assert [(comparison.metric, comparison.regressed) for comparison in comparisons] == [('Outcome', True)]
+
+
+def test_completed_fixture_compares_metrics():
+    baseline = Measurement('large_mixed', [50.0, 51.0], 3000, 3400, 1 << 27, 5)
+    comparisons = compare(Measurement('large_mixed', [50.5], 3000, 3400, 1 << 27, 5), baseline)
+    assert len(comparisons) == 5
+    assert not any(comparison.regressed for comparison in comparisons)
@@ -0,0 +1,32 @@
+from sqlalchemy import event
+
+from ithildin.report.analysis import Report, ReportItem, Result
+from ithildin.tools.query import hit_to_dict
+from ithildin.tools.results_db.result_repository import ResultRepository
+from ithildin.tools.results_db.results_db import ResultsDB
+
+OWNER = '0x' + 'aa' * 20
+
+
+def create_report(index: int) -> Report:
+    report = Report(start_time=float(index), end_time=float(index))
+    report.contract_address = '0x' + '{:040x}'.format(index)
+    report_item = ReportItem('Ownership', 'Owner checks', 'OWNERSHIP')
+    report_item.add_result(Result('transferOwnership(address)', **{'Owner': OWNER, 'Owner Storage Index': 0}))
+    report.add_report(report_item)
+    return report
+
+
+def test_query_loads_hits_with_a_fixed_number_of_statements(tmp_path):
+    db = ResultsDB(str(tmp_path / 'results.db'))
+    repository = ResultRepository(db)
+    repository.save_all([create_report(index) for index in range(1, 11)])
+    db.session.expunge_all()
+    statements = []
+    event.listen(db._engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    hits = [hit_to_dict(hit) for hit in repository.query(value=OWNER)]
+    db.close()
+    assert len(hits) == 10
+    assert hits[0]['contractAddress'] == '0x' + '{:040x}'.format(10)
+    assert hits[0]['attributes']['Owner'] == OWNER
+    assert len(statements) == 2
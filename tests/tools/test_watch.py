@@ -0,0 +1,72 @@
+from mythril.support.support_utils import get_code_hash
+
+from ithildin.contract.proxy import EIP1967_IMPLEMENTATION_SLOT
+from ithildin.report.analysis import Report, ReportItem, Result
+from ithildin.tools.results_db.result_repository import ResultRepository
+from ithildin.tools.results_db.results_db import ResultsDB
+from ithildin.tools.watch import CODE_CHANGED, Watcher
+
+PROXY = '0x' + '11' * 20
+IMPLEMENTATION = '0x' + '22' * 20
+UPGRADED_IMPLEMENTATION = '0x' + '33' * 20
+OWNER = '0x' + '00' * 12 + '44' * 20
+PROXY_CODE = '0x7f{:064x}54'.format(EIP1967_IMPLEMENTATION_SLOT)
+IMPLEMENTATION_CODE = '0x6080604052'
+
+
+def word(address):
+    return '0x' + address[2:].rjust(64, '0')
+
+
+class FakeClient:
+
+    def __init__(self, codes, storage) -> None:
+        self.codes = codes
+        self.storage = storage
+
+    def get_code_batch(self, addresses):
+        return [self.eth_getCode(address) for address in addresses]
+
+    def get_storage_at_batch(self, slots):
+        return [self.eth_getStorageAt(address, slot) for address, slot in slots]
+
+    def eth_getCode(self, address, default_block='latest'):
+        return self.codes.get(address, '0x')
+
+    def eth_getStorageAt(self, address, position=0, block='latest'):
+        return self.storage.get((address, position), word('0x00'))
+
+
+def watcher_of_proxy(tmp_path, client):
+    db = ResultsDB(str(tmp_path / 'results.db'))
+    report = Report()
+    report.contract_address = PROXY
+    report.implementation_address = IMPLEMENTATION
+    report.code_hash = get_code_hash(IMPLEMENTATION_CODE)
+    report_item = ReportItem('Ownership', 'description', 'OWNERSHIP')
+    report_item.add_result(Result('transferOwnership(address)', **{'Owner Storage Index': '0', 'Owner': OWNER}))
+    report.add_report(report_item)
+    ResultRepository(db).save(report)
+    watcher = Watcher(db, None, 10, reanalyze=False)
+    watcher.client = client
+    return watcher
+
+
+def test_unchanged_proxy(tmp_path):
+    client = FakeClient({PROXY: PROXY_CODE, IMPLEMENTATION: IMPLEMENTATION_CODE},
+                        {(PROXY, EIP1967_IMPLEMENTATION_SLOT): word(IMPLEMENTATION), (PROXY, 0): OWNER})
+    assert watcher_of_proxy(tmp_path, client).watch_round() == []
+
+
+def test_proxy_upgrade_is_a_code_change(tmp_path):
+    client = FakeClient({PROXY: PROXY_CODE, IMPLEMENTATION: IMPLEMENTATION_CODE, UPGRADED_IMPLEMENTATION: IMPLEMENTATION_CODE},
+                        {(PROXY, EIP1967_IMPLEMENTATION_SLOT): word(IMPLEMENTATION), (PROXY, 0): OWNER})
+    watcher = watcher_of_proxy(tmp_path, client)
+    assert watcher.watch_round() == []
+    # The upgraded implementation has the same code, only its address differs
+    client.storage[(PROXY, EIP1967_IMPLEMENTATION_SLOT)] = word(UPGRADED_IMPLEMENTATION)
+    events = watcher.watch_round()
+    assert [(event['event'], event['codeAddress'], event['newCodeAddress']) for event in events] == \
+        [(CODE_CHANGED, IMPLEMENTATION, UPGRADED_IMPLEMENTATION)]
+    # Without reanalysis, the upgrade is reported once
+    assert watcher.watch_round() == []